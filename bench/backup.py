@@ -0,0 +1,111 @@
+# bench/backup.py
+"""
+Sauvegarde à chaud (bot/core/db/backup.py) sur un jeu gendata, sous écriture concurrente:
+durée de la copie et du gzip, taux de compression, latence de l'écrivain pendant la sauvegarde
+comparée à la même charge sans sauvegarde, cohérence de l'instantané, puis une requête d'analyse
+(top des soldes sur tout le ledger) sur l'instantané vs la base vivante.
+
+    python -m bench.backup --players 50000 --ledger-rows 1000000
+"""
+from __future__ import annotations
+import argparse, logging, random, sys, threading, time
+
+from bench.common import use_temp_data_dir, percentiles
+
+TOP_SQL = "SELECT user_id, SUM(delta) AS bal FROM ledger GROUP BY user_id ORDER BY bal DESC LIMIT 10"
+
+
+def _writer(uids: list[int], stop: threading.Event, lat: list[float], tag: str) -> None:
+    from bot.persistence import ledger
+    rng = random.Random(3)
+    i = 0
+    while not stop.is_set():
+        s = time.perf_counter()
+        ledger.add_once(rng.choice(uids), f"bench:backup:{tag}:{i}", 2, "mendier")
+        lat.append(time.perf_counter() - s)
+        i += 1
+        time.sleep(0.001)
+
+def _under_load(uids: list[int], tag: str, fn) -> tuple[object, list[float]]:
+    """Lance fn() pendant qu'un écrivain tourne; renvoie (résultat, latences de l'écrivain)."""
+    stop, lat = threading.Event(), []
+    th = threading.Thread(target=_writer, args=(uids, stop, lat, tag), daemon=True)
+    th.start()
+    time.sleep(0.2)
+    try:
+        out = fn()
+    finally:
+        stop.set()
+        th.join()
+    return out, lat
+
+def _fmt_lat(lat: list[float]) -> str:
+    p = percentiles(lat)
+    return f"{len(lat):>6,} écritures • p50 {p['p50']:.2f} ms • p99 {p['p99']:.2f} ms • max {p['max']:.0f} ms"
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=50_000)
+    ap.add_argument("--ledger-rows", type=int, default=1_000_000)
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--no-writer", action="store_true")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="  %(message)s")
+    use_temp_data_dir("larue-backup-")
+    from bench import gendata
+    from bot.core.db import backup, base
+    from bot.core.db.migrations import migrate_if_needed
+
+    con = base.get_conn()
+    migrate_if_needed(con)
+    gargs = gendata._parser().parse_args(["--players", str(args.players), "--ledger-rows", str(args.ledger_rows),
+                                          "--days", str(args.days), "--seed", str(args.seed)])
+    gendata._init_worker(gargs)
+    per = max(1, int(gargs.chunk * gargs.players / max(1, gargs.ledger_rows)))
+    t0 = time.perf_counter()
+    for lo in range(0, args.players, per):
+        gendata._insert(con, gendata._gen_range((lo, min(args.players, lo + per))))
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    print(f"génération: {time.perf_counter() - t0:.1f}s • DB: {base.DB_PATH}")
+    uids = [int(r[0]) for r in con.execute("SELECT user_id FROM players")]
+    sample = random.Random(args.seed).sample(uids, min(5000, len(uids)))
+
+    # ── 1. sauvegarde sous écriture, comparée à la même charge sans sauvegarde
+    if args.no_writer:
+        out, lat_base, lat_bk = backup.run(), [], []
+    else:
+        _, lat_base = _under_load(sample, "base", lambda: time.sleep(2.0))
+        out, lat_bk = _under_load(sample, "bk", backup.run)
+    (live_n,) = con.execute("SELECT COUNT(*) FROM ledger").fetchone()
+
+    # ── 2. cohérence + analyse sur l'instantané vs base vivante
+    snap = backup.open_snapshot()
+    (snap_n,) = snap.execute("SELECT COUNT(*) FROM ledger").fetchone()
+    (ok,) = snap.execute("PRAGMA integrity_check").fetchone()
+    t = time.perf_counter()
+    top_snap = [tuple(r) for r in snap.execute(TOP_SQL)]
+    snap_s = time.perf_counter() - t
+    snap.close()
+    def _live() -> float:
+        t = time.perf_counter()
+        con.execute(TOP_SQL).fetchall()
+        return time.perf_counter() - t
+    live_s, lat_an = (_live(), []) if args.no_writer else _under_load(sample, "an", _live)
+
+    mib = 1024 ** 2
+    print(f"\nsauvegarde: {out['seconds']:.2f}s (copie {out['copy_s']:.2f}s en {out['steps']} pas, "
+          f"{out['bytes'] / mib / max(out['copy_s'], 1e-9):.0f} Mo/s • gzip {out['gzip_s']:.2f}s)")
+    print(f"taille: {out['bytes'] / mib:.1f} Mo → {out['gz_bytes'] / mib:.1f} Mo gz "
+          f"({out['gz_bytes'] / max(out['bytes'], 1):.0%})")
+    if lat_base:
+        print(f"écrivain sans sauvegarde  : {_fmt_lat(lat_base)}")
+        print(f"écrivain pendant sauvegarde: {_fmt_lat(lat_bk)}")
+    print(f"instantané: {snap_n:,} lignes ledger (vivante: {live_n:,}) • integrity_check: {ok}")
+    print(f"analyse top 10 soldes: instantané {snap_s * 1000:.0f} ms • base vivante {live_s * 1000:.0f} ms"
+          + (f" (écrivain pendant l'analyse vivante: {_fmt_lat(lat_an)})" if lat_an else ""))
+    sys.exit(0 if ok == "ok" and snap_n <= live_n and top_snap else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# bench/common.py
+"""
+Helpers partagés par les benchmarks (hors bot, jamais importés en prod).
+⚠️ `use_temp_data_dir()` doit être appelé AVANT tout import de `bot.*`:
+DB_PATH est résolu à l'import de bot.core.db.base.
+"""
+from __future__ import annotations
+import os, tempfile, time, statistics
+from typing import Callable
+
+def use_temp_data_dir(prefix: str = "larue-bench-") -> str:
+    path = os.environ.get("BENCH_DATA_DIR") or tempfile.mkdtemp(prefix=prefix)
+    os.environ["DATA_DIR"] = path
+    return path
+
+def percentiles(samples_s: list[float]) -> dict[str, float]:
+    """p50/p95/p99/max en millisecondes."""
+    if not samples_s:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    xs = sorted(samples_s)
+    def q(p: float) -> float:
+        return xs[min(len(xs) - 1, int(round(p * (len(xs) - 1))))] * 1000
+    return {"p50": q(0.50), "p95": q(0.95), "p99": q(0.99), "max": xs[-1] * 1000}
+
+def measure(fn: Callable[[], object], *, repeat: int = 200, warmup: int = 5) -> dict[str, float]:
+    """Chronomètre `fn` `repeat` fois; renvoie ops/s + percentiles (ms)."""
+    for _ in range(warmup):
+        fn()
+    samples: list[float] = []
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        s = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - s)
+    total = time.perf_counter() - t0
+    out = {"ops_s": repeat / total if total > 0 else 0.0, "mean": statistics.fmean(samples) * 1000}
+    out.update(percentiles(samples))
+    return out
+
+def measure_for(fn: Callable[[], object], *, seconds: float = 0.5, min_n: int = 5, max_n: int = 5000,
+                warmup: int = 3) -> dict[str, float]:
+    """Comme `measure`, mais borné en temps: utile quand le coût varie de 10 µs à 1 s selon la taille."""
+    for _ in range(warmup):
+        fn()
+    samples: list[float] = []
+    t0 = time.perf_counter()
+    while len(samples) < max_n and (len(samples) < min_n or time.perf_counter() - t0 < seconds):
+        s = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - s)
+    total = time.perf_counter() - t0
+    out = {"ops_s": len(samples) / total if total > 0 else 0.0, "mean": statistics.fmean(samples) * 1000,
+           "n": len(samples)}
+    out.update(percentiles(samples))
+    return out
+
+def fmt_row(label: str, r: dict[str, float]) -> str:
+    return (f"{label:<44} {r['ops_s']:>10.0f} ops/s   p50 {r['p50']:>8.3f} ms   "
+            f"p95 {r['p95']:>8.3f} ms   p99 {r['p99']:>8.3f} ms")
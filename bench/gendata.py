@@ -0,0 +1,321 @@
+# bench/gendata.py
+"""
+Générateur de jeu de données synthétique à l'échelle prod, pour tester classements,
+requêtes de solde et migrations.
+
+Remplit un larue.db NEUF (schéma des migrations) avec des joueurs, un ledger aux
+formes réelles de reason/key (mendier:<snowflake>, tabac:<snowflake>:<ticket>:bet, ...),
+stats, inventaire, recyclerie (état + claims), respect_log/profils, puis les rollups.
+
+Chemin rapide: génération en parallèle (processus), un seul écrivain SQLite qui insère
+par gros paquets executemany; index secondaires supprimés pendant le chargement puis
+recréés; journal/synchronous coupés le temps du remplissage; joueurs insérés dans
+l'ordre de la clé primaire du ledger (user_id, key_hash).
+
+    python -m bench.gendata --out /tmp/larue-big --players 1000000 --ledger-rows 100000000
+    python -m bench.gendata --players 20000 --ledger-rows 2000000 --mix mendier=50,fouiller=30,tabac=15,shop=2,recycler=3
+"""
+from __future__ import annotations
+import argparse, bisect, os, random, sys, time
+
+DISCORD_EPOCH_MS = 1_420_070_400_000
+BASE_UID = 300_000_000_000_000_000
+DEFAULT_MIX = "mendier=45,fouiller=30,tabac=18,shop=2,recycler=5"
+
+
+def _parse_mix(spec: str) -> tuple[list[str], list[float]]:
+    names, cum, acc = [], [], 0.0
+    for part in spec.split(","):
+        name, _, w = part.partition("=")
+        name = name.strip()
+        if name not in ("mendier", "fouiller", "tabac", "shop", "recycler"):
+            raise SystemExit(f"--mix: action inconnue {name!r}")
+        acc += float(w)
+        names.append(name)
+        cum.append(acc)
+    return names, [c / acc for c in cum]
+
+
+class Generator:
+    def __init__(self, args, seed: int) -> None:
+        from bot.domain.clock import day_window, shift_day, today_key
+        from bot.modules.rp.items import ITEMS
+        from bot.modules.rp.start import START_MONEY_CENTS
+        from bot.modules.rp.tabac import TICKETS
+
+        self.args = args
+        self.rng = random.Random(seed)
+        self.actions, self.mix_cum = _parse_mix(args.mix)
+        # mêmes pools pondérés que le vrai ticket (cf. tabac._weight_pick_deterministic), cumulés une fois
+        self.tickets = []
+        for k, t in TICKETS.items():
+            total, cum = float(sum(w for _, w in t["pool"])), []
+            acc = 0.0
+            for _, w in t["pool"]:
+                acc += w
+                cum.append(acc / total)
+            self.tickets.append((k, int(t["price"]), cum, [int(v) for v, _ in t["pool"]]))
+        self.ticket_cum = [0.55, 0.75, 0.87, 0.96, 1.0][:len(self.tickets)]   # les petits tickets dominent
+        self.items = [(iid, int(it["price"])) for iid, it in ITEMS.items()]
+        self.start_money = int(START_MONEY_CENTS)
+
+        # fenêtres des jours de jeu (le plus ancien d'abord) → ts et day_key réalistes
+        last = shift_day(today_key(), -1)
+        self.days = [shift_day(last, -i) for i in range(args.days - 1, -1, -1)]
+        self.windows = [day_window(d) for d in self.days]
+        self.day_keys = [int(d.replace("-", "")) for d in self.days]
+
+        self.seq = 0
+        self.buf: dict[str, list[tuple]] = {t: [] for t in (
+            "ledger", "players", "stats", "inventory", "recycler_state", "recycler_claims", "respect_log", "profiles")}
+
+    # ── utilitaires
+    def _ts_sf(self, day_idx: int) -> tuple[int, int]:
+        start, end = self.windows[day_idx]
+        ts = start + int(self.rng.random() * (end - start))
+        self.seq += 1
+        return ts, ((ts * 1000 - DISCORD_EPOCH_MS) << 22) | (self.seq & 0x3FFFFF)
+
+    def _rows_for_player(self) -> int:
+        a = self.args
+        mean = a.ledger_rows / a.players
+        w = self.rng.paretovariate(a.activity_alpha) * (a.activity_alpha - 1) / a.activity_alpha
+        return max(1, min(a.max_rows_per_player, int(mean * w + 0.5)))
+
+    # ── un joueur complet
+    def player(self, u: int) -> None:
+        rng, a = self.rng, self.args
+        rand = rng.random            # ~4× moins cher que randrange/randint, suffisant ici
+        uid = BASE_UID + u
+        led = self.buf["ledger"]
+        first_day = rng.randrange(len(self.days))
+        span = len(self.days) - first_day
+
+        ts0, _ = self._ts_sf(first_day)
+        led.append((uid, "start:gift", self.start_money, "start.gift", ts0))
+        bal = self.start_money
+        n_m = n_f = n_t = n_collect = 0
+        inv: dict[str, int] = {}
+
+        for _ in range(self._rows_for_player()):
+            act = self.actions[bisect.bisect_left(self.mix_cum, rand())]
+            ts, sf = self._ts_sf(first_day + int(rand() * span))
+            if act == "mendier":
+                amt = 5 + int(rand() * 96)
+                led.append((uid, f"mendier:{sf}", amt, "mendier", ts))
+                bal += amt; n_m += 1
+            elif act == "fouiller":
+                if rand() < 0.8:
+                    amt = 10 + int(rand() * 141)
+                    led.append((uid, f"fouiller:{sf}:gain", amt, "fouiller", ts))
+                else:
+                    amt = -(10 + int(rand() * 71))
+                    led.append((uid, f"fouiller:{sf}:loss", amt, "fouiller.loss", ts))
+                bal += amt; n_f += 1
+            elif act == "tabac":
+                key, price, cum, values = self.tickets[bisect.bisect_left(self.ticket_cum, rand())]
+                led.append((uid, f"tabac:{sf}:{key}:bet", -price, f"tabac.bet:{key}", ts))
+                gain = values[min(len(values) - 1, bisect.bisect_left(cum, rand()))]
+                if gain > 0:
+                    led.append((uid, f"tabac:{sf}:{key}:win", gain, f"tabac.win:{key}", ts))
+                bal += gain - price; n_t += 1
+            elif act == "shop":
+                iid, price = self.items[int(rand() * len(self.items))]
+                led.append((uid, f"shop:{sf}:{iid}", -price, f"shop:{iid}", ts))
+                inv[iid] = inv.get(iid, 0) + 1
+                bal -= price
+            else:
+                n_collect += 1
+
+        # recyclerie: au plus un claim par jour de jeu
+        best_streak = 0
+        if n_collect and rng.random() < a.recycler_share:
+            days = sorted(rng.sample(range(first_day, len(self.days)), min(n_collect, span)))
+            streak = 0
+            for i, d in enumerate(days):
+                streak = streak + 1 if i and d == days[i - 1] + 1 else 1
+                best_streak = max(best_streak, streak)
+                net = 100 + 15 * min(streak, 10) + rng.randint(0, 60)
+                ts, sf = self._ts_sf(d)
+                led.append((uid, f"recycler:{sf}:collect", net, "recycler.collect", ts))
+                self.buf["recycler_claims"].append((uid, self.day_keys[d], 1, net, 0, net, ts))
+                bal += net
+            self.buf["recycler_state"].append(
+                (uid, rng.randint(1, 3), rng.randint(0, 300), rng.randint(0, 5), streak, self.day_keys[days[-1]]))
+
+        self.buf["players"].append((uid, bal))
+        st = self.buf["stats"]
+        for key, v in (("mendier_count", n_m), ("fouiller_count", n_f), ("tabac_count", n_t),
+                       ("recycler_best_streak", best_streak)):
+            if v:
+                st.append((uid, key, v))
+        self.buf["inventory"].extend((uid, iid, q) for iid, q in inv.items())
+
+        # respect reçu: donneurs au hasard, jours au hasard (doublons ignorés par la PK)
+        cred = 0
+        for _ in range(rng.randint(0, 2 * a.respect)):
+            giver = rng.randrange(a.players)
+            if giver != u:
+                d = first_day + rng.randrange(span)
+                self.buf["respect_log"].append((uid, BASE_UID + giver, self.days[d], self.windows[d][0]))
+                cred += 1
+        self.buf["profiles"].append((uid, cred))
+
+    def take(self) -> dict[str, list[tuple]]:
+        out = self.buf
+        self.buf = {t: [] for t in out}
+        return out
+
+
+def _ledger_rows(con, rows: list[tuple]) -> list[tuple]:
+    """Lignes (uid, key, delta, reason, ts) au schéma compact (v0010): digest et contrôle de clé, raison
+    internée, triées dans l'ordre de la PK (user_id, key_hash)."""
+    from bot.core.db.base import key_check, key_digest
+    con.executemany("INSERT OR IGNORE INTO ledger_reasons(reason) VALUES(?)", {(r[3],) for r in rows})
+    ids = dict(con.execute("SELECT reason, id FROM ledger_reasons"))
+    return sorted((uid, key_digest(key), key_check(key), delta, ids[reason], ts) for uid, key, delta, reason, ts in rows)
+
+def _insert(con, b: dict[str, list[tuple]]) -> int:
+    from bot.core.db.rebuild import column_type
+    con.execute("BEGIN;")
+    if column_type(con, "ledger", "key_hash"):
+        con.executemany("INSERT INTO ledger(user_id, key_hash, key_check, delta, reason_id, ts) VALUES(?,?,?,?,?,?)",
+                        _ledger_rows(con, b["ledger"]))
+    else:   # schéma antérieur à v0010 (bench.int_ids, bench.ledger_compact)
+        con.executemany("INSERT INTO ledger(user_id, key, delta, reason, ts) VALUES(?,?,?,?,?)", b["ledger"])
+    con.executemany("INSERT INTO players(user_id, has_started, money) VALUES(?,1,?)", b["players"])
+    con.executemany("INSERT INTO stats(user_id, key, value) VALUES(?,?,?)", b["stats"])
+    con.executemany("INSERT INTO inventory(user_id, item_id, qty) VALUES(?,?,?)", b["inventory"])
+    con.executemany("INSERT INTO recycler_state(user_id, level, canettes, sacs, streak, last_day) "
+                    "VALUES(?,?,?,?,?,?)", b["recycler_state"])
+    con.executemany("INSERT INTO recycler_claims(user_id, day_key, sacs_used, gross, tax, net, ts) "
+                    "VALUES(?,?,?,?,?,?,?)", b["recycler_claims"])
+    con.executemany("INSERT OR IGNORE INTO respect_log(user_id, from_id, day, delta, ts) VALUES(?,?,?,1,?)",
+                    b["respect_log"])
+    con.executemany("INSERT INTO profiles(user_id, cred) VALUES(?,?)", b["profiles"])
+    con.execute("COMMIT;")
+    return len(b["ledger"])
+
+_worker_args = None
+
+def _init_worker(args) -> None:
+    global _worker_args
+    _worker_args = args
+
+def _gen_range(bounds: tuple[int, int]) -> dict[str, list[tuple]]:
+    """Génère les joueurs [lo, hi): graine dérivée de lo → même résultat quel que soit --workers."""
+    lo, hi = bounds
+    gen = Generator(_worker_args, _worker_args.seed * 1_000_003 + lo)
+    for u in range(lo, hi):
+        gen.player(u)
+    return gen.take()
+
+
+def _parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default="", help="dossier DATA_DIR cible (défaut: dossier temporaire)")
+    ap.add_argument("--force", action="store_true", help="écrase un larue.db existant")
+    ap.add_argument("--players", type=int, default=100_000)
+    ap.add_argument("--ledger-rows", type=int, default=5_000_000, help="cible approximative (hors start/recyclerie)")
+    ap.add_argument("--days", type=int, default=180)
+    ap.add_argument("--activity-alpha", type=float, default=1.3, help="Pareto: activité par joueur (>1)")
+    ap.add_argument("--max-rows-per-player", type=int, default=200_000)
+    ap.add_argument("--mix", default=DEFAULT_MIX, help="poids des actions du ledger")
+    ap.add_argument("--recycler-share", type=float, default=0.6, help="part des joueurs 'recycleurs' qui claiment")
+    ap.add_argument("--respect", type=int, default=2, help="respect reçu moyen par joueur")
+    ap.add_argument("--chunk", type=int, default=200_000, help="lignes de ledger par transaction")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="processus de génération (l'insertion reste sur un seul écrivain)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--snapshots", action="store_true", help="calcule aussi les snapshots quotidiens (long)")
+    return ap
+
+def main() -> None:
+    args = _parser().parse_args()
+    if args.activity_alpha <= 1:
+        raise SystemExit("--activity-alpha doit être > 1")
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        os.environ["BENCH_DATA_DIR"] = args.out
+    from bench.common import use_temp_data_dir
+    data_dir = use_temp_data_dir("larue-gendata-")
+    db_path = os.path.join(data_dir, "larue.db")
+    if os.path.exists(db_path):
+        if not args.force:
+            raise SystemExit(f"{db_path} existe déjà (--force pour l'écraser)")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    from bot.core.db.base import get_conn
+    from bot.core.db.migrations import migrate_if_needed
+    from bot.persistence import meta, rollups, snapshots as snap_repo
+    from bot.domain.clock import shift_day, today_key
+
+    con = get_conn()
+    migrate_if_needed(con)
+
+    # Index secondaires recréés après le chargement (les PK restent: les lignes arrivent dans leur ordre)
+    indexes = con.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='index' AND sql IS NOT NULL").fetchall()
+    for name, _ in indexes:
+        con.execute(f"DROP INDEX {name};")
+    con.execute("PRAGMA journal_mode=OFF;")
+    con.execute("PRAGMA synchronous=OFF;")
+    con.execute("PRAGMA cache_size=-262144;")     # 256 MiB
+    con.execute("PRAGMA temp_store=MEMORY;")
+
+    # Tranches de joueurs ≈ --chunk lignes de ledger; générées en parallèle, insérées dans l'ordre
+    per = max(1, int(args.chunk * args.players / max(1, args.ledger_rows)))
+    ranges = [(lo, min(args.players, lo + per)) for lo in range(0, args.players, per)]
+    print(f"DB: {db_path}\n{args.players:,} joueurs, ~{args.ledger_rows:,} lignes de ledger sur {args.days} jours "
+          f"({len(ranges)} tranches, {args.workers} worker(s))…")
+
+    t0 = last = time.perf_counter()
+    rows = 0
+    if args.workers > 1:
+        import multiprocessing as mp
+        pool = mp.Pool(args.workers, initializer=_init_worker, initargs=(args,))
+        chunks = pool.imap(_gen_range, ranges)
+    else:
+        pool = None
+        _init_worker(args)
+        chunks = map(_gen_range, ranges)
+    try:
+        for i, buf in enumerate(chunks, 1):
+            rows += _insert(con, buf)
+            if time.perf_counter() - last > 5:
+                last = time.perf_counter()
+                print(f"  {i}/{len(ranges)} tranches • {rows:,} lignes • {rows / (last - t0):,.0f} lignes/s", flush=True)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    t_load = time.perf_counter() - t0
+    print(f"chargement: {rows:,} lignes de ledger en {t_load:.1f}s ({rows / max(t_load, 1e-9):,.0f}/s)")
+
+    t1 = time.perf_counter()
+    for name, sql in indexes:
+        s = time.perf_counter()
+        con.execute(sql)
+        print(f"  index {name}: {time.perf_counter() - s:.1f}s")
+    rollups.backfill(con)                         # même rattrapage que la migration v0006
+    print(f"index + rollups: {time.perf_counter() - t1:.1f}s")
+
+    if args.snapshots:
+        from bot.domain import snapshots as d_snapshots
+        s = time.perf_counter()
+        n = d_snapshots.run_daily()
+        print(f"snapshots: {n:,} lignes en {time.perf_counter() - s:.1f}s")
+    else:
+        # sinon le premier tick quotidien rattraperait tout l'historique d'un coup
+        meta.put(snap_repo.LAST_DAY_KEY, shift_day(today_key(), -1))
+
+    con.execute("ANALYZE;")
+    con.execute("PRAGMA journal_mode=WAL;")
+    size = os.path.getsize(db_path) / 1024**2
+    print(f"terminé en {time.perf_counter() - t0:.1f}s • {size:,.0f} MB")
+
+if __name__ == "__main__":
+    sys.exit(main())
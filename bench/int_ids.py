@@ -0,0 +1,187 @@
+# bench/int_ids.py
+"""
+Migration v0009 (user_id INTEGER + WITHOUT ROWID) sur un jeu gendata au schéma v0008 (le ledger,
+converti par v0010 en une seule reconstruction, a son propre bench: bench.ledger_compact):
+taille table/index (dbstat) et vitesse des lectures par joueur avant/après, durée de la
+reconstruction en ligne, et latence d'un écrivain concurrent pendant la copie.
+
+    python -m bench.int_ids --players 50000 --ledger-rows 2000000
+    python -m bench.int_ids --players 20000 --ledger-rows 500000 --batch 5000 --no-writer
+
+Les deux états sont mesurés après VACUUM (pages tassées des deux côtés; la taille juste après
+la migration, avant VACUUM, est affichée aussi), les lectures en alternance sur les deux copies.
+"""
+from __future__ import annotations
+import argparse, logging, os, random, sqlite3, sys, threading, time
+
+from bench.common import use_temp_data_dir, measure_for, fmt_row, percentiles
+
+
+def _sizes(con) -> dict[str, tuple[int, int]]:
+    """table -> (octets de la table, octets de ses index), via dbstat."""
+    owner = {r[0]: r[1] for r in con.execute("SELECT name, tbl_name FROM sqlite_master WHERE type IN ('table','index')")}
+    out: dict[str, list[int]] = {}
+    for name, size in con.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"):
+        table = owner.get(name, name)
+        acc = out.setdefault(table, [0, 0])
+        acc[0 if name == table else 1] += int(size)
+    return {t: (a, b) for t, (a, b) in out.items() if not t.startswith("sqlite_")}
+
+def _compact(con) -> None:
+    con.execute("VACUUM")
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)")   # sinon les lectures passent par un WAL de la taille de la DB
+
+def _file_size(con) -> int:
+    (n,) = con.execute("PRAGMA page_count").fetchone()
+    (sz,) = con.execute("PRAGMA page_size").fetchone()
+    return int(n) * int(sz)
+
+# Mêmes requêtes que bot/persistence (les ids y arrivent en str: conversion comprise côté « après »)
+LOOKUPS = [
+    ("players.get_or_create", "SELECT has_started, money FROM players WHERE user_id=?", 1),
+    ("stats.get", "SELECT value FROM stats WHERE user_id=? AND key='mendier_count'", 1),
+    ("inventory.get_inventory", "SELECT item_id, qty FROM inventory WHERE user_id=?", 1),
+    ("respect.can_give", "SELECT 1 FROM respect_log WHERE user_id=? AND from_id=? AND day='2026-01-01'", 2),
+    ("stats.top_by_key (top 10)", "SELECT user_id, value FROM stats WHERE key='mendier_count' AND value > 0 "
+                                  "ORDER BY value DESC, user_id ASC LIMIT 10", 0),
+]
+
+def _open(path: str) -> sqlite3.Connection:
+    con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    con.execute("PRAGMA cache_size=-20000;")   # comme base._connect
+    return con
+
+def _lookups(before: sqlite3.Connection, after: sqlite3.Connection, uids: list[int],
+             rounds: int = 3) -> dict[str, tuple[dict, dict]]:
+    """Avant/après en alternance (meilleur de `rounds` passes): la machine dérive moins qu'entre deux phases."""
+    out: dict[str, tuple[dict, dict]] = {}
+    for name, sql, n in LOOKUPS:
+        best: list[dict | None] = [None, None]
+        for _ in range(rounds):
+            for side, (con, conv) in enumerate(((before, str), (after, int))):
+                it = iter(range(10**12))
+                def run(con=con, conv=conv, it=it):
+                    i = next(it)
+                    con.execute(sql, tuple(conv(uids[(i + k) % len(uids)]) for k in range(n))).fetchall()
+                r = measure_for(run, seconds=0.3)
+                if best[side] is None or r["ops_s"] > best[side]["ops_s"]:
+                    best[side] = r
+        out[name] = (best[0], best[1])
+    return out
+
+def _fill(con, args) -> None:
+    from bench import gendata
+    gargs = gendata._parser().parse_args(["--players", str(args.players), "--ledger-rows", str(args.ledger_rows),
+                                          "--days", str(args.days), "--seed", str(args.seed)])
+    per = max(1, int(gargs.chunk * gargs.players / max(1, gargs.ledger_rows)))
+    gendata._init_worker(gargs)
+    rows = 0
+    for lo in range(0, args.players, per):
+        rows += gendata._insert(con, gendata._gen_range((lo, min(args.players, lo + per))))
+    con.executescript("ANALYZE;")
+    print(f"{args.players:,} joueurs, {rows:,} lignes de ledger (schéma v{con.execute('PRAGMA user_version').fetchone()[0]})")
+
+def _writer(uids: list[int], stop: threading.Event, lat: list[float]) -> None:
+    """Écrivain façon prod pendant la migration: un posting + une mise à jour de joueur par tour
+    (SQL du ledger d'avant v0010: persistence.ledger vise désormais le schéma compact)."""
+    from bot.core.db.base import get_conn, atomic
+    con = get_conn()
+    rng = random.Random(3)
+    i = 0
+    while not stop.is_set():
+        uid = str(uids[rng.randrange(len(uids))])
+        s = time.perf_counter()
+        with atomic(con):
+            con.execute("INSERT OR IGNORE INTO ledger(user_id, key, delta, reason) VALUES(?,?,7,'mendier')",
+                        (uid, f"bench:int_ids:{i}"))
+            con.execute("UPDATE players SET money = money + 7 WHERE user_id=?", (uid,))
+        lat.append(time.perf_counter() - s)
+        i += 1
+        time.sleep(0.002)
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=50_000)
+    ap.add_argument("--ledger-rows", type=int, default=2_000_000)
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--batch", type=int, default=0, help="lignes par lot de copie (0 = défaut de rebuild.py)")
+    ap.add_argument("--no-writer", action="store_true", help="pas d'écrivain concurrent pendant la migration")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="  %(message)s")
+    use_temp_data_dir("larue-int-ids-")
+    from bot.core.db.base import get_conn, DB_PATH
+    from bot.core.db import migrations, rebuild
+
+    con = get_conn()
+    for m in (migrations.v0001_base, migrations.v0002_recycler, migrations.v0003_idx, migrations.v0004_ledger,
+              migrations.v0005_stats_idx, migrations.v0006_rollups, migrations.v0007_snapshots,
+              migrations.v0008_ledger_keyset):
+        m.apply(con)
+    con.execute("PRAGMA user_version=8")
+    t0 = time.perf_counter()
+    _fill(con, args)
+    print(f"génération: {time.perf_counter() - t0:.1f}s • DB: {DB_PATH}")
+
+    rng = random.Random(args.seed)
+    uids = [int(r[0]) for r in con.execute("SELECT user_id FROM players")]
+    sample = rng.sample(uids, min(5000, len(uids)))
+    (n_ledger,) = con.execute("SELECT COUNT(*) FROM ledger").fetchone()
+    (money,) = con.execute("SELECT TOTAL(money) FROM players").fetchone()
+
+    _compact(con)
+    size_before, file_before = _sizes(con), _file_size(con)
+    before_path = os.path.join(os.path.dirname(DB_PATH), "avant-v0009.db")
+    con.execute("VACUUM INTO ?", (before_path,))
+
+    # ── migration en ligne, avec (par défaut) un écrivain concurrent
+    stop, lat = threading.Event(), []
+    th = None
+    if not args.no_writer:
+        th = threading.Thread(target=_writer, args=(sample, stop, lat), daemon=True)
+        th.start()
+    if args.batch:
+        rebuild.BATCH = args.batch
+    t0 = time.perf_counter()
+    migrations.v0009_int_user_ids.apply(con)   # v0009 seule: v0010 a son propre bench (ledger_compact)
+    con.execute("PRAGMA user_version=9")
+    t_mig = time.perf_counter() - t0
+    stop.set()
+    if th is not None:
+        th.join()
+    size_mig = _file_size(con)
+
+    # ── cohérence: rien de perdu, les écritures concurrentes sont toutes là
+    (n_after,) = con.execute("SELECT COUNT(*) FROM ledger").fetchone()
+    (money_after,) = con.execute("SELECT TOTAL(money) FROM players").fetchone()
+    (types,) = con.execute("SELECT COUNT(*) FROM players WHERE typeof(user_id) <> 'integer'").fetchone()
+    n_writes = len(lat)
+    ok = (n_after == n_ledger + n_writes and int(money_after) == int(money) + 7 * n_writes and types == 0)
+
+    _compact(con)
+    size_after, file_after = _sizes(con), _file_size(con)
+    timings = _lookups(_open(before_path), _open(DB_PATH), sample)
+
+    mib = 1024 ** 2
+    print(f"\nmigration: {t_mig:.1f}s • {n_writes:,} écritures concurrentes"
+          + (f" (p50 {percentiles(lat)['p50']:.2f} ms, p99 {percentiles(lat)['p99']:.2f} ms, "
+             f"max {percentiles(lat)['max']:.0f} ms)" if lat else "")
+          + f" • cohérence {'✅' if ok else '❌'}")
+    print(f"\n{'table':<20} {'table avant':>12} {'après':>9} {'index avant':>12} {'après':>9} {'total':>8}")
+    for t in sorted(size_before, key=lambda t: -sum(size_before[t])):
+        (ta, ia), (tb, ib) = size_before[t], size_after.get(t, (0, 0))
+        gain = 1 - (tb + ib) / max(1, ta + ia)
+        print(f"{t:<20} {ta / mib:>10.1f}Mo {tb / mib:>7.1f}Mo {ia / mib:>10.1f}Mo {ib / mib:>7.1f}Mo {-gain:>+8.0%}")
+    print(f"{'fichier':<20} {file_before / mib:>10.1f}Mo {file_after / mib:>7.1f}Mo"
+          f"   (juste après migration, avant VACUUM: {size_mig / mib:.1f}Mo)")
+
+    print()
+    for name, (a, b) in timings.items():
+        print(fmt_row(f"{name} avant", a))
+        print(fmt_row(f"{name} après ({b['ops_s'] / max(a['ops_s'], 1e-9):.2f}×)", b))
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
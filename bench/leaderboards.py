@@ -0,0 +1,76 @@
+# bench/leaderboards.py
+"""
+Benchmark des classements (stats indexées vs scan, cache domaine).
+
+    python -m bench.leaderboards --users 200000
+"""
+from __future__ import annotations
+import argparse, random
+
+from bench.common import use_temp_data_dir, measure, fmt_row
+
+STAT_KEYS = ("mendier_count", "fouiller_count", "tabac_count", "recycler_best_streak")
+
+def _seed(con, users: int, ledger_per_user: int) -> None:
+    rng = random.Random(42)
+    base = 300_000_000_000_000_000
+    con.execute("BEGIN;")
+    con.executemany(
+        "INSERT INTO stats(user_id, key, value) VALUES(?,?,?)",
+        (
+            (str(base + u), k, int(rng.paretovariate(1.3) * 3))
+            for u in range(users) for k in STAT_KEYS
+        ),
+    )
+    con.execute("INSERT OR IGNORE INTO ledger_reasons(reason) VALUES('mendier')")
+    con.executemany(
+        "INSERT INTO ledger(user_id, key_hash, key_check, delta, reason_id) "
+        "VALUES(?1, key_digest(?2), key_check(?2), ?3, (SELECT id FROM ledger_reasons WHERE reason='mendier'))",
+        (
+            (str(base + u), f"mendier:{base + u * 100 + i}", rng.randint(5, 100))
+            for u in range(users) for i in range(ledger_per_user)
+        ),
+    )
+    con.execute("COMMIT;")
+    con.execute("ANALYZE;")
+
+def _plan(con, sql: str, params: tuple) -> str:
+    return " | ".join(r[3] for r in con.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall())
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=200_000)
+    ap.add_argument("--ledger-per-user", type=int, default=5)
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    data_dir = use_temp_data_dir()
+    from bot.core.db.base import get_conn
+    from bot.core.db.migrations import migrate_if_needed
+    from bot.domain import leaderboards, stats as d_stats, economy as d_economy
+
+    con = get_conn()
+    migrate_if_needed(con)
+    print(f"DB: {data_dir} • seeding {args.users} users × {len(STAT_KEYS)} stats, "
+          f"{args.users * args.ledger_per_user} ledger rows…")
+    _seed(con, args.users, args.ledger_per_user)
+
+    sql = ("SELECT user_id, value FROM stats WHERE key=? AND value > 0 "
+           "ORDER BY value DESC, user_id ASC LIMIT ? OFFSET ?")
+    print("plan (indexé):", _plan(con, sql, ("mendier_count", 11, 0)))
+
+    r = args.repeat
+    print(fmt_row("stats top page 1 (index)", measure(lambda: d_stats.top_by_key("mendier_count", 11, 0), repeat=r)))
+    print(fmt_row("stats top page 10 (index)", measure(lambda: d_stats.top_by_key("mendier_count", 11, 90), repeat=r)))
+    print(fmt_row("argent top page 1 (GROUP BY ledger)", measure(lambda: d_economy.top_richest(11, 0), repeat=max(3, r // 20))))
+
+    leaderboards.invalidate()
+    print(fmt_row("leaderboards.page (cache chaud)", measure(lambda: leaderboards.page("mendier", 0), repeat=r * 10)))
+
+    con.execute("DROP INDEX idx_stats_by_key_value;")
+    # SQL légèrement différent: sinon le cache de statements resservirait l'ancien plan
+    print("plan (sans index):", _plan(con, sql + " ", ("mendier_count", 11, 0)))
+    print(fmt_row("stats top page 1 (full scan)", measure(lambda: d_stats.top_by_key("mendier_count", 11, 0), repeat=max(3, r // 20))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# bench/ledger_compact.py
+"""
+Migration v0010 (ledger compact: user_id INTEGER, raison internée + clé d'idempotence en digest
+16 octets, en une seule reconstruction) sur un jeu gendata au schéma v0009: taille de la table et de ses index (dbstat), débit d'écriture
+add_once (neuve et rejouée), lectures par joueur avant/après, reconstruction en ligne avec un
+écrivain concurrent.
+
+    python -m bench.ledger_compact --players 50000 --ledger-rows 2000000
+    python -m bench.ledger_compact --players 20000 --ledger-rows 500000 --no-writer
+
+Mêmes précautions que bench.int_ids: les deux états sont mesurés après VACUUM, les lectures et
+écritures en alternance sur deux copies.
+"""
+from __future__ import annotations
+import argparse, logging, os, random, sqlite3, sys, threading, time
+
+from bench.common import use_temp_data_dir, measure_for, fmt_row, percentiles
+from bench.int_ids import _compact, _file_size, _fill, _open, _sizes
+
+LOOKUPS = {
+    "ledger.sum_balance": ("SELECT COALESCE(SUM(delta),0) FROM ledger WHERE user_id=?",
+                           "SELECT COALESCE(SUM(delta),0) FROM ledger WHERE user_id=?"),
+    "ledger.history_page": ("SELECT ts, key, delta, reason FROM ledger WHERE user_id=? "
+                            "ORDER BY ts DESC, key DESC LIMIT 10",
+                            "SELECT l.ts, l.key_hash, l.delta, r.reason FROM ledger l "
+                            "JOIN ledger_reasons r ON r.id = l.reason_id WHERE l.user_id=? "
+                            "ORDER BY l.ts DESC, l.key_hash DESC LIMIT 10"),
+    "ledger.top_richest (scan)": ("SELECT user_id, SUM(delta) AS bal FROM ledger GROUP BY user_id "
+                                  "ORDER BY bal DESC, user_id ASC LIMIT 10",) * 2,
+}
+
+def _old_add_once(con, uid: int, key: str, reason: str, ts: int) -> bool:
+    """add_once d'avant v0010 (clé et raison en texte), rollups compris."""
+    from bot.core.db.base import atomic
+    from bot.persistence import rollups
+    with atomic(con):
+        before = con.total_changes
+        con.execute("INSERT OR IGNORE INTO ledger(user_id, key, delta, reason, ts) VALUES(?,?,?,?,?)",
+                    (uid, key, 5, reason, ts))
+        added = con.total_changes > before
+        if added:
+            rollups.apply_posting(con, ts, reason, 5)
+    return added
+
+def _writes(before_path: str, after_path: str, uids: list[int], rounds: int = 3) -> dict[str, tuple[dict, dict]]:
+    """add_once neuve puis rejouée (idempotence), ancien SQL sur la copie avant, persistence.ledger après."""
+    from bot.core.db import base
+    from bot.persistence import ledger
+    cons = []
+    for path in (before_path, after_path):
+        con = sqlite3.connect(path, isolation_level=None, check_same_thread=False, factory=base._Connection)
+        con.execute("PRAGMA journal_mode=WAL;")
+        con.execute("PRAGMA synchronous=NORMAL;")
+        con.execute("PRAGMA cache_size=-20000;")
+        cons.append(con)
+    cons[1].create_function("key_digest", 1, base.key_digest, deterministic=True)
+    cons[1].create_function("key_check", 1, base.key_check, deterministic=True)
+    reasons = ("mendier", "fouiller", "tabac.bet:banco")
+    now = int(time.time())
+    seq = iter(range(10**12))
+    keys: list[tuple[int, str, str]] = []
+
+    def fresh(side: int):
+        def run():
+            i = next(seq)
+            uid, key, reason = uids[i % len(uids)], f"bench:compact:{i}", reasons[i % 3]
+            if side == 0:
+                _old_add_once(cons[0], uid, key, reason, now)
+            else:
+                ledger.add_once(uid, key, 5, reason, now)
+            keys.append((uid, key, reason))
+        return run
+
+    def replay(side: int):
+        it = iter(range(10**12))
+        def run():
+            uid, key, reason = keys[next(it) % len(keys)]
+            if side == 0:
+                _old_add_once(cons[0], uid, key, reason, now)
+            else:
+                ledger.add_once(uid, key, 5, reason, now)
+        return run
+
+    out: dict[str, tuple[dict, dict]] = {}
+    # persistence.ledger passe par get_conn(): on la fait pointer sur la copie « après »
+    base._tls.con = cons[1]
+    for name, make in (("add_once (nouvelle)", fresh), ("add_once (rejouée)", replay)):
+        best: list[dict | None] = [None, None]
+        for _ in range(rounds):
+            for side in (0, 1):
+                r = measure_for(make(side), seconds=0.5)
+                if best[side] is None or r["ops_s"] > best[side]["ops_s"]:
+                    best[side] = r
+        out[name] = (best[0], best[1])
+    return out
+
+def _lookups(before: sqlite3.Connection, after: sqlite3.Connection, uids: list[int],
+             rounds: int = 3) -> dict[str, tuple[dict, dict]]:
+    out: dict[str, tuple[dict, dict]] = {}
+    for name, sqls in LOOKUPS.items():
+        best: list[dict | None] = [None, None]
+        for _ in range(rounds):
+            for side, con in enumerate((before, after)):
+                sql = sqls[side]
+                n = sql.count("?")
+                it = iter(range(10**12))
+                def run(con=con, sql=sql, n=n, it=it):
+                    i = next(it)
+                    con.execute(sql, (uids[i % len(uids)],) * n).fetchall()
+                r = measure_for(run, seconds=0.3)
+                if best[side] is None or r["ops_s"] > best[side]["ops_s"]:
+                    best[side] = r
+        out[name] = (best[0], best[1])
+    return out
+
+def _writer(uids: list[int], stop: threading.Event, lat: list[float]) -> None:
+    """Écrivain concurrent: SQL de l'ancien schéma tant que la bascule n'a pas eu lieu, add_once ensuite."""
+    from bot.core.db.base import get_conn, atomic
+    from bot.core.db.rebuild import column_type
+    from bot.persistence import ledger
+    con = get_conn()
+    rng = random.Random(3)
+    i = 0
+    while not stop.is_set():
+        uid = uids[rng.randrange(len(uids))]
+        reason = f"bench.writer:{i % 50}"          # raisons nouvelles: internées par les triggers
+        s = time.perf_counter()
+        with atomic(con):
+            compact = bool(column_type(con, "ledger", "key_hash"))
+            if not compact:
+                con.execute("INSERT OR IGNORE INTO ledger(user_id, key, delta, reason) VALUES(?,?,7,?)",
+                            (uid, f"bench:writer:{i}", reason))
+        if compact:
+            ledger.add_once(uid, f"bench:writer:{i}", 7, reason)
+        lat.append(time.perf_counter() - s)
+        i += 1
+        time.sleep(0.002)
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=50_000)
+    ap.add_argument("--ledger-rows", type=int, default=2_000_000)
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--batch", type=int, default=0, help="lignes par lot de copie (0 = défaut de rebuild.py)")
+    ap.add_argument("--no-writer", action="store_true", help="pas d'écrivain concurrent pendant la migration")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="  %(message)s")
+    use_temp_data_dir("larue-ledger-compact-")
+    from bot.core.db.base import get_conn, DB_PATH
+    from bot.core.db import migrations, rebuild
+
+    con = get_conn()
+    for m in (migrations.v0001_base, migrations.v0002_recycler, migrations.v0003_idx, migrations.v0004_ledger,
+              migrations.v0005_stats_idx, migrations.v0006_rollups, migrations.v0007_snapshots,
+              migrations.v0008_ledger_keyset, migrations.v0009_int_user_ids):
+        m.apply(con)
+    con.execute("PRAGMA user_version=9")
+    t0 = time.perf_counter()
+    _fill(con, args)
+    print(f"génération: {time.perf_counter() - t0:.1f}s • DB: {DB_PATH}")
+
+    rng = random.Random(args.seed)
+    uids = [int(r[0]) for r in con.execute("SELECT user_id FROM players")]
+    sample = rng.sample(uids, min(5000, len(uids)))
+    (n_ledger,) = con.execute("SELECT COUNT(*) FROM ledger").fetchone()
+    (total,) = con.execute("SELECT TOTAL(delta) FROM ledger").fetchone()
+    (n_reasons,) = con.execute("SELECT COUNT(DISTINCT reason) FROM ledger").fetchone()
+
+    _compact(con)
+    size_before, file_before = _sizes(con), _file_size(con)
+    before_path = os.path.join(os.path.dirname(DB_PATH), "avant-v0010.db")
+    con.execute("VACUUM INTO ?", (before_path,))
+
+    stop, lat = threading.Event(), []
+    th = None
+    if not args.no_writer:
+        th = threading.Thread(target=_writer, args=(sample, stop, lat), daemon=True)
+        th.start()
+    if args.batch:
+        rebuild.BATCH = args.batch
+    t0 = time.perf_counter()
+    migrations.v0010_ledger_compact.apply(con)   # v0010 seule (v0011: VACUUM de toute la base)
+    con.execute("PRAGMA user_version=10")
+    t_mig = time.perf_counter() - t0
+    stop.set()
+    if th is not None:
+        th.join()
+
+    # ── cohérence: chaque ligne convertie, raisons toutes résolues, écritures concurrentes présentes
+    (n_after,) = con.execute("SELECT COUNT(*) FROM ledger").fetchone()
+    (total_after,) = con.execute("SELECT TOTAL(delta) FROM ledger").fetchone()
+    (orphans,) = con.execute("SELECT COUNT(*) FROM ledger l LEFT JOIN ledger_reasons r ON r.id = l.reason_id "
+                             "WHERE r.id IS NULL").fetchone()
+    (bad_keys,) = con.execute("SELECT COUNT(*) FROM ledger WHERE length(key_hash) <> 16 "
+                              "OR typeof(user_id) <> 'integer'").fetchone()
+    # paires (clé, raison) d'avant retrouvées à l'identique: une raison mal internée échoue ici
+    con.execute("ATTACH DATABASE ? AS avant", (before_path,))
+    (mismatched,) = con.execute(
+        "SELECT COUNT(*) FROM avant.ledger o LEFT JOIN main.ledger n "
+        "ON n.user_id = CAST(o.user_id AS INTEGER) AND n.key_hash = key_digest(o.key) "
+        "LEFT JOIN main.ledger_reasons r ON r.id = n.reason_id WHERE r.reason IS NOT o.reason").fetchone()
+    con.execute("DETACH DATABASE avant")
+    n_writes = len(lat)
+    ok = (n_after == n_ledger + n_writes and int(total_after) == int(total) + 7 * n_writes
+          and orphans == 0 and bad_keys == 0 and mismatched == 0)
+
+    _compact(con)
+    size_after, file_after = _sizes(con), _file_size(con)
+    after_path = os.path.join(os.path.dirname(DB_PATH), "apres-v0010.db")
+    con.execute("VACUUM INTO ?", (after_path,))
+    timings = _lookups(_open(before_path), _open(after_path), sample)
+    writes = _writes(before_path, after_path, sample)
+
+    mib = 1024 ** 2
+    print(f"\nmigration: {t_mig:.1f}s • {n_ledger:,} lignes, {n_reasons} raisons distinctes • "
+          f"{n_writes:,} écritures concurrentes"
+          + (f" (p50 {percentiles(lat)['p50']:.2f} ms, p99 {percentiles(lat)['p99']:.2f} ms, "
+             f"max {percentiles(lat)['max']:.0f} ms)" if lat else "")
+          + f" • cohérence {'✅' if ok else '❌'}"
+          + (f" ({mismatched:,} raisons/clés divergentes)" if mismatched else ""))
+    print(f"\n{'table':<20} {'table avant':>12} {'après':>9} {'index avant':>12} {'après':>9} {'total':>8}")
+    for t in ("ledger", "ledger_reasons"):
+        (ta, ia), (tb, ib) = size_before.get(t, (0, 0)), size_after.get(t, (0, 0))
+        gain = f"{(tb + ib) / (ta + ia) - 1:>+8.0%}" if ta + ia else f"{'(neuve)':>8}"
+        print(f"{t:<20} {ta / mib:>10.1f}Mo {tb / mib:>7.1f}Mo {ia / mib:>10.1f}Mo {ib / mib:>7.1f}Mo {gain}")
+    print(f"{'fichier':<20} {file_before / mib:>10.1f}Mo {file_after / mib:>7.1f}Mo")
+    (ta, _), (tb, _) = size_before["ledger"], size_after["ledger"]
+    print(f"octets par ligne (PK comprise): {ta / n_ledger:.1f} → {tb / n_after:.1f}")
+
+    print()
+    for name, (a, b) in {**timings, **writes}.items():
+        print(fmt_row(f"{name} avant", a))
+        print(fmt_row(f"{name} après ({b['ops_s'] / max(a['ops_s'], 1e-9):.2f}×)", b))
+
+    for path in (before_path, after_path):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# bench/ledger_history.py
+"""
+Historique /poches: pagination keyset (ts, key_hash) vs OFFSET sur un gros joueur.
+
+    python -m bench.ledger_history --rows 100000
+"""
+from __future__ import annotations
+import argparse, random, time
+
+from bench.common import use_temp_data_dir, measure, fmt_row
+
+WHALE = "300000000000000001"
+
+INSERT = ("INSERT INTO ledger(user_id, key_hash, key_check, delta, reason_id, ts) "
+          "VALUES(?1, key_digest(?2), key_check(?2), ?3, (SELECT id FROM ledger_reasons WHERE reason=?4), ?5)")
+
+def _seed(con, rows: int, others: int) -> None:
+    rng = random.Random(7)
+    now = int(time.time())
+    reasons = ("mendier", "fouiller", "tabac.bet:banco", "tabac.win:banco", "recycler.collect")
+    con.execute("BEGIN;")
+    con.executemany("INSERT OR IGNORE INTO ledger_reasons(reason) VALUES(?)", ((r,) for r in reasons))
+    con.executemany(
+        INSERT,
+        (
+            (WHALE, f"mendier:{1_000_000_000_000_000_000 + i}", rng.randint(-100, 300), rng.choice(reasons), now - rows + i)
+            for i in range(rows)
+        ),
+    )
+    con.executemany(
+        INSERT,
+        (
+            (str(400_000_000_000_000_000 + u % 10_000), f"mendier:{2_000_000_000_000_000_000 + u}", 10, "mendier", now - u)
+            for u in range(others)
+        ),
+    )
+    con.execute("COMMIT;")
+    con.execute("ANALYZE;")
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000, help="postings du joueur mesuré")
+    ap.add_argument("--others", type=int, default=500_000, help="postings des autres joueurs")
+    ap.add_argument("--repeat", type=int, default=300)
+    args = ap.parse_args()
+
+    use_temp_data_dir()
+    from bot.core.db.base import get_conn
+    from bot.core.db.migrations import migrate_if_needed
+    from bot.domain import economy as d_economy
+
+    con = get_conn()
+    migrate_if_needed(con)
+    _seed(con, args.rows, args.others)
+
+    page = 10
+    deep = (args.rows // page) - 2  # avant-dernière page
+
+    # curseur de la page profonde (obtenu une fois, comme le ferait la View)
+    ts, key = con.execute(
+        "SELECT ts, key_hash FROM ledger WHERE user_id=? ORDER BY ts DESC, key_hash DESC LIMIT 1 OFFSET ?",
+        (WHALE, deep * page - 1)
+    ).fetchone()
+
+    plan = con.execute(
+        "EXPLAIN QUERY PLAN SELECT ts, key_hash, delta, reason_id FROM ledger WHERE user_id=? "
+        "AND (ts, key_hash) < (?, ?) ORDER BY ts DESC, key_hash DESC LIMIT ?", (WHALE, ts, key, page + 1)
+    ).fetchall()
+    print("plan keyset:", " | ".join(r[3] for r in plan))
+
+    r = args.repeat
+    print(fmt_row("keyset page 1", measure(lambda: d_economy.history_page(int(WHALE), None, page), repeat=r)))
+    print(fmt_row(f"keyset page {deep + 1}", measure(lambda: d_economy.history_page(int(WHALE), (ts, key), page), repeat=r)))
+    offset_sql = ("SELECT ts, key_hash, delta, reason_id FROM ledger WHERE user_id=? "
+                  "ORDER BY ts DESC, key_hash DESC LIMIT ? OFFSET ?")
+    print(fmt_row(f"OFFSET page {deep + 1} (référence)",
+                  measure(lambda: con.execute(offset_sql, (WHALE, page + 1, deep * page)).fetchall(), repeat=max(5, r // 10))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# bench/loadgen.py
+"""
+Générateur de charge hors-ligne: rejoue les vrais flux de commandes (mendier, fouiller,
+tabac + bouton Gratter, shop buy, recyclerie) pour des milliers de joueurs synthétiques,
+en concurrence sur une seule event loop, contre une DB SQLite temporaire.
+Aucune connexion Discord: Interaction/Response/Message sont des bouchons, les sleeps
+d'animation sont neutralisés.
+
+    python -m bench.loadgen --users 2000 --concurrency 64 --rounds 1
+"""
+from __future__ import annotations
+import argparse, asyncio, collections, itertools, time
+
+from bench.common import use_temp_data_dir, percentiles
+
+# ─────────────────────────────
+# Bouchons discord.py (juste ce que les modules utilisent)
+# ─────────────────────────────
+_snowflakes = itertools.count(1_200_000_000_000_000_000)
+
+class FakeUser:
+    def __init__(self, uid: int) -> None:
+        self.id = uid
+        self.name = self.display_name = f"bench{uid % 100_000}"
+        self.mention = f"<@{uid}>"
+        self.bot = False
+
+class FakeMessage:
+    def __init__(self) -> None:
+        self.id = next(_snowflakes)
+        self.edits = 0
+
+    async def edit(self, **_: object) -> "FakeMessage":
+        self.edits += 1
+        return self
+
+class FakeResponse:
+    def __init__(self) -> None:
+        self._done = False
+        self.ephemeral = False       # réponse éphémère ≈ refus (cooldown, pas /start, ...)
+        self.view = None
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, content=None, *, ephemeral: bool = False, view=None, **_: object) -> None:
+        self._done, self.ephemeral, self.view = True, ephemeral, view
+
+    async def edit_message(self, **_: object) -> None:
+        self._done = True
+
+    async def defer(self, **_: object) -> None:
+        self._done = True
+
+class FakeFollowup:
+    async def send(self, *_: object, **__: object) -> FakeMessage:
+        return FakeMessage()
+
+class FakeInteraction:
+    def __init__(self, user: FakeUser, client) -> None:
+        self.id = next(_snowflakes)
+        self.user = user
+        self.client = client
+        self.guild = self.channel = None
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+        self._message = FakeMessage()
+
+    async def original_response(self) -> FakeMessage:
+        return self._message
+
+# ─────────────────────────────
+# Scénario
+# ─────────────────────────────
+class Recorder:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = collections.defaultdict(list)
+        self.refused: collections.Counter[str] = collections.Counter()
+        self.errors: collections.Counter[str] = collections.Counter()
+
+    async def call(self, label: str, fn, inter: FakeInteraction, *args, **kwargs) -> None:
+        t0 = time.perf_counter()
+        try:
+            await fn(inter, *args, **kwargs)
+        except Exception:
+            self.errors[label] += 1
+        finally:
+            self.samples[label].append(time.perf_counter() - t0)
+            if inter.response.ephemeral:
+                self.refused[label] += 1
+
+def _seed(users: list[int]) -> None:
+    from bot.domain import economy as d_economy, players as d_players, recycler as d_recycler, stats as d_stats
+    for uid in users:
+        d_players.update(uid, has_started=True)
+        d_economy.credit_once(uid, 5_000, reason="start.gift", idem_key="start:gift")
+        d_recycler.add_canettes(uid, 200)
+        d_stats.set_max(uid, "mendier_count", 5)   # débloque le gobelet au shop
+    d_stats.flush()
+
+async def _player(uid: int, client, cmds: dict, rec: Recorder, rounds: int) -> None:
+    from bot.modules.rp.tabac import TabacView
+    user = FakeUser(uid)
+    for _ in range(rounds):
+        await rec.call("hess mendier", cmds["hess mendier"], FakeInteraction(user, client))
+        await rec.call("hess fouiller", cmds["hess fouiller"], FakeInteraction(user, client))
+
+        inter = FakeInteraction(user, client)
+        await rec.call("tabac", cmds["tabac"], inter)
+        view = inter.response.view
+        if isinstance(view, TabacView):
+            view.message = await inter.original_response()
+            await rec.call("tabac gratter", view.btn_gratter.callback, FakeInteraction(user, client))
+            view.stop()
+
+        await rec.call("shop buy", cmds["shop buy"], FakeInteraction(user, client), item="gobelet")
+        await rec.call("recycler compresser", cmds["recycler compresser"], FakeInteraction(user, client))
+        await rec.call("recycler collecter", cmds["recycler collecter"], FakeInteraction(user, client), nb=1)
+
+async def _run(args) -> None:
+    import discord
+    from discord import app_commands
+    from bot.core import metrics
+    from bot.modules.rp import economy as m_economy, tabac as m_tabac, shop as m_shop, recycler as m_recycler
+
+    async def _no_sleep(_delay: float) -> None:
+        await asyncio.sleep(0)   # on garde le point de suspension (entrelacement réaliste), pas la durée
+    metrics.sleep = _no_sleep
+
+    client = discord.Client(intents=discord.Intents.none())
+    tree = app_commands.CommandTree(client)
+    for mod in (m_economy, m_tabac, m_recycler):
+        mod.register(tree, None, client)
+    m_shop.register(tree, None)
+    metrics.instrument_tree(tree)
+    cmds = {c.qualified_name: c.callback for c in tree.walk_commands() if isinstance(c, app_commands.Command)}
+
+    users = [1_000_000_000_000_000 + i for i in range(args.users)]
+    t0 = time.perf_counter()
+    _seed(users)
+    print(f"seed: {args.users} joueurs en {time.perf_counter() - t0:.1f}s")
+
+    rec = Recorder()
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async def one(uid: int) -> None:
+        async with sem:
+            await _player(uid, client, cmds, rec, args.rounds)
+
+    stmts0 = metrics.DB["statements"]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(u) for u in users))
+    wall = time.perf_counter() - t0
+    total = sum(len(v) for v in rec.samples.values())
+
+    print(f"\n{total} commandes en {wall:.2f}s → {total / wall:,.0f} cmd/s "
+          f"(concurrence {args.concurrency}, {(metrics.DB['statements'] - stmts0) / max(1, total):.1f} SQL/cmd)\n")
+    print(f"{'commande':<22} {'n':>6} {'refus':>6} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'SQL/cmd':>8}")
+    timed_names = {"tabac gratter": "view:TabacView.btn_gratter"}
+    for label, samples in rec.samples.items():
+        p = percentiles(samples)
+        st = metrics.COMMANDS.get(timed_names.get(label, label))
+        sql = st.statements / st.calls if st and st.calls else float("nan")
+        print(f"{label:<22} {len(samples):>6} {rec.refused[label]:>6} {rec.errors[label]:>4} "
+              f"{p['p50']:>8.3f} {p['p95']:>8.3f} {p['p99']:>8.3f} {sql:>8.1f}")
+
+    from bot.domain import stats as d_stats
+    d_stats.flush()
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--rounds", type=int, default=1, help="passages du scénario par joueur (les cooldowns s'appliquent)")
+    args = ap.parse_args()
+
+    data_dir = use_temp_data_dir()
+    from bot.core.db.base import get_conn
+    from bot.core.db.migrations import migrate_if_needed
+    migrate_if_needed(get_conn())
+    print(f"DB: {data_dir}")
+    asyncio.run(_run(args))
+
+if __name__ == "__main__":
+    main()
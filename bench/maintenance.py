@@ -0,0 +1,120 @@
+# bench/maintenance.py
+"""
+Travaux de bot/core/db/maintenance.py sur un jeu gendata:
+1. lectures par joueur sans statistiques (base jamais analysée) puis après optimize();
+2. WAL gonflé par un lecteur long (les checkpoints automatiques ne peuvent plus recycler le début du
+   WAL), puis checkpoint TRUNCATE: durée, taille du WAL avant/après, latence d'un écrivain concurrent;
+3. incremental_vacuum après suppression d'une partie des lignes.
+
+    python -m bench.maintenance --players 50000 --ledger-rows 1000000
+"""
+from __future__ import annotations
+import argparse, logging, random, sys, threading, time
+
+from bench.common import use_temp_data_dir, measure_for, fmt_row, percentiles
+
+
+def _reads(uids: list[int]) -> dict[str, dict]:
+    from bot.persistence import ledger, stats
+    rng = random.Random(5)
+    cases = {
+        "ledger.sum_balance": lambda: ledger.sum_balance(rng.choice(uids)),
+        "ledger.history_page": lambda: ledger.history_page(rng.choice(uids), None, 10),
+        "stats.top_by_key": lambda: stats.top_by_key("mendier_count", 10, 0),
+        "stats.all_for": lambda: stats.all_for(rng.choice(uids)),
+    }
+    return {name: measure_for(fn, seconds=0.5) for name, fn in cases.items()}
+
+def _writer(uids: list[int], stop: threading.Event, lat: list[float]) -> None:
+    from bot.persistence import ledger
+    rng = random.Random(3)
+    i = 0
+    while not stop.is_set():
+        s = time.perf_counter()
+        ledger.add_once(rng.choice(uids), f"bench:maint:{i}", 3, "mendier")
+        lat.append(time.perf_counter() - s)
+        i += 1
+        time.sleep(0.001)
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=50_000)
+    ap.add_argument("--ledger-rows", type=int, default=1_000_000)
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--wal-writes", type=int, default=20_000, help="postings écrits pendant le lecteur long")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="  %(message)s")
+    use_temp_data_dir("larue-maint-")
+    from bench import gendata
+    from bot.core.db import base, maintenance
+    from bot.core.db.migrations import migrate_if_needed
+    from bot.persistence import ledger
+
+    con = base.get_conn()
+    migrate_if_needed(con)
+    gargs = gendata._parser().parse_args(["--players", str(args.players), "--ledger-rows", str(args.ledger_rows),
+                                          "--days", str(args.days), "--seed", str(args.seed)])
+    gendata._init_worker(gargs)
+    per = max(1, int(gargs.chunk * gargs.players / max(1, gargs.ledger_rows)))
+    t0 = time.perf_counter()
+    for lo in range(0, args.players, per):
+        gendata._insert(con, gendata._gen_range((lo, min(args.players, lo + per))))
+    # base « jamais analysée » (les migrations sur base vide n'ont rien laissé d'utile)
+    con.execute("DELETE FROM sqlite_stat1")
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    print(f"génération: {time.perf_counter() - t0:.1f}s • DB: {base.DB_PATH}")
+    uids = [int(r[0]) for r in con.execute("SELECT user_id FROM players")]
+    sample = random.Random(args.seed).sample(uids, min(5000, len(uids)))
+
+    # ── 1. statistiques du planificateur
+    base._tls.con = None                                    # connexion neuve: pas de stats en cache
+    before = _reads(sample)
+    opt = maintenance.run("optimize")
+    base._tls.con = None
+    after = _reads(sample)
+
+    # ── 2. WAL: un lecteur long empêche le recyclage, puis checkpoint TRUNCATE sous écriture
+    reader = base._connect()
+    reader.execute("BEGIN")
+    reader.execute("SELECT COUNT(*) FROM players").fetchone()     # instantané tenu
+    for i in range(args.wal_writes):
+        ledger.add_once(sample[i % len(sample)], f"bench:wal:{i}", 1, "mendier")
+    reader.execute("COMMIT")
+    reader.close()
+    stop, lat = threading.Event(), []
+    th = threading.Thread(target=_writer, args=(sample, stop, lat), daemon=True)
+    th.start()
+    time.sleep(0.5)
+    n_before = len(lat)
+    ckpt = maintenance.run("checkpoint")
+    time.sleep(0.5)
+    stop.set()
+    th.join()
+    lat_around = lat[max(0, n_before - 200):]
+
+    # ── 3. incremental_vacuum
+    con = base.get_conn()
+    con.execute("DELETE FROM respect_log")
+    con.execute("DELETE FROM recycler_claims")
+    (pages_before,) = con.execute("PRAGMA page_count").fetchone()
+    vac = maintenance.run("vacuum")
+    (pages_after,) = con.execute("PRAGMA page_count").fetchone()
+
+    print(f"\noptimize: {opt['seconds'] * 1000:.0f} ms, ANALYZE de {', '.join(opt['tables'])}")
+    for name in before:
+        a, b = before[name], after[name]
+        print(fmt_row(f"{name} sans stats", a))
+        print(fmt_row(f"{name} après optimize ({b['ops_s'] / max(a['ops_s'], 1e-9):.2f}×)", b))
+    mib = 1024 ** 2
+    p = percentiles(lat_around)
+    print(f"\ncheckpoint TRUNCATE: WAL {ckpt['wal_before'] / mib:.1f} Mo → {ckpt['wal_after'] / mib:.1f} Mo "
+          f"en {ckpt['seconds'] * 1000:.0f} ms • écrivain autour: p50 {p['p50']:.2f} ms, p99 {p['p99']:.2f} ms, "
+          f"max {p['max']:.0f} ms")
+    print(f"incremental_vacuum: {vac['pages']:,} pages rendues en {vac['seconds'] * 1000:.0f} ms "
+          f"({pages_before:,} → {pages_after:,} pages)")
+    sys.exit(0 if ckpt["wal_after"] < ckpt["wal_before"] and vac["free_left"] == 0 else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# bench/persistence.py
+"""
+Micro-benchmarks de bot/persistence à tailles réalistes (10k / 100k / 1M lignes de ledger),
+avec baseline JSON et détection de régressions.
+
+    python -m bench.persistence                        # compare à la baseline si elle existe
+    python -m bench.persistence --save-baseline        # (ré)écrit la baseline
+    python -m bench.persistence --sizes 10000,100000 --threshold 0.3
+
+La DB grossit d'une taille à l'autre (on complète au lieu de tout ré-insérer).
+La baseline dépend de la machine: à générer sur la machine qui compare (env noté dedans).
+Code de sortie 1 si au moins une régression est détectée.
+"""
+from __future__ import annotations
+import argparse, itertools, json, os, platform, random, sqlite3, sys, time
+
+from bench.common import use_temp_data_dir, measure_for
+
+BASE_UID = 400_000_000_000_000_000
+USERS_PER_ROW = 10          # 1 joueur pour 10 lignes de ledger
+STAT_KEYS = ("mendier_count", "fouiller_count", "tabac_count", "recycler_best_streak")
+_FRESH = itertools.count()   # clés/jours jamais vus, partagé entre tailles
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "persistence.json")
+
+
+# ─────────────────────────────
+# Données
+# ─────────────────────────────
+def _reasons() -> list[str]:
+    """Raisons réelles du ledger (cf. modules rp et bench.gendata): tickets et objets lus dans les modules."""
+    from bot.modules.rp.items import ITEMS
+    from bot.modules.rp.tabac import TICKETS
+    return (["start.gift", "mendier", "fouiller", "fouiller.loss", "recycler.collect"]
+            + [f"tabac.{kind}:{k}" for k in TICKETS for kind in ("bet", "win")]
+            + [f"shop:{iid}" for iid in ITEMS])
+
+def _grow(con, rows_from: int, rows_to: int, rng: random.Random) -> None:
+    """Complète toutes les tables pour passer de rows_from à rows_to lignes de ledger."""
+    u_from, u_to = rows_from // USERS_PER_ROW, rows_to // USERS_PER_ROW
+    now = int(time.time())
+    uids = [str(BASE_UID + u) for u in range(u_from, u_to)]
+    con.execute("BEGIN;")
+    reasons = _reasons()
+    con.executemany("INSERT OR IGNORE INTO ledger_reasons(reason) VALUES(?)", ((r,) for r in reasons))
+    con.executemany(
+        "INSERT INTO ledger(user_id, key_hash, key_check, delta, reason_id, ts) "
+        "VALUES(?1, key_digest(?2), key_check(?2), ?3, (SELECT id FROM ledger_reasons WHERE reason=?4), ?5)",
+        (
+            (str(BASE_UID + rng.randrange(u_to)), f"seed:{i}", rng.randint(-300, 500),
+             rng.choice(reasons), now - rng.randrange(90 * 86400))
+            for i in range(rows_from, rows_to)
+        ),
+    )
+    con.executemany("INSERT INTO players(user_id, has_started, money) VALUES(?,1,0)", ((u,) for u in uids))
+    con.executemany("INSERT INTO stats(user_id, key, value) VALUES(?,?,?)",
+                    ((u, k, rng.randint(0, 500)) for u in uids for k in STAT_KEYS))
+    con.executemany("INSERT INTO actions(user_id, action, last_ts, day, count) VALUES(?,?,?,?,?)",
+                    ((u, a, now - rng.randrange(86400), "2026-01-01", rng.randint(0, 20))
+                     for u in uids for a in ("mendier", "fouiller")))
+    con.executemany("INSERT INTO inventory(user_id, item_id, qty) VALUES(?,?,?)",
+                    ((u, "gobelet", 1) for u in uids))
+    con.executemany("INSERT INTO recycler_state(user_id, level, canettes, sacs, streak, last_day) VALUES(?,?,?,?,?,?)",
+                    ((u, 1, rng.randint(0, 300), rng.randint(0, 5), rng.randint(0, 30), 0) for u in uids))
+    con.executemany("INSERT INTO profiles(user_id, bio, color_hex, title, cred) VALUES(?,?,?,?,?)",
+                    ((u, "", "FFD166", "", rng.randint(0, 100)) for u in uids))
+    con.execute("COMMIT;")
+    con.execute("ANALYZE;")
+
+
+# ─────────────────────────────
+# Cas mesurés
+# ─────────────────────────────
+def _cases(users: int, rng: random.Random) -> dict:
+    from bot.persistence import (actions, inventory, ledger, players, profiles, recycler, respect,
+                                 stats as stats_repo)
+    uid = lambda: str(BASE_UID + rng.randrange(users))   # noqa: E731
+
+    def add_once_new():
+        ledger.add_once(uid(), f"bench:{next(_FRESH)}:{time.perf_counter_ns()}", 10, "mendier")
+
+    def add_once_dup():
+        ledger.add_once(str(BASE_UID), "seed:0", 10, "mendier")
+
+    def respect_give():
+        n = next(_FRESH)
+        respect.give(str(BASE_UID + n % users), str(BASE_UID + (n + 1) % users), f"bench-{n}")
+
+    def stats_flush_100():
+        for _ in range(100):
+            stats_repo.bump(uid(), "mendier_count", 1)
+        stats_repo.flush()
+
+    return {
+        "ledger.add_once (nouvelle clé)": (add_once_new, 0.5),
+        "ledger.add_once (doublon)":      (add_once_dup, 0.5),
+        "ledger.sum_balance":             (lambda: ledger.sum_balance(uid()), 0.5),
+        "ledger.history_page":            (lambda: ledger.history_page(uid(), None, 10), 0.5),
+        "ledger.top_richest":             (lambda: ledger.top_richest(11, 0), 2.0),
+        "actions.get_state":              (lambda: actions.get_state(uid(), "mendier"), 0.5),
+        "actions.touch":                  (lambda: actions.touch(uid(), "mendier", int(time.time()), "2026-01-02", 1), 0.5),
+        "stats.incr":                     (lambda: stats_repo.incr(uid(), "mendier_count", 1), 0.5),
+        "stats.flush (100 deltas)":       (stats_flush_100, 0.5),
+        "stats.top_by_key":               (lambda: stats_repo.top_by_key("mendier_count", 11, 0), 0.5),
+        "inventory.add_item":             (lambda: inventory.add_item(uid(), "pancarte", 1), 0.5),
+        "inventory.get_inventory":        (lambda: inventory.get_inventory(uid()), 0.5),
+        "recycler.get_state":             (lambda: recycler.get_state(uid()), 0.5),
+        "recycler.upsert_state":          (lambda: recycler.upsert_state(uid(), canettes=rng.randint(0, 300)), 0.5),
+        "respect.give":                   (respect_give, 0.5),
+        "profiles.top_by_cred":           (lambda: profiles.top_by_cred(10), 1.0),
+        "players.top_richest":            (lambda: players.top_richest(10), 0.5),
+    }
+
+
+# ─────────────────────────────
+# Baseline & régressions
+# ─────────────────────────────
+def _env() -> dict:
+    return {"python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(), "system": platform.system()}
+
+def _compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Régression = p50 ou p95 au-delà de base×(1+seuil). On compare des percentiles plutôt que
+    ops/s (inverse de la moyenne, trop sensible à quelques pauses GC/fsync), avec un plancher
+    absolu pour ignorer le bruit sur les opérations de quelques µs.
+    """
+    out: list[str] = []
+    for key, r in results.items():
+        b = baseline.get(key)
+        if not b:
+            continue
+        for q, floor_ms in (("p50", 0.02), ("p95", 0.05)):
+            if r[q] > b[q] * (1 + threshold) and r[q] - b[q] > floor_ms:
+                out.append(f"{key}: {q} {r[q]:.3f} ms vs {b[q]:.3f} ({r[q] / b[q] - 1:+.0%})")
+                break
+    return out
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10000,100000,1000000", help="lignes de ledger, croissantes")
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--threshold", type=float, default=0.30)
+    ap.add_argument("--only", default="", help="sous-chaîne pour filtrer les cas")
+    args = ap.parse_args()
+    sizes = sorted(int(s) for s in args.sizes.split(",") if s.strip())
+
+    data_dir = use_temp_data_dir()
+    from bot.core.db.base import get_conn
+    from bot.core.db.migrations import migrate_if_needed
+    con = get_conn()
+    migrate_if_needed(con)
+    print(f"DB: {data_dir} • SQLite {sqlite3.sqlite_version}")
+
+    rng = random.Random(42)
+    results: dict[str, dict] = {}
+    done = 0
+    for size in sizes:
+        t0 = time.perf_counter()
+        _grow(con, done, size, rng)
+        done = size
+        users = size // USERS_PER_ROW
+        print(f"\n── {size:,} lignes de ledger, {users:,} joueurs (seed {time.perf_counter() - t0:.1f}s)")
+        for name, (fn, budget) in _cases(users, rng).items():
+            if args.only and args.only not in name:
+                continue
+            r = measure_for(fn, seconds=budget)
+            results[f"{size}:{name}"] = r
+            print(f"  {name:<32} {r['ops_s']:>10,.1f} ops/s   p50 {r['p50']:>8.3f} ms   "
+                  f"p95 {r['p95']:>8.3f} ms   p99 {r['p99']:>8.3f} ms   (n={r['n']})")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"env": _env(), "results": results}, f, indent=1, sort_keys=True)
+        print(f"\nBaseline écrite: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("\nPas de baseline (lance avec --save-baseline pour en créer une).")
+        return
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    if base.get("env") != _env():
+        print(f"\n⚠️ Environnement différent de la baseline: {base.get('env')} vs {_env()}")
+    regressions = _compare(results, base.get("results", {}), args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s) (seuil {args.threshold:.0%}):")
+        for line in regressions:
+            print("  " + line)
+        sys.exit(1)
+    print(f"\n✅ Aucune régression vs baseline (seuil {args.threshold:.0%}).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# bench/profiler.py
+"""
+Contrôle de bot/core/profiler.py (/admin profil): un thread qui dort (time.sleep, C sans frame Python),
+un qui attend un Event et un qui calcule doivent être classés respectivement en attente, en attente
+et actif. Affiche aussi le surcoût d'échantillonnage.
+
+    python -m bench.profiler --seconds 3 --interval-ms 5
+"""
+from __future__ import annotations
+import argparse, sys, threading, time
+
+from bench.common import use_temp_data_dir
+
+
+def _sleeper(stop: threading.Event) -> None:
+    while not stop.is_set():
+        time.sleep(0.05)
+
+def _waiter(stop: threading.Event) -> None:
+    stop.wait()
+
+def _busy(stop: threading.Event) -> None:
+    n = 0
+    while not stop.is_set():
+        n += sum(i * i for i in range(200))
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--interval-ms", type=float, default=5.0)
+    args = ap.parse_args()
+
+    use_temp_data_dir("larue-profiler-")
+    from bot.core import profiler
+
+    stop = threading.Event()
+    threads = [threading.Thread(target=fn, args=(stop,), name=name, daemon=True)
+               for name, fn in (("dormeur", _sleeper), ("attente", _waiter), ("calcul", _busy))]
+    for t in threads:
+        t.start()
+    try:
+        prof = profiler.run(args.seconds, args.interval_ms / 1000)
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+
+    print(f"{prof.samples} passes • surcoût {prof.overhead_pct:.1f}%")
+    print(f"{'thread':<14} {'actives':>8} {'attente':>8}")
+    for name, (active, idle) in sorted(prof.threads.items()):
+        print(f"{name:<14} {active:>8} {idle:>8}")
+
+    def idle_share(name: str) -> float:
+        active, idle = prof.threads.get(name, [0, 0])
+        return idle / max(1, active + idle)
+    ok = idle_share("dormeur") >= 0.95 and idle_share("attente") >= 0.95 and idle_share("calcul") <= 0.2
+    print("classement attente/actif:", "OK" if ok else "FAUX")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# bench/read_pool.py
+"""
+Connexions de lecture (base.reading) sous écriture, façon event loop du bot: des commandes de
+lecture (classements, profil, historique, stats, inventaire) et d'écriture (postings + flush de stats
+par gros lots) arrivent à débit fixe (arrivées de Poisson, latence comptée depuis l'arrivée prévue,
+attente de la boucle comprise). Trois scénarios:
+- boucle/rw : lectures dans la boucle sur la connexion lecture-écriture du thread (avant);
+- boucle/pool: lectures dans la boucle sur le pool query_only + mmap;
+- thread/pool: lectures via asyncio.to_thread sur le pool (plus de file derrière les écritures).
+Avant: scan complet du ledger (classement argent) seul, connexion rw vs pool (mmap).
+Puis: instantané cohérent pendant un bloc reading() sous écriture, et refus d'écrire (query_only).
+
+    python -m bench.read_pool --players 50000 --ledger-rows 1000000 --seconds 10
+"""
+from __future__ import annotations
+import argparse, asyncio, random, sqlite3, sys, threading, time
+from contextlib import contextmanager
+
+from bench.common import use_temp_data_dir, measure_for, fmt_row, percentiles
+
+READ_MODULES = ("inventory", "ledger", "players", "profiles", "rollups", "snapshots", "stats")
+
+
+@contextmanager
+def _legacy_reading():
+    from bot.core.db.base import get_conn
+    yield get_conn()
+
+def _use_pool(on: bool) -> None:
+    import importlib
+    from bot.core.db import base
+    for name in READ_MODULES:
+        importlib.import_module(f"bot.persistence.{name}").reading = base.reading if on else _legacy_reading
+
+def _reader(uids: list[int], seed: int):
+    from bot.domain import economy, inventory, leaderboards, stats
+    rng = random.Random(seed)
+    boards = list(leaderboards.BOARDS)
+    ops = [
+        (30, lambda: economy.balance(rng.choice(uids))),
+        (20, lambda: economy.history_page(rng.choice(uids), None, 10)),
+        (20, lambda: stats.all_for(rng.choice(uids))),
+        (15, lambda: inventory.get(rng.choice(uids))),
+        (15, lambda: leaderboards.page(rng.choice(boards), rng.randrange(3))),
+    ]
+    fns, weights = [f for _, f in ops], [w for w, _ in ops]
+    return lambda: rng.choices(fns, weights)[0]()
+
+def _write(uids: list[int], rng: random.Random, i: int) -> None:
+    from bot.core.db.base import atomic
+    from bot.persistence import ledger
+    if i % 20 == 0:
+        # flush de stats write-behind: une grosse transaction (verrou d'écriture tenu ~10 ms)
+        with atomic() as con:
+            con.executemany("INSERT INTO stats(user_id, key, value) VALUES(?, 'bench_count', 1) "
+                            "ON CONFLICT(user_id, key) DO UPDATE SET value = value + 1",
+                            [(u,) for u in rng.sample(uids, 2000)])
+    else:
+        ledger.add_once(rng.choice(uids), f"bench:pool:{i}:{rng.random()}", 3, "mendier")
+
+async def _scenario(uids: list[int], *, offload: bool, seconds: float, read_rate: float,
+                    write_rate: float, clients: int) -> dict[str, list[float]]:
+    from bot.domain import leaderboards
+    leaderboards.invalidate()
+    rlat: list[float] = []
+    wlat: list[float] = []
+    end = time.perf_counter() + seconds
+
+    async def read_client(seed: int) -> None:
+        fn, rng = _reader(uids, seed), random.Random(seed)
+        t = time.perf_counter()
+        while True:
+            t += rng.expovariate(read_rate / clients)
+            if t >= end:
+                return
+            await asyncio.sleep(max(0.0, t - time.perf_counter()))
+            if offload:
+                await asyncio.to_thread(fn)
+            else:
+                fn()
+            rlat.append(time.perf_counter() - t)
+
+    async def write_client() -> None:
+        rng, i = random.Random(7), 0
+        t = time.perf_counter()
+        while True:
+            t += rng.expovariate(write_rate)
+            if t >= end:
+                return
+            await asyncio.sleep(max(0.0, t - time.perf_counter()))
+            _write(uids, rng, i)           # écritures toujours dans la boucle, comme en prod
+            wlat.append(time.perf_counter() - t)
+            i += 1
+
+    await asyncio.gather(write_client(), *(read_client(100 + k) for k in range(clients)))
+    return {"read": rlat, "write": wlat}
+
+def _snapshot_check(uids: list[int]) -> tuple[bool, bool]:
+    """(deux lectures d'un même bloc identiques malgré les écritures, écriture refusée sur le pool)."""
+    from bot.core.db.base import reading
+    stop = threading.Event()
+    def writer() -> None:
+        from bot.persistence import ledger
+        rng, i = random.Random(9), 0
+        while not stop.is_set():
+            ledger.add_once(rng.choice(uids), f"bench:snap:{i}", 1, "mendier")
+            i += 1
+    th = threading.Thread(target=writer, daemon=True)
+    th.start()
+    try:
+        with reading() as con:
+            a = con.execute("SELECT COUNT(*), COALESCE(SUM(delta), 0) FROM ledger").fetchone()
+            time.sleep(0.3)
+            b = con.execute("SELECT COUNT(*), COALESCE(SUM(delta), 0) FROM ledger").fetchone()
+    finally:
+        stop.set()
+        th.join()
+    try:
+        with reading() as con:
+            con.execute("DELETE FROM meta WHERE key = 'bench'")
+        refused = False
+    except sqlite3.OperationalError:
+        refused = True
+    return tuple(a) == tuple(b), refused
+
+def _fmt(name: str, lat: list[float]) -> str:
+    p = percentiles(lat)
+    return (f"{name:<22} {len(lat):>7,}   p50 {p['p50']:>7.2f} ms   p95 {p['p95']:>7.2f} ms   "
+            f"p99 {p['p99']:>7.2f} ms   max {p['max']:>6.0f} ms")
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=50_000)
+    ap.add_argument("--ledger-rows", type=int, default=1_000_000)
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--seconds", type=float, default=10.0, help="durée de chaque scénario")
+    ap.add_argument("--read-rate", type=float, default=400.0, help="lectures/s (toutes sources)")
+    ap.add_argument("--write-rate", type=float, default=100.0, help="écritures/s")
+    ap.add_argument("--clients", type=int, default=8, help="sources de lecture concurrentes")
+    args = ap.parse_args()
+
+    use_temp_data_dir("larue-pool-")
+    from bench import gendata
+    from bot.core.config import settings
+    from bot.core.db import base
+    from bot.core.db.migrations import migrate_if_needed
+
+    con = base.get_conn()
+    migrate_if_needed(con)
+    gargs = gendata._parser().parse_args(["--players", str(args.players), "--ledger-rows", str(args.ledger_rows),
+                                          "--days", str(args.days), "--seed", str(args.seed)])
+    gendata._init_worker(gargs)
+    per = max(1, int(gargs.chunk * gargs.players / max(1, gargs.ledger_rows)))
+    t0 = time.perf_counter()
+    for lo in range(0, args.players, per):
+        gendata._insert(con, gendata._gen_range((lo, min(args.players, lo + per))))
+    con.execute("ANALYZE")
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    print(f"génération: {time.perf_counter() - t0:.1f}s • DB: {base.DB_PATH} • mmap {settings.db_mmap_mb} Mo "
+          f"• pool {settings.db_read_pool}")
+    uids = [int(r[0]) for r in con.execute("SELECT user_id FROM players")]
+    sample = random.Random(args.seed).sample(uids, min(5000, len(uids)))
+
+    from bot.persistence import ledger
+    scans = {}
+    for pool in (False, True):
+        _use_pool(pool)
+        scans[pool] = measure_for(lambda: ledger.top_richest(11, 0), seconds=2.0)
+
+    results = {}
+    for name, pool, offload in (("boucle/rw", False, False), ("boucle/pool", True, False),
+                                ("thread/pool", True, True)):
+        _use_pool(pool)
+        results[name] = asyncio.run(_scenario(sample, offload=offload, seconds=args.seconds,
+                                              read_rate=args.read_rate, write_rate=args.write_rate,
+                                              clients=args.clients))
+    _use_pool(True)
+    same, refused = _snapshot_check(sample)
+
+    print()
+    print(fmt_row("scan ledger (top_richest), connexion rw", scans[False]))
+    print(fmt_row("scan ledger (top_richest), pool query_only", scans[True]))
+    print(f"\n{args.read_rate:.0f} lectures/s ({args.clients} sources) + {args.write_rate:.0f} écritures/s "
+          f"pendant {args.seconds:.0f}s, latence depuis l'arrivée:")
+    for name, r in results.items():
+        print(_fmt(f"{name} lectures", r["read"]))
+        print(_fmt(f"{name} écritures", r["write"]))
+    print(f"\ninstantané stable sous écriture: {'oui' if same else 'NON'} • écriture refusée (query_only): "
+          f"{'oui' if refused else 'NON'}")
+    sys.exit(0 if same and refused else 1)
+
+if __name__ == "__main__":
+    main()
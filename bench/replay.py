@@ -0,0 +1,214 @@
+# bench/replay.py
+"""
+Rejeu déterministe d'un journal de trafic (TRAFFIC_RECORD=1 → DATA_DIR/traffic/*.jsonl) contre un
+snapshot de la DB, hors-ligne et aussi vite que possible:
+- horloge simulée: clock.now() renvoie l'heure enregistrée de chaque évènement;
+- RNG: les tirages sont dérivés de l'id d'interaction (mendier, fouiller, tabac), donc identiques;
+- évènements rejoués un par un dans l'ordre du journal, sleeps d'animation neutralisés.
+
+    python -m bench.replay --db snapshot.db data/traffic/traffic-20261018.jsonl
+    python -m bench.replay --db snapshot.db --out replay.db --expect prod-fin-de-journee.db traffic/*.jsonl
+
+--expect compare l'état final table par table (colonnes horodatées par SQLite exclues) et sort en 1
+s'il diverge. Pour comparer deux builds: rejouer avec chacun (--out), puis l'un avec --expect l'autre.
+Limite: en prod les commandes s'entrelacent pendant les animations; ici elles sont sérialisées.
+"""
+from __future__ import annotations
+import argparse, asyncio, collections, glob, importlib, json, os, shutil, sqlite3, sys, time
+
+from bench.common import use_temp_data_dir, percentiles
+
+DEFAULT_SKIP = "admin profil,admin memoire"
+# Colonnes remplies par strftime('%s','now') côté SQLite: différentes à chaque exécution
+VOLATILE = {"profiles": {"created_ts"}, "recycler_state": {"updated_ts"},
+            "recycler_claims": {"id", "ts"}, "respect_log": {"ts"}}
+
+
+def _load(paths: list[str]) -> list[dict]:
+    files: list[str] = []
+    for p in paths:
+        files.extend(sorted(glob.glob(os.path.join(p, "*.jsonl"))) if os.path.isdir(p) else [p])
+    events: list[dict] = []
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            events.extend(json.loads(line) for line in f if line.strip())
+    return events
+
+def _decode(v, FakeUser):
+    import discord
+    from discord import app_commands
+    if isinstance(v, list):
+        return [_decode(x, FakeUser) for x in v]
+    if not isinstance(v, dict):
+        return v
+    if "choice" in v:
+        return app_commands.Choice(name=v.get("name", str(v["choice"])), value=v["choice"])
+    if "user" in v:
+        return FakeUser(int(v["user"]))
+    return discord.Object(id=int(next(iter(v.values()))))
+
+def _register_all(tree, client) -> None:
+    from bot.core.client import MODULES_GLOBAL, MODULES_TEST_ONLY
+    for dotted in MODULES_GLOBAL + MODULES_TEST_ONLY:
+        mod = importlib.import_module(dotted)
+        fn = getattr(mod, "register", None)
+        if fn is None:
+            continue
+        for params in ((tree, None, client), (tree, None), (tree,)):
+            try:
+                fn(*params)
+                break
+            except TypeError:
+                continue
+
+def _diff(con: sqlite3.Connection, expect: str, examples: int = 3) -> dict[str, tuple[int, int, list]]:
+    """table -> (lignes seulement ici, lignes seulement dans --expect, exemples)."""
+    con.execute("ATTACH DATABASE ? AS e", (expect,))
+    try:
+        out: dict[str, tuple[int, int, list]] = {}
+        tables = [r[0] for r in con.execute(
+            "SELECT name FROM main.sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' "
+            "AND name IN (SELECT name FROM e.sqlite_master WHERE type='table') ORDER BY name")]
+        for t in tables:
+            cols = [r[1] for r in con.execute(f"PRAGMA main.table_info({t})") if r[1] not in VOLATILE.get(t, ())]
+            sel = ", ".join(cols)
+            mine = f"SELECT {sel} FROM main.{t} EXCEPT SELECT {sel} FROM e.{t}"
+            theirs = f"SELECT {sel} FROM e.{t} EXCEPT SELECT {sel} FROM main.{t}"
+            (a,) = con.execute(f"SELECT COUNT(*) FROM ({mine})").fetchone()
+            (b,) = con.execute(f"SELECT COUNT(*) FROM ({theirs})").fetchone()
+            if a or b:
+                ex = [("+", r) for r in con.execute(f"{mine} LIMIT {examples}")]
+                ex += [("-", r) for r in con.execute(f"{theirs} LIMIT {examples}")]
+                out[t] = (a, b, ex)
+        return out
+    finally:
+        con.execute("DETACH DATABASE e")
+
+async def _replay(events: list[dict], skip: set[str]) -> dict:
+    import discord
+    from discord import app_commands
+    from bench.loadgen import FakeInteraction, FakeUser
+    from bot.core import metrics, traffic
+    from bot.domain import clock
+
+    async def _no_sleep(_delay: float) -> None:
+        return None
+    metrics.sleep = _no_sleep
+    traffic.ENABLED = False          # ne pas ré-enregistrer le rejeu
+
+    client = discord.Client(intents=discord.Intents.none())
+    tree = app_commands.CommandTree(client)
+    _register_all(tree, client)
+    cmds = {c.qualified_name: c.callback for c in tree.walk_commands() if isinstance(c, app_commands.Command)}
+
+    now = {"t": events[0]["t"] if events else time.time()}
+    clock.set_source(lambda: now["t"])
+    views: dict[int, object] = {}
+    samples: dict[str, list[float]] = collections.defaultdict(list)
+    refused: collections.Counter[str] = collections.Counter()
+    errors: collections.Counter[str] = collections.Counter()
+    skipped: collections.Counter[str] = collections.Counter()
+
+    t0 = time.perf_counter()
+    try:
+        for ev in events:
+            name = ev["c"]
+            now["t"] = ev["t"]
+            inter = FakeInteraction(FakeUser(int(ev["u"])), client)
+            inter.id = int(ev["i"])
+            inter.guild_id = ev.get("g")
+            kwargs = {k: _decode(v, FakeUser) for k, v in ev.get("o", {}).items()}
+
+            if name.startswith("view:"):
+                view = views.get(ev.get("v"))
+                item = getattr(view, name.rsplit(".", 1)[-1], None) if view is not None else None
+                if item is None:
+                    skipped[f"{name} (View absente)"] += 1
+                    continue
+                if "s" in ev:
+                    item._values = [_decode(x, FakeUser) for x in ev["s"]]
+                fn, args = item.callback, (inter,)
+            elif name in cmds and name not in skip:
+                fn, args = cmds[name], (inter,)
+            else:
+                skipped[name] += 1
+                continue
+
+            s = time.perf_counter()
+            try:
+                await fn(*args, **kwargs)
+            except Exception:
+                errors[name] += 1
+            samples[name].append(time.perf_counter() - s)
+            if inter.response.ephemeral:
+                refused[name] += 1
+            if inter.response.view is not None:
+                views[inter.id] = inter.response.view
+    finally:
+        clock.set_source(None)
+    wall = time.perf_counter() - t0
+
+    from bot.domain import stats as d_stats
+    d_stats.flush()
+    for v in views.values():
+        v.stop()
+    return {"wall": wall, "samples": samples, "refused": refused, "errors": errors, "skipped": skipped}
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("logs", nargs="+", help="fichiers .jsonl ou dossiers (DATA_DIR/traffic)")
+    ap.add_argument("--db", required=True, help="snapshot de départ (copié, jamais modifié)")
+    ap.add_argument("--expect", help="DB attendue en fin de rejeu (prod, ou rejeu d'un autre build)")
+    ap.add_argument("--out", help="copie de la DB rejouée (VACUUM INTO)")
+    ap.add_argument("--skip", default=DEFAULT_SKIP, help="commandes ignorées, séparées par des virgules")
+    args = ap.parse_args()
+
+    data_dir = use_temp_data_dir("larue-replay-")
+    src = sqlite3.connect(f"file:{os.path.abspath(args.db)}?mode=ro", uri=True)
+    dst = sqlite3.connect(os.path.join(data_dir, "larue.db"))
+    src.backup(dst)
+    src.close()
+    dst.close()
+
+    from bot.core.db.base import get_conn
+    from bot.core.db.migrations import migrate_if_needed
+    con = get_conn()
+    migrate_if_needed(con)
+    con.execute("PRAGMA synchronous=OFF;")   # rejeu jetable: pas besoin de durabilité
+
+    events = _load(args.logs)
+    print(f"DB: {data_dir} • {len(events):,} évènements")
+    r = asyncio.run(_replay(events, {s.strip() for s in args.skip.split(",") if s.strip()}))
+
+    total = sum(len(v) for v in r["samples"].values())
+    print(f"\n{total:,} rejoués en {r['wall']:.2f}s → {total / max(r['wall'], 1e-9):,.0f} évènements/s")
+    print(f"{'commande':<32} {'n':>7} {'refus':>6} {'err':>5} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, xs in sorted(r["samples"].items(), key=lambda kv: -len(kv[1])):
+        p = percentiles(xs)
+        print(f"{name:<32} {len(xs):>7} {r['refused'][name]:>6} {r['errors'][name]:>5} {p['p50']:>8.3f} {p['p95']:>8.3f}")
+    for name, n in r["skipped"].most_common():
+        print(f"  ignoré: {name} ×{n}")
+
+    if args.out:
+        if os.path.exists(args.out):
+            os.remove(args.out)
+        con.execute("VACUUM INTO ?", (os.path.abspath(args.out),))
+        print(f"\nDB rejouée: {args.out}")
+
+    diverged = False
+    if args.expect:
+        diff = _diff(con, os.path.abspath(args.expect))
+        diverged = bool(diff)
+        if not diff:
+            print("\n✅ Aucune divergence d'état.")
+        for table, (mine, theirs, ex) in diff.items():
+            print(f"\n❌ {table}: {mine} ligne(s) seulement au rejeu, {theirs} seulement attendue(s)")
+            for side, row in ex:
+                print(f"   {side} {tuple(row)}")
+
+    if not os.environ.get("BENCH_DATA_DIR"):
+        shutil.rmtree(data_dir, ignore_errors=True)
+    sys.exit(1 if diverged else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# bench/retention.py
+"""
+Rétention des journaux (respect_log, actions, recycler_claims) sur un jeu gendata: lignes purgées
+par table, pages rendues au fichier (incremental_vacuum), durée, et latence d'un écrivain
+concurrent pendant la purge (lots courts → jamais bloqué longtemps).
+
+    python -m bench.retention --players 50000 --ledger-rows 1000000 --respect 30
+    python -m bench.retention --players 20000 --archive --batch 2000
+"""
+from __future__ import annotations
+import argparse, logging, os, random, sys, threading, time
+
+from bench.common import use_temp_data_dir, percentiles
+
+
+def _writer(uids: list[int], stop: threading.Event, lat: list[float]) -> None:
+    """Écrivain façon prod: respect + quota d'action du jour, un tour toutes les 2 ms."""
+    from bot.domain import quotas, respect
+    rng = random.Random(3)
+    while not stop.is_set():
+        a, b = rng.sample(uids, 2)
+        s = time.perf_counter()
+        quotas.check_and_touch(a, "mendier", 0, 10**9)
+        try:
+            respect.give(a, b)
+        except ValueError:
+            pass   # déjà donné aujourd'hui
+        lat.append(time.perf_counter() - s)
+        time.sleep(0.002)
+
+def _counts(con) -> dict[str, int]:
+    return {t: int(con.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0])
+            for t in ("respect_log", "actions", "recycler_claims")}
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=50_000)
+    ap.add_argument("--ledger-rows", type=int, default=1_000_000)
+    ap.add_argument("--days", type=int, default=180)
+    ap.add_argument("--respect", type=int, default=30, help="respect reçu moyen par joueur")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--batch", type=int, default=0, help="lignes parcourues par lot (0 = RETENTION_BATCH)")
+    ap.add_argument("--archive", action="store_true", help="archive.db au lieu de supprimer")
+    ap.add_argument("--no-writer", action="store_true")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="  %(message)s")
+    use_temp_data_dir("larue-retention-")
+    from bench import gendata
+    from bot.core.config import settings
+    from bot.core.db.base import get_conn, DB_PATH
+    from bot.core.db.migrations import migrate_if_needed
+    from bot.domain import retention
+
+    con = get_conn()
+    migrate_if_needed(con)
+    gargs = gendata._parser().parse_args(["--players", str(args.players), "--ledger-rows", str(args.ledger_rows),
+                                          "--days", str(args.days), "--respect", str(args.respect),
+                                          "--seed", str(args.seed)])
+    gendata._init_worker(gargs)
+    per = max(1, int(gargs.chunk * gargs.players / max(1, gargs.ledger_rows)))
+    t0 = time.perf_counter()
+    for lo in range(0, args.players, per):
+        gendata._insert(con, gendata._gen_range((lo, min(args.players, lo + per))))
+    # gendata ne remplit pas `actions`: état de quota au dernier jour d'activité de chaque joueur
+    rng = random.Random(args.seed)
+    uids = [int(r[0]) for r in con.execute("SELECT user_id FROM players")]
+    days = gendata.Generator(gargs, 0).days
+    con.execute("BEGIN")
+    con.executemany("INSERT INTO actions(user_id, action, last_ts, day, count) VALUES(?,?,0,?,?)",
+                    ((u, a, days[-min(len(days), int(rng.paretovariate(0.7)))], rng.randint(1, 20))
+                     for u in uids for a in ("mendier", "fouiller", "tabac")))
+    con.execute("COMMIT")
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    print(f"génération: {time.perf_counter() - t0:.1f}s • DB: {DB_PATH}")
+
+    if args.batch:
+        settings.retention_batch = args.batch
+    settings.retention_archive = args.archive
+    before = _counts(con)
+    (pages_before,) = con.execute("PRAGMA page_count").fetchone()
+
+    stop, lat = threading.Event(), []
+    th = None
+    if not args.no_writer:
+        th = threading.Thread(target=_writer, args=(rng.sample(uids, min(5000, len(uids))), stop, lat), daemon=True)
+        th.start()
+    t0 = time.perf_counter()
+    report = retention.run_daily()
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    if th is not None:
+        th.join()
+    after = _counts(con)
+    (pages_after,) = con.execute("PRAGMA page_count").fetchone()
+    (page_size,) = con.execute("PRAGMA page_size").fetchone()
+
+    print(f"\nrétention: {elapsed:.1f}s • {len(lat):,} écritures concurrentes"
+          + (f" (p50 {percentiles(lat)['p50']:.2f} ms, p99 {percentiles(lat)['p99']:.2f} ms, "
+             f"max {percentiles(lat)['max']:.0f} ms)" if lat else ""))
+    print(f"\n{'table':<18} {'avant':>10} {'purgées':>10} {'après':>10}")
+    for t in before:
+        print(f"{t:<18} {before[t]:>10,} {report.get(t, 0):>10,} {after[t]:>10,}")
+    mib = page_size / 1024 ** 2
+    print(f"fichier: {pages_before * mib:.1f}Mo → {pages_after * mib:.1f}Mo ({report['pages']:,} pages rendues)")
+    if args.archive:
+        print(f"archive: {os.path.getsize(os.path.join(os.path.dirname(DB_PATH), 'archive.db')) / 1024 ** 2:.1f}Mo")
+    ok = all(before[t] - report.get(t, 0) <= after[t] for t in before)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
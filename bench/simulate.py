@@ -0,0 +1,344 @@
+# bench/simulate.py
+"""
+Simulateur d'économie hors-ligne, vectorisé (NumPy), pour l'équilibrage: N joueurs × D jours
+en quelques secondes, sans DB.
+
+Les formules ne sont pas recopiées: les fonctions du jeu (economy.mendier_amount / fouiller_gain,
+recycler._value_per_sac, boosts.power_from_inventory) sont évaluées une fois sur toutes leurs
+entrées possibles pour construire des tables, puis indexées par des tableaux de joueurs.
+Les constantes (MENDIER_*, FOUILLER_*, SAC_VALUE_BY_LEVEL, STREAK_*, TICKETS, ITEMS, ...) sont
+lues dans les modules et peuvent être surchargées avec --set pour tester un réglage.
+
+    pip install numpy   # dépendance du bench uniquement
+    python -m bench.simulate --players 100000 --days 90
+    python -m bench.simulate --set MENDIER_MAX_CENTS=80 --set "SAC_VALUE_BY_LEVEL={1: 150, 2: 200, 3: 280}"
+    python -m bench.simulate --json /tmp/sim.json
+
+Modèle de comportement (réglable): engagement ~ Beta par joueur = proba d'être actif un jour donné
+et intensité d'usage (nb de mendier/fouiller ~ Binomiale(cap du jour, engagement)). Ordre d'une
+journée: mendier, fouiller (+ drop de canettes), recyclerie (compresser tout + collecter le
+rattrapage), tabac, shop (achat glouton dès que débloqué et payable).
+"""
+from __future__ import annotations
+import argparse, ast, json, time
+
+import numpy as np
+
+from bench.common import use_temp_data_dir
+
+DEFAULT_TICKET_MIX = "banco=55,astro=20,goal=12,cash=9,million=4"
+SOURCES = ("start.gift", "mendier", "fouiller", "fouiller.loss", "recycler.collect", "tabac.bet", "tabac.win", "shop")
+
+
+def _modules():
+    from bot.modules.rp import boosts, economy, items, recycler, start, tabac
+    return {"economy": economy, "recycler": recycler, "start": start, "tabac": tabac, "items": items, "boosts": boosts}
+
+def _apply_overrides(mods: dict, specs: list[str]) -> None:
+    """--set NOM=valeur: remplace la constante dans le premier module qui la définit."""
+    for spec in specs:
+        name, _, raw = spec.partition("=")
+        name = name.strip()
+        owner = next((m for m in mods.values() if hasattr(m, name)), None)
+        if owner is None:
+            raise SystemExit(f"--set: constante inconnue {name!r}")
+        value = ast.literal_eval(raw.strip())
+        current = getattr(owner, name)
+        if isinstance(current, dict) and isinstance(value, dict):
+            current.clear()          # même objet: les autres modules qui l'ont importé voient la modif
+            current.update(value)
+        else:
+            setattr(owner, name, value)
+        print(f"  {owner.__name__}.{name} = {value!r}")
+
+def _weights(spec: str, keys: list[str]) -> np.ndarray:
+    w = dict.fromkeys(keys, 0.0)
+    for part in spec.split(","):
+        k, _, v = part.partition("=")
+        if k.strip() not in w:
+            raise SystemExit(f"--ticket-mix: ticket inconnu {k.strip()!r}")
+        w[k.strip()] = float(v)
+    arr = np.array([w[k] for k in keys], dtype=np.float64)
+    return arr / arr.sum()
+
+
+class Tables:
+    """Formules du jeu tabulées sur toutes leurs entrées (inventaire = masque de bits sur ITEMS)."""
+
+    def __init__(self, mods: dict) -> None:
+        eco, recy, boosts = mods["economy"], mods["recycler"], mods["boosts"]
+        self.items = list(mods["items"].ITEMS.items())
+        self.price = np.array([int(it["price"]) for _, it in self.items], dtype=np.int64)
+        n_masks = 1 << len(self.items)
+        powers = [boosts.power_from_inventory({iid: 1 for b, (iid, _) in enumerate(self.items) if m >> b & 1})
+                  for m in range(n_masks)]
+
+        # mendier: AM[masque, base - MIN, flat - flat_min(masque)]
+        self.m_min, self.m_max = int(eco.MENDIER_MIN_CENTS), int(eco.MENDIER_MAX_CENTS)
+        self.flat_min = np.array([int(p["mendier_flat_min"]) if p["mendier_flat_max"] > 0 else 0 for p in powers])
+        self.flat_span = np.array([max(0, int(p["mendier_flat_max"]) - int(p["mendier_flat_min"]))
+                                   if p["mendier_flat_max"] > 0 else 0 for p in powers])
+        self.AM = np.zeros((n_masks, self.m_max - self.m_min + 1, int(self.flat_span.max()) + 1), dtype=np.int64)
+        for m, p in enumerate(powers):
+            for b in range(self.m_min, self.m_max + 1):
+                for f in range(self.flat_span[m] + 1):
+                    self.AM[m, b - self.m_min, f] = eco.mendier_amount(b, self.flat_min[m] + f, float(p["mendier_mult"]))
+
+        # fouiller: FG[masque, roll - GOOD_MIN]
+        self.f_min, self.f_max = int(eco.FOUILLER_GOOD_MIN), int(eco.FOUILLER_GOOD_MAX)
+        self.FG = np.array([[eco.fouiller_gain(r, float(p["fouiller_mult"])) for r in range(self.f_min, self.f_max + 1)]
+                            for p in powers], dtype=np.int64)
+        self.good_p, self.bad_p, self.loss = float(eco.FOUILLER_GOOD_P), float(eco.FOUILLER_BAD_P), int(eco.FOUILLER_BAD_LOSS)
+        self.m_cap, self.f_cap = int(eco.MENDIER_DAILY_CAP), int(eco.FOUILLER_DAILY_CAP)
+
+        # canettes: même calcul que maybe_grant_canettes_after_fouiller
+        self.drop_p = np.array([max(0.0, min(0.99, recy.CANETTE_DROP_PROB * float(p["recy_canette_prob_mult"])))
+                                for p in powers])
+        self.drop_bonus = np.array([max(0, int(p["recy_canette_roll_bonus"])) for p in powers], dtype=np.int64)
+        self.drop_min, self.drop_max = int(recy.CANETTE_DROP_MIN), int(recy.CANETTE_DROP_MAX)
+
+        # recyclerie: SV[niveau, streak] = _value_per_sac
+        self.per_sac_cans = int(recy.CANETTES_PAR_SAC)
+        self.backlog, self.streak_cap = int(recy.BACKLOG_MAX_DAYS), int(recy.STREAK_CAP_DAYS)
+        levels = max(recy.SAC_VALUE_BY_LEVEL)
+        self.SV = np.array([[recy._value_per_sac(lv, s) for s in range(self.streak_cap + 1)]
+                            for lv in range(levels + 1)], dtype=np.int64)
+
+        # tabac: pools en CDF, complétées à la même longueur
+        tickets = list(mods["tabac"].TICKETS.items())
+        self.ticket_keys = [k for k, _ in tickets]
+        self.t_price = np.array([int(t["price"]) for _, t in tickets], dtype=np.int64)
+        width = max(len(t["pool"]) for _, t in tickets)
+        self.t_cdf = np.ones((len(tickets), width))
+        self.t_val = np.zeros((len(tickets), width), dtype=np.int64)
+        for i, (_, t) in enumerate(tickets):
+            w = np.array([float(x) for _, x in t["pool"]])
+            self.t_cdf[i, :len(w)] = np.cumsum(w) / w.sum()
+            self.t_val[i, :len(w)] = [int(v) for v, _ in t["pool"]]
+            self.t_val[i, len(w):] = self.t_val[i, len(w) - 1]
+
+        self.unlock = [dict(it.get("unlock_cmd") or {}) for _, it in self.items]
+        self.start_money = int(mods["start"].START_MONEY_CENTS)
+
+
+def simulate(tb: Tables, args) -> dict:
+    rng = np.random.default_rng(args.seed)
+    n = args.players
+    bal = np.full(n, tb.start_money, dtype=np.int64)
+    eng = rng.beta(args.engagement[0], args.engagement[1], n)
+    recy_user = rng.random(n) < args.recycler_share
+    mask = np.zeros(n, dtype=np.int64)
+    stats = {k: np.zeros(n, dtype=np.int64) for req in tb.unlock for k in req}
+    stats.setdefault("mendier_count", np.zeros(n, dtype=np.int64))
+    stats.setdefault("fouiller_count", np.zeros(n, dtype=np.int64))
+    canettes = np.zeros(n, dtype=np.int64)
+    sacs = np.zeros(n, dtype=np.int64)
+    streak = np.zeros(n, dtype=np.int64)
+    last_day = np.full(n, -1, dtype=np.int64)
+    level = np.ones(n, dtype=np.int64)
+    bought = np.full((len(tb.items), n), -1, dtype=np.int32)
+    ticket_mix = _weights(args.ticket_mix, tb.ticket_keys)
+
+    flows = dict.fromkeys(SOURCES, 0)
+    flows["start.gift"] = int(bal.sum())
+    supply = np.zeros(args.days, dtype=np.int64)
+    wealth: dict[int, np.ndarray] = {}
+    checkpoints = {d for d in args.checkpoints if 0 < d < args.days} | {args.days}
+
+    for d in range(args.days):
+        # chaque étape ne travaille que sur les indices des joueurs concernés (≈ un tiers actifs par jour)
+        act = np.flatnonzero(rng.random(n) < eng)
+        m_act, e_act = mask[act], eng[act]
+
+        # mendier: toutes les tentatives du jour d'un coup (cap × actifs)
+        k = rng.binomial(tb.m_cap, e_act)
+        base = rng.integers(tb.m_min, tb.m_max + 1, (tb.m_cap, act.size)) - tb.m_min
+        flat = (rng.random((tb.m_cap, act.size)) * (tb.flat_span[m_act] + 1)).astype(np.int64)
+        gain = (tb.AM[m_act, base, flat] * (np.arange(tb.m_cap)[:, None] < k)).sum(axis=0)
+        bal[act] += gain
+        flows["mendier"] += int(gain.sum())
+        stats["mendier_count"][act] += k
+
+        # fouiller: séquentiel sur les tentatives (la perte dépend du solde du moment)
+        kf = rng.binomial(tb.f_cap, e_act)
+        stats["fouiller_count"][act] += kf
+        who, m_who = act, m_act
+        for j in range(tb.f_cap):
+            keep = kf > j
+            who, m_who, kf = who[keep], m_who[keep], kf[keep]
+            if not who.size:
+                break
+            r = rng.random(who.size)
+            roll = rng.integers(tb.f_min, tb.f_max + 1, who.size) - tb.f_min
+            g = np.where(r < tb.good_p, tb.FG[m_who, roll], 0)
+            loss = np.where(r >= 1.0 - tb.bad_p, np.minimum(tb.loss, np.maximum(0, bal[who])), 0)
+            bal[who] += g - loss
+            flows["fouiller"] += int(g.sum())
+            flows["fouiller.loss"] -= int(loss.sum())
+            drop = rng.random(who.size) <= tb.drop_p[m_who]
+            canettes[who] += np.where(drop, rng.integers(tb.drop_min, tb.drop_max + 1, who.size) + tb.drop_bonus[m_who], 0)
+
+        # recyclerie: compresser tout, puis collecter le rattrapage (1 sac par jour encaissé)
+        ru = act[recy_user[act]]
+        made = canettes[ru] // tb.per_sac_cans
+        sacs[ru] += made
+        canettes[ru] -= made * tb.per_sac_cans
+        last = last_day[ru]
+        pending = np.where(last < 0, 1, np.minimum(d - last, tb.backlog))
+        nb = np.minimum(pending, sacs[ru])
+        ru, nb, last = ru[nb > 0], nb[nb > 0], last[nb > 0]
+        st = np.where((last >= 0) & (d - last > 1), 0, streak[ru])
+        lv = level[ru]
+        paid = np.zeros(ru.size, dtype=np.int64)
+        for j in range(tb.backlog):
+            step = nb > j
+            paid += np.where(step, tb.SV[lv, st], 0)
+            st = np.where(step, np.minimum(tb.streak_cap, st + 1), st)
+        streak[ru] = st
+        sacs[ru] -= nb
+        last_day[ru] = d
+        bal[ru] += paid
+        flows["recycler.collect"] += int(paid.sum())
+
+        # tabac: une session par jour actif (proba), ticket tiré selon le mix, arrêt si plus de quoi payer
+        who = act[rng.random(act.size) < args.tabac_prob]
+        left = rng.geometric(1.0 / args.tabac_tickets, who.size)
+        ch = rng.choice(len(tb.ticket_keys), who.size, p=ticket_mix)
+        while who.size:
+            price = tb.t_price[ch]
+            ok = bal[who] >= price
+            who, left, ch, price = who[ok], left[ok], ch[ok], price[ok]
+            if not who.size:
+                break
+            idx = (rng.random(who.size)[:, None] > tb.t_cdf[ch]).sum(axis=1)
+            win = tb.t_val[ch, np.minimum(idx, tb.t_val.shape[1] - 1)]
+            bal[who] += win - price
+            flows["tabac.bet"] -= int(price.sum())
+            flows["tabac.win"] += int(win.sum())
+            left -= 1
+            more = left > 0
+            who, left, ch = who[more], left[more], ch[more]
+
+        # shop: achat glouton des boosts débloqués (du moins cher au plus cher)
+        for i in np.argsort(tb.price, kind="stable"):
+            bit = 1 << int(i)
+            ok = ((mask[act] & bit) == 0) & (bal[act] >= tb.price[i] + args.shop_reserve)
+            for key, need in tb.unlock[i].items():
+                ok &= stats[key][act] >= int(need)
+            buyers = act[ok]
+            bal[buyers] -= tb.price[i]
+            mask[buyers] |= bit
+            bought[i, buyers] = d + 1
+            flows["shop"] -= int(buyers.size) * int(tb.price[i])
+
+        supply[d] = bal.sum()
+        if d + 1 in checkpoints:
+            wealth[d + 1] = np.sort(bal)
+
+    return {"supply": supply, "wealth": wealth, "bought": bought, "flows": flows, "n": n}
+
+
+# ─────────────────────────────
+# Rapport
+# ─────────────────────────────
+def _gini(sorted_bal: np.ndarray) -> float:
+    x = np.maximum(sorted_bal, 0).astype(np.float64)
+    total = x.sum()
+    if total <= 0:
+        return 0.0
+    i = np.arange(1, len(x) + 1)
+    return float((2 * (i * x).sum()) / (len(x) * total) - (len(x) + 1) / len(x))
+
+def _wealth_row(day: int, xs: np.ndarray) -> dict:
+    qs = np.percentile(xs, [10, 25, 50, 75, 90, 99])
+    top1 = xs[-max(1, len(xs) // 100):].sum() / max(1, xs.sum())
+    return {"day": day, "p10": float(qs[0]), "p25": float(qs[1]), "p50": float(qs[2]), "p75": float(qs[3]),
+            "p90": float(qs[4]), "p99": float(qs[5]), "max": int(xs[-1]), "mean": float(xs.mean()),
+            "gini": _gini(xs), "top1_share": float(top1)}
+
+def report(tb: Tables, res: dict) -> dict:
+    n = res["n"]
+    wealth = [_wealth_row(day, xs) for day, xs in sorted(res["wealth"].items())]
+    ttb = []
+    for i, (iid, it) in enumerate(tb.items):
+        days = res["bought"][i][res["bought"][i] > 0]
+        row = {"item": iid, "price": int(it["price"]), "owners_pct": 100.0 * len(days) / n}
+        if len(days):
+            p10, p50, p90 = np.percentile(days, [10, 50, 90])
+            row.update({"p10": float(p10), "p50": float(p50), "p90": float(p90)})
+        ttb.append(row)
+    supply = res["supply"]
+    growth = [float(supply[i] - supply[i - 1]) if i else float(supply[0] - tb.start_money * n)
+              for i in range(len(supply))]
+    return {"wealth": wealth, "time_to_buy": ttb, "supply": supply.tolist(), "supply_daily_growth": growth,
+            "flows": res["flows"]}
+
+def _eur(cents: float) -> str:
+    return f"{cents / 100:,.2f} €"
+
+def _print(out: dict, n: int) -> None:
+    from bot.modules.common.ui import sparkline
+    print("\n── Distribution des richesses (solde par joueur)")
+    print(f"{'jour':>5} {'p10':>10} {'p50':>10} {'p90':>10} {'p99':>11} {'max':>12} {'moyenne':>10} {'gini':>6} {'top1%':>6}")
+    for w in out["wealth"]:
+        print(f"{w['day']:>5} {_eur(w['p10']):>10} {_eur(w['p50']):>10} {_eur(w['p90']):>10} {_eur(w['p99']):>11} "
+              f"{_eur(w['max']):>12} {_eur(w['mean']):>10} {w['gini']:>6.3f} {w['top1_share']:>6.1%}")
+
+    print("\n── Temps pour acheter (jours, parmi les acheteurs)")
+    print(f"{'objet':<12} {'prix':>9} {'acheteurs':>10} {'p10':>6} {'p50':>6} {'p90':>6}")
+    for r in out["time_to_buy"]:
+        ds = "".join(f"{r[q]:>6.0f}" if q in r else f"{'—':>6}" for q in ("p10", "p50", "p90"))
+        print(f"{r['item']:<12} {_eur(r['price']):>9} {r['owners_pct']:>9.1f}% {ds}")
+
+    supply = out["supply"]
+    print("\n── Masse monétaire")
+    print(f"  J1 {_eur(supply[0])} → J{len(supply)} {_eur(supply[-1])} "
+          f"({_eur(supply[-1] / n)} / joueur, +{_eur(np.mean(out['supply_daily_growth']))} / jour)")
+    step = max(1, len(supply) // 60)
+    print("  " + sparkline(supply[::step]))
+    print("\n── Flux cumulés par source")
+    for src, v in out["flows"].items():
+        print(f"  {src:<18} {_eur(v):>16}")
+    bets, wins = -out["flows"]["tabac.bet"], out["flows"]["tabac.win"]
+    if bets:
+        print(f"  (avantage maison tabac: {1 - wins / bets:.1%})")
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=100_000)
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--engagement", type=lambda s: tuple(float(x) for x in s.split(",")), default=(1.2, 2.0),
+                    help="paramètres a,b de la loi Beta de l'engagement (proba d'être actif / intensité)")
+    ap.add_argument("--recycler-share", type=float, default=0.5, help="part des joueurs qui utilisent la recyclerie")
+    ap.add_argument("--tabac-prob", type=float, default=0.25, help="proba d'une session tabac un jour actif")
+    ap.add_argument("--tabac-tickets", type=float, default=3.0, help="tickets par session (moyenne, géométrique)")
+    ap.add_argument("--ticket-mix", default=DEFAULT_TICKET_MIX)
+    ap.add_argument("--shop-reserve", type=int, default=0, help="centimes gardés en réserve avant un achat")
+    ap.add_argument("--checkpoints", type=lambda s: [int(x) for x in s.split(",") if x], default=[7, 30])
+    ap.add_argument("--set", action="append", default=[], metavar="NOM=VALEUR",
+                    help="surcharge une constante du jeu (littéral Python), répétable")
+    ap.add_argument("--json", help="écrit aussi le résultat en JSON")
+    args = ap.parse_args()
+
+    use_temp_data_dir("larue-sim-")   # les modules du jeu importent la couche DB (jamais utilisée ici)
+    mods = _modules()
+    _apply_overrides(mods, args.set)
+
+    t0 = time.perf_counter()
+    tb = Tables(mods)
+    t1 = time.perf_counter()
+    res = simulate(tb, args)
+    t2 = time.perf_counter()
+    out = report(tb, res)
+    print(f"{args.players:,} joueurs × {args.days} jours: tables {t1 - t0:.2f}s, simulation {t2 - t1:.2f}s")
+    _print(out, args.players)
+
+    if args.json:
+        out["params"] = {k: v for k, v in vars(args).items() if k != "json"}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(out, f, indent=1)
+        print(f"\nJSON: {args.json}")
+
+if __name__ == "__main__":
+    main()
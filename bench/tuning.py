@@ -0,0 +1,173 @@
+# bench/tuning.py
+"""
+Compare les profils SQLite (bot/core/db/tuning.py) sur le mélange de requêtes du bot: un jeu gendata
+généré une fois, copié par profil (converti si le profil change page_size), puis chaque profil
+rejoué dans un process neuf (DB_PROFILE, DB_RAM_MB) pour que le réglage s'applique comme en prod.
+
+Mélange, séquentiel comme dans l'event loop: mendier (quota + posting + stat), solde, historique,
+profil (stats + inventaire + solde), classements (cache vidé toutes les 2 s: recalcul régulier du
+classement argent, scan complet du ledger), flush des stats tous les 200 tours.
+Rapport: débit, p50/p99 lectures et écritures, classement argent, pic de RSS du process.
+
+    python -m bench.tuning --players 50000 --ledger-rows 1000000 --seconds 20
+    python -m bench.tuning --ram-mb 1024 --profiles low-memory,default     # petit VPS simulé
+"""
+from __future__ import annotations
+import argparse, json, os, random, resource, sqlite3, subprocess, sys, time
+
+from bench.common import use_temp_data_dir, percentiles
+
+
+def _child(args) -> None:
+    """Un profil, process neuf: DATA_DIR pointe sur la copie préparée par le parent."""
+    use_temp_data_dir()
+    from bot.core.db import base, tuning
+    from bot.domain import economy, inventory, leaderboards, quotas, stats
+
+    t = tuning.current(base.DB_PATH)
+    con = base.get_conn()
+    uids = [int(r[0]) for r in con.execute("SELECT user_id FROM players")]
+    rng = random.Random(args.seed)
+    boards = list(leaderboards.BOARDS)
+    n = [0]
+
+    def mendier() -> None:
+        uid = rng.choice(uids)
+        quotas.check_and_touch(uid, "mendier", 0, 10**9)
+        economy.credit_once(uid, rng.randint(1, 40), reason="mendier", idem_key=f"bench:tuning:{n[0]}")
+        stats.bump(uid, "mendier_count", 1)
+
+    def profil() -> None:
+        uid = rng.choice(uids)
+        economy.balance(uid)
+        stats.all_for(uid)
+        inventory.get(uid)
+
+    ops = [
+        ("écriture", 30, mendier),
+        ("lecture", 25, lambda: economy.balance(rng.choice(uids))),
+        ("lecture", 15, lambda: economy.history_page(rng.choice(uids), None, 10)),
+        ("lecture", 20, profil),
+        ("classement", 10, lambda: leaderboards.page(rng.choice(boards), rng.randrange(3))),
+    ]
+    kinds, weights, fns = zip(*[(k, w, f) for k, w, f in ops])
+    samples: dict[str, list[float]] = {"écriture": [], "lecture": [], "classement": []}
+    scans: list[float] = []
+
+    t0 = time.perf_counter()
+    first_scan = time.perf_counter()
+    economy.top_richest(11, 0)                        # premier scan, cache SQLite froid
+    first_scan = time.perf_counter() - first_scan
+    last_clear = time.perf_counter()
+    end = time.perf_counter() + args.seconds
+    while time.perf_counter() < end:
+        i = rng.choices(range(len(fns)), weights)[0]
+        s = time.perf_counter()
+        fns[i]()
+        if n[0] % 200 == 199:
+            stats.flush()
+        samples[kinds[i]].append(time.perf_counter() - s)
+        n[0] += 1
+        if s - last_clear >= 2.0:
+            leaderboards.invalidate()
+            last_clear = s
+            s = time.perf_counter()
+            economy.top_richest(11, 0)
+            scans.append(time.perf_counter() - s)
+    wall = time.perf_counter() - t0 - first_scan
+
+    out = {"profile": t.profile, "cache_mb": t.cache_kib / 1024, "mmap_mb": t.mmap_bytes / 1024 ** 2,
+           "page_size": con.execute("PRAGMA page_size").fetchone()[0], "temp_store": t.temp_store,
+           "ops_s": n[0] / wall, "first_scan_ms": first_scan * 1000,
+           "scan": percentiles(scans), "rss_mb": _peak_rss_mb()}
+    out.update({k: percentiles(v) for k, v in samples.items()})
+    print(json.dumps(out))
+
+def _peak_rss_mb() -> float:
+    """Pic de RSS du process: VmHWM (ru_maxrss hérite du parent à travers fork + exec)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _prepare(src: str, dst_dir: str, page_size: int) -> None:
+    """Copie compacte de la base, à la taille de page du profil, remise en WAL."""
+    os.makedirs(dst_dir, exist_ok=True)
+    dst = os.path.join(dst_dir, "larue.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(dst + suffix):
+            os.remove(dst + suffix)
+    con = sqlite3.connect(src, isolation_level=None)
+    con.execute("VACUUM INTO ?", (dst,))
+    con.close()
+    con = sqlite3.connect(dst, isolation_level=None)
+    if con.execute("PRAGMA page_size").fetchone()[0] != page_size:
+        con.execute(f"PRAGMA page_size={page_size}")
+        con.execute("VACUUM")
+    con.execute("PRAGMA journal_mode=WAL")
+    con.close()
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=50_000)
+    ap.add_argument("--ledger-rows", type=int, default=1_000_000)
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--seconds", type=float, default=20.0, help="durée du mélange par profil")
+    ap.add_argument("--profiles", default="", help="liste séparée par des virgules (défaut: tous)")
+    ap.add_argument("--ram-mb", type=int, default=0, help="RAM vue par l'auto-dimensionnement (0 = détectée)")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return _child(args)
+
+    root = use_temp_data_dir("larue-tuning-")
+    from bench import gendata
+    from bot.core.db import base, tuning
+    from bot.core.db.migrations import migrate_if_needed
+
+    con = base.get_conn()
+    migrate_if_needed(con)
+    gargs = gendata._parser().parse_args(["--players", str(args.players), "--ledger-rows", str(args.ledger_rows),
+                                          "--days", str(args.days), "--seed", str(args.seed)])
+    gendata._init_worker(gargs)
+    per = max(1, int(gargs.chunk * gargs.players / max(1, gargs.ledger_rows)))
+    t0 = time.perf_counter()
+    for lo in range(0, args.players, per):
+        gendata._insert(con, gendata._gen_range((lo, min(args.players, lo + per))))
+    con.execute("ANALYZE")
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    size = os.path.getsize(base.DB_PATH)
+    print(f"génération: {time.perf_counter() - t0:.1f}s • DB {size / 1024 ** 2:.0f} Mo • {root}")
+
+    names = [p.strip() for p in args.profiles.split(",") if p.strip()] or list(tuning.PROFILES)
+    results = []
+    for name in names:
+        work = os.path.join(root, name)
+        _prepare(base.DB_PATH, work, tuning.PROFILES[name].page_size)
+        env = {**os.environ, "DATA_DIR": work, "BENCH_DATA_DIR": work, "DB_PROFILE": name,
+               "DB_RAM_MB": str(args.ram_mb)}
+        for k in ("DB_CACHE_MB", "DB_MMAP_MB"):
+            env.pop(k, None)                          # le profil décide
+        proc = subprocess.run([sys.executable, "-m", "bench.tuning", "--child", "--seconds", str(args.seconds),
+                               "--seed", str(args.seed)], env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            sys.exit(1)
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"\n{'profil':<12} {'cache':>6} {'mmap':>6} {'page':>5} {'ops/s':>7} {'lect p50':>9} {'lect p99':>9} "
+          f"{'écr p50':>8} {'écr p99':>8} {'scan 1er':>9} {'scan p50':>9} {'RSS':>6}")
+    for r in results:
+        print(f"{r['profile']:<12} {r['cache_mb']:>5.0f}M {r['mmap_mb']:>5.0f}M {r['page_size']:>5} "
+              f"{r['ops_s']:>7.0f} {r['lecture']['p50']:>9.3f} {r['lecture']['p99']:>9.3f} "
+              f"{r['écriture']['p50']:>8.3f} {r['écriture']['p99']:>8.3f} {r['first_scan_ms']:>8.0f}ms "
+              f"{r['scan']['p50']:>7.0f}ms {r['rss_mb']:>5.0f}M")
+    print("(latences en ms; scan = classement argent, agrégat du ledger entier)")
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,20 @@
 # bot/core/client.py
 from __future__ import annotations
-import logging, importlib, inspect, os
+import logging, importlib, inspect, os, asyncio
+from datetime import time as dtime
 import discord
 from discord import app_commands
 from discord.ext import tasks
 
 from .config import settings
+from . import metrics, metrics_http, sysmon, watchdog
+from .db import maintenance
 from .db.base import get_conn
 from .db.migrations import migrate_if_needed
+from bot.domain import stats as d_stats
+from bot.domain import snapshots as d_snapshots
+from bot.domain import retention as d_retention
+from bot.domain.clock import TZ
 
 # ── Logging
 log = logging.getLogger("larue")
@@ -18,6 +25,7 @@ intents = discord.Intents.default()
 intents.members = True
 client = discord.Client(intents=intents)
 tree = app_commands.CommandTree(client)
+metrics.install_http_timing(client)
 
 # ── Guilds de test (supporte 1..n guilds)
 SYNC_SCOPE = settings.sync_scope
@@ -79,6 +87,17 @@ def _call_with_best_signature(fn, guild_obj_for_register: discord.Object | None)
     log.warning("Impossible d'appeler %s avec une signature connue (sig=%s)", fn.__name__, sig)
 
 def _register_one_module(dotted: str, guild_obj_for_register: discord.Object | None):
+    try:
+        return _import_and_register(dotted, guild_obj_for_register)
+    finally:
+        # Middleware de latence autour de tout ce que le module vient d'ajouter
+        n = metrics.instrument_tree(tree, guild=None)
+        if guild_obj_for_register is not None:
+            n += metrics.instrument_tree(tree, guild=guild_obj_for_register)
+        if n:
+            log.info("Instrumenté %d commande(s) pour %s", n, dotted)
+
+def _import_and_register(dotted: str, guild_obj_for_register: discord.Object | None):
     mod = importlib.import_module(dotted)
     if hasattr(mod, "register") and callable(mod.register):
         log.info("Register via register(): %s (guild=%s)", dotted, getattr(guild_obj_for_register, "id", None))
@@ -153,13 +172,39 @@ async def on_ready():
     except Exception as e:
         log.exception("Sync error: %s", e)
 
+    watchdog.start()
+    sysmon.start(client)
+    maintenance.start()
     if not daily_tick.is_running():
         daily_tick.start()
+    if not stats_flush.is_running():
+        stats_flush.start()
+    try:
+        await metrics_http.start(client)
+    except Exception as e:
+        log.exception("Serveur metrics HTTP non démarré: %s", e)
     log.info("LaRue connecté en %s", client.user)
 
-@tasks.loop(hours=24)
+# Juste après le reset quotidien (08:00 Paris): la journée de jeu précédente est close
+@tasks.loop(time=dtime(hour=8, minute=5, tzinfo=TZ))
 async def daily_tick():
     log.info("Tick quotidien")
+    try:
+        # hors event loop: le rattrapage peut toucher beaucoup de lignes
+        await asyncio.to_thread(d_snapshots.run_daily)
+    except Exception as e:
+        log.exception("Snapshots de solde échoués: %s", e)
+    try:
+        await asyncio.to_thread(d_retention.run_daily)
+    except Exception as e:
+        log.exception("Rétention échouée: %s", e)
+
+@tasks.loop(seconds=max(0.1, settings.stats_flush_ms / 1000))
+async def stats_flush():
+    try:
+        d_stats.flush()
+    except Exception as e:
+        log.warning("Flush des stats échoué (nouvel essai au prochain tour): %s", e)
 
 def _register_modules_for_guilds(modules: list[str], guilds: list[discord.Object]):
     for dotted in modules:
@@ -175,4 +220,9 @@ def run():
         migrate_if_needed(con)
 
     # 2) Lancement du client
-    client.run(settings.token)
+    try:
+        client.run(settings.token)
+    finally:
+        # 3) Arrêt: on n'abandonne jamais les stats en attente
+        n = d_stats.flush()
+        log.info("Arrêt: %d stats en attente écrites", n)
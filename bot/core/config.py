@@ -9,6 +9,46 @@ class Settings(BaseModel):
     guild_id: int = int(os.getenv("GUILD_ID", "0"))
     data_backend: str = os.getenv("DATA_BACKEND", "json")
     data_dir: str = os.getenv("DATA_DIR", "./data")
+    # Tampon write-behind des stats: flush toutes les N ms ou dès M entrées
+    stats_flush_ms: int = int(os.getenv("STATS_FLUSH_MS", "2000"))
+    stats_flush_max: int = int(os.getenv("STATS_FLUSH_MAX", "500"))
+    # Endpoint HTTP local /metrics /healthz /readyz (0 = désactivé)
+    metrics_port: int = int(os.getenv("METRICS_PORT", "0"))
+    metrics_host: str = os.getenv("METRICS_HOST", "127.0.0.1")
+    # Slow-query log (chrono par requête + EXPLAIN QUERY PLAN au-delà du seuil)
+    sql_trace: bool = os.getenv("SQL_TRACE", "0").strip().lower() in ("1", "true", "yes", "on")
+    sql_slow_ms: float = float(os.getenv("SQL_SLOW_MS", "50"))
+    # Watchdog event loop: au-delà, on échantillonne et logge la pile du thread bloqué
+    loop_lag_warn_ms: float = float(os.getenv("LOOP_LAG_WARN_MS", "250"))
+    # Sampler système (/sysinfo, /debug): pas et taille de l'anneau
+    sysmon_interval_s: float = float(os.getenv("SYSMON_INTERVAL_S", "5"))
+    sysmon_history: int = int(os.getenv("SYSMON_HISTORY", "120"))
+    # Enregistrement du trafic (entrées de chaque commande, rejouable hors-ligne via bench.replay)
+    traffic_record: bool = os.getenv("TRAFFIC_RECORD", "0").strip().lower() in ("1", "true", "yes", "on")
+    # Rétention (tick quotidien): jours de journal conservés par table, 0 = jamais purgé;
+    # RETENTION_ARCHIVE=1 déplace les lignes dans DATA_DIR/archive.db au lieu de les supprimer
+    retention_respect_days: int = int(os.getenv("RETENTION_RESPECT_DAYS", "30"))
+    retention_actions_days: int = int(os.getenv("RETENTION_ACTIONS_DAYS", "7"))
+    retention_claims_days: int = int(os.getenv("RETENTION_CLAIMS_DAYS", "90"))
+    retention_archive: bool = os.getenv("RETENTION_ARCHIVE", "0").strip().lower() in ("1", "true", "yes", "on")
+    retention_batch: int = int(os.getenv("RETENTION_BATCH", "5000"))
+    # Maintenance DB (checkpoint WAL, optimize, incremental_vacuum): pas du planificateur, débit de
+    # commandes/min sous lequel on est en période creuse, taille de WAL au-delà de laquelle on checkpointe
+    maint_interval_s: float = float(os.getenv("MAINT_INTERVAL_S", "60"))
+    maint_quiet_per_min: float = float(os.getenv("MAINT_QUIET_PER_MIN", "2"))
+    maint_wal_max_mb: float = float(os.getenv("MAINT_WAL_MAX_MB", "64"))
+    # Sauvegardes à chaud (DATA_DIR/backups): toutes les N heures en période creuse (0 = seulement
+    # à la demande via /admin sauvegarde), nombre d'archives .db.gz conservées
+    backup_interval_h: float = float(os.getenv("BACKUP_INTERVAL_H", "24"))
+    backup_keep: int = int(os.getenv("BACKUP_KEEP", "7"))
+    # Connexions de lecture (query_only) pour classements/profils/historiques: nombre gardé ouvertes au repos
+    db_read_pool: int = int(os.getenv("DB_READ_POOL", "4"))
+    # Réglage SQLite (cf. db/tuning.py): profil low-memory | default | throughput, dimensionné sur la
+    # taille de la base et la RAM. Cache par connexion / mmap en Mo (-1 = selon le profil), RAM vue (0 = détectée)
+    db_profile: str = os.getenv("DB_PROFILE", "default")
+    db_cache_mb: int = int(os.getenv("DB_CACHE_MB", "-1"))
+    db_mmap_mb: int = int(os.getenv("DB_MMAP_MB", "-1"))
+    db_ram_mb: int = int(os.getenv("DB_RAM_MB", "0"))
     # Normalisé pour éviter "Guild", "GLOBAL", etc.
     sync_scope: str = Field(default_factory=lambda: os.getenv("SYNC_SCOPE", "both").strip().lower())
 
@@ -0,0 +1,114 @@
+# bot/core/db/backup.py
+"""
+Sauvegarde à chaud par l'API backup de SQLite, depuis un thread, par petits pas de pages.
+
+La connexion source tient une transaction de LECTURE pendant toute la copie: en WAL, un lecteur ne
+bloque aucun écrivain, et la copie reste un instantané cohérent (sans ça, chaque écriture d'une autre
+connexion entre deux pas relance la copie depuis le début: sous charge, elle ne finit jamais).
+Contrepartie: le WAL ne peut pas être recyclé derrière cet instantané → maintenance.checkpoint passe
+en PASSIVE tant qu'une sauvegarde tourne.
+
+Résultat:
+- `backups/snapshot.db`: dernier instantané, non compressé, ouvrable en lecture seule (open_snapshot)
+  pour les analyses lourdes sans toucher la base vivante;
+- `backups/larue-AAAAMMJJ-HHMMSS.db.gz`: archives compressées, les BACKUP_KEEP plus récentes gardées.
+"""
+from __future__ import annotations
+import glob, gzip, logging, os, shutil, sqlite3, threading, time
+
+from bot.core.config import settings
+from .base import DB_PATH, DATA_DIR
+
+log = logging.getLogger("larue")
+
+BACKUP_DIR = os.path.join(DATA_DIR, "backups")
+SNAPSHOT_PATH = os.path.join(BACKUP_DIR, "snapshot.db")
+STEP_PAGES = 256            # 1 Mo par pas (pages de 4 Kio)
+STEP_SLEEP_S = 0.001        # laisse respirer le disque entre deux pas
+
+_lock = threading.Lock()    # une sauvegarde à la fois
+
+
+def running() -> bool:
+    return _lock.locked()
+
+def archives() -> list[str]:
+    """Archives compressées, plus ancienne d'abord."""
+    return sorted(glob.glob(os.path.join(BACKUP_DIR, "larue-*.db.gz")))
+
+def _copy(dst_path: str) -> tuple[int, int]:
+    """Instantané de la base vivante dans dst_path. Renvoie (pages, pas)."""
+    src = sqlite3.connect(DB_PATH, isolation_level=None, check_same_thread=False, timeout=5.0)
+    dst = sqlite3.connect(dst_path, isolation_level=None)
+    steps = [0]
+    try:
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()   # ouvre l'instantané
+        src.backup(dst, pages=STEP_PAGES, sleep=STEP_SLEEP_S,
+                   progress=lambda status, remaining, total: steps.__setitem__(0, steps[0] + 1))
+        src.execute("COMMIT")
+        dst.execute("PRAGMA journal_mode=DELETE")    # fichier autonome (pas de -wal/-shm à côté)
+        (pages,) = dst.execute("PRAGMA page_count").fetchone()
+        (check,) = dst.execute("PRAGMA quick_check").fetchone()
+        if check != "ok":
+            raise RuntimeError(f"instantané corrompu: {check}")
+    finally:
+        dst.close()
+        src.close()
+    return int(pages), steps[0]
+
+def _gzip(src_path: str, dst_path: str) -> None:
+    tmp = dst_path + ".tmp"
+    with open(src_path, "rb") as fi, gzip.open(tmp, "wb", compresslevel=6) as fo:
+        shutil.copyfileobj(fi, fo, 1024 * 1024)
+    os.replace(tmp, dst_path)
+
+def _rotate(keep: int) -> list[str]:
+    old = archives()[:-keep] if keep > 0 else []
+    for path in old:
+        os.remove(path)
+    return old
+
+def run(keep: int | None = None) -> dict:
+    """
+    Sauvegarde complète (instantané + archive compressée + rotation). Bloquant: à lancer dans un thread.
+    Renvoie {path, bytes, gz_bytes, pages, steps, copy_s, gzip_s, seconds, removed}.
+    """
+    if not _lock.acquire(blocking=False):
+        raise RuntimeError("une sauvegarde est déjà en cours")
+    try:
+        keep = settings.backup_keep if keep is None else int(keep)
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+        t0 = time.perf_counter()
+        tmp = SNAPSHOT_PATH + ".tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        pages, steps = _copy(tmp)
+        os.replace(tmp, SNAPSHOT_PATH)
+        copy_s = time.perf_counter() - t0
+
+        t1 = time.perf_counter()
+        path = os.path.join(BACKUP_DIR, time.strftime("larue-%Y%m%d-%H%M%S.db.gz"))
+        _gzip(SNAPSHOT_PATH, path)
+        gzip_s = time.perf_counter() - t1
+        removed = _rotate(keep)
+
+        out = {"path": path, "bytes": os.path.getsize(SNAPSHOT_PATH), "gz_bytes": os.path.getsize(path),
+               "pages": pages, "steps": steps, "copy_s": copy_s, "gzip_s": gzip_s,
+               "seconds": time.perf_counter() - t0, "removed": len(removed)}
+    finally:
+        _lock.release()
+    mib = 1024 ** 2
+    log.info("Sauvegarde: %s (%.1f Mo → %.1f Mo gz) en %.1fs (copie %.1fs en %d pas, gzip %.1fs), %d archive(s) supprimée(s)",
+             os.path.basename(path), out["bytes"] / mib, out["gz_bytes"] / mib, out["seconds"],
+             copy_s, steps, gzip_s, out["removed"])
+    return out
+
+def open_snapshot() -> sqlite3.Connection:
+    """Connexion lecture seule sur le dernier instantané (immutable: ni verrou ni -shm, personne n'y écrit)."""
+    if not os.path.exists(SNAPSHOT_PATH):
+        raise FileNotFoundError("aucun instantané: lancer une sauvegarde d'abord")
+    con = sqlite3.connect(f"file:{SNAPSHOT_PATH}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA cache_size=-20000;")
+    return con
@@ -1,10 +1,12 @@
 # bot/core/db/base.py
 from __future__ import annotations
-import os, sqlite3, threading
+import contextlib, hashlib, os, sqlite3, sys, threading, time
 from contextlib import contextmanager
 
 # 👉 Suivre STRICTEMENT la config (dotenv déjà chargé dans config.py)
 from bot.core.config import settings
+from bot.core import metrics
+from bot.core.db import slowlog, tuning
 
 # Résoudre un chemin absolu (évite les surprises avec ./)
 DATA_DIR = os.path.abspath(settings.data_dir)
@@ -13,15 +15,109 @@ DB_PATH = os.path.join(DATA_DIR, "larue.db")
 
 _tls = threading.local()
 
+# ── Connexion/curseur chronométrés: chaque requête est imputée à la phase "db" de la commande en cours
+#    (+ slow-query log par requête normalisée si SQL_TRACE=1)
+class _Cursor(sqlite3.Cursor):
+    _trace_sql: str | None = None
+    _trace_params = None
+    _trace_s = 0.0
+    _trace_logged = False
+
+    def _trace(self, sql: str, params, elapsed: float, *, new_call: bool) -> None:
+        if new_call:
+            self._trace_sql, self._trace_params = sql, params
+            self._trace_s, self._trace_logged = 0.0, False
+        self._trace_s += elapsed
+        slowlog.record(sql, elapsed, self._trace_s, new_call=new_call)
+        if not self._trace_logged and self._trace_s >= slowlog.SLOW_S:
+            self._trace_logged = True
+            slowlog.log_slow(self.connection, sql, self._trace_params, self._trace_s)
+
+    def _timed_fetch(self, fn, *args):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - t0
+            metrics.add_db(elapsed, 0)
+            if self._trace_sql is not None:
+                self._trace(self._trace_sql, self._trace_params, elapsed, new_call=False)
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(super().fetchmany, self.arraysize if size is None else size)
+
+class _Connection(sqlite3.Connection):
+    def cursor(self, factory=_Cursor):
+        return super().cursor(factory)
+
+    # Connection.execute (C) ignore cursor(): on passe explicitement par _Cursor pour chronométrer les fetch
+    def execute(self, sql, params=()):
+        cur = self.cursor()
+        t0 = time.perf_counter()
+        try:
+            return cur.execute(sql, params)
+        finally:
+            elapsed = time.perf_counter() - t0
+            metrics.add_db(elapsed)
+            if slowlog.ENABLED:
+                cur._trace(sql, params, elapsed, new_call=True)
+
+    def executemany(self, sql, seq):
+        cur = self.cursor()
+        t0 = time.perf_counter()
+        try:
+            return cur.executemany(sql, seq)
+        finally:
+            elapsed = time.perf_counter() - t0
+            metrics.add_db(elapsed)
+            if slowlog.ENABLED:
+                cur._trace(sql, "[many]", elapsed, new_call=True)
+
+    def executescript(self, script):
+        t0 = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            metrics.add_db(time.perf_counter() - t0)
+
+def key_digest(key: str) -> bytes:
+    """Clé d'idempotence du ledger → 16 octets (blake2b). Exposée aussi en SQL: key_digest(key)."""
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+def key_check(key: str) -> int:
+    """Contrôle indépendant de key_digest (blake2b personnalisé, 8 octets → entier signé): distingue un
+    rejeu de la même clé d'une collision de digest. Exposé aussi en SQL: key_check(key)."""
+    d = hashlib.blake2b(key.encode("utf-8"), digest_size=8, person=b"larue.check").digest()
+    return int.from_bytes(d, "big", signed=True)
+
 def _connect():
-    con = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, timeout=5.0)
+    con = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, timeout=5.0,
+                          factory=_Connection)
     con.row_factory = sqlite3.Row
+    t = tuning.current(DB_PATH)
+    # Sans effet sur une base existante (il faut un VACUUM, fait une fois par la migration v0011): une base
+    # neuve prend la taille de page du profil et rend ses pages libres au fichier à la demande
+    # (PRAGMA incremental_vacuum, cf. retention.reclaim)
+    con.execute(f"PRAGMA page_size={t.page_size};")
+    con.execute("PRAGMA auto_vacuum=INCREMENTAL;")
     con.execute("PRAGMA journal_mode=WAL;")
     con.execute("PRAGMA foreign_keys=ON;")
     con.execute("PRAGMA synchronous=NORMAL;")
-    con.execute("PRAGMA temp_store=MEMORY;")
-    con.execute("PRAGMA cache_size=-20000;")
+    con.execute(f"PRAGMA temp_store={t.temp_store};")
+    con.execute(f"PRAGMA cache_size={-t.cache_kib};")
+    con.execute(f"PRAGMA mmap_size={t.mmap_bytes};")
+    con.execute(f"PRAGMA wal_autocheckpoint={t.wal_autocheckpoint};")
+    # WAL recyclé après un checkpoint complet: fichier ramené à MAINT_WAL_MAX_MB au lieu de garder son pic
+    con.execute(f"PRAGMA journal_size_limit={int(settings.maint_wal_max_mb * 1024 * 1024)};")
     con.execute("PRAGMA busy_timeout=5000;")
+    con.create_function("key_digest", 1, key_digest, deterministic=True)
+    con.create_function("key_check", 1, key_check, deterministic=True)
     return con
 
 def get_conn():
@@ -31,15 +127,83 @@ def get_conn():
         _tls.con = con
     return con
 
+# ── Lectures: pool de connexions query_only (mmap du profil), chacune ne servant qu'un thread à la fois
+_read_pool: list[sqlite3.Connection] = []
+_read_lock = threading.Lock()
+
+def _connect_ro():
+    con = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, timeout=5.0,
+                          factory=_Connection)
+    con.row_factory = sqlite3.Row
+    t = tuning.current(DB_PATH)
+    con.execute("PRAGMA query_only=ON;")     # toute écriture lève « attempt to write a readonly database »
+    con.execute(f"PRAGMA mmap_size={t.mmap_bytes};")
+    con.execute(f"PRAGMA temp_store={t.temp_store};")
+    con.execute(f"PRAGMA cache_size={-t.cache_kib};")
+    con.execute("PRAGMA busy_timeout=5000;")
+    con.create_function("key_digest", 1, key_digest, deterministic=True)
+    con.create_function("key_check", 1, key_check, deterministic=True)
+    return con
+
+@contextmanager
+def reading():
+    """
+    Connexion de lecture tenant UN instantané WAL pour tout le bloc (lectures multiples cohérentes),
+    sans jamais attendre ni retenir le verrou d'écriture.
+    Dans une transaction ouverte sur la connexion du thread: on reste dessus (voir ses propres écritures).
+    """
+    rw = getattr(_tls, "con", None)
+    if rw is not None and rw.in_transaction:
+        yield rw
+        return
+    with _read_lock:
+        con = _read_pool.pop() if _read_pool else None
+    if con is None:
+        con = _connect_ro()
+    try:
+        con.execute("BEGIN;")
+        yield con
+    finally:
+        if con.in_transaction:
+            con.execute("COMMIT;")               # rien à valider: libère l'instantané
+        with _read_lock:
+            keep = len(_read_pool) < settings.db_read_pool
+            if keep:
+                _read_pool.append(con)
+        if not keep:
+            con.close()
+
+_PKG_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _caller_site() -> str:
+    """Premier frame hors contextlib / ce module → 'persistence/ledger.py:8 add_once'."""
+    f = sys._getframe(2)
+    while f is not None and f.f_code.co_filename in (__file__, contextlib.__file__):
+        f = f.f_back
+    if f is None:
+        return "?"
+    path = f.f_code.co_filename
+    if path.startswith(_PKG_ROOT):
+        path = path[len(_PKG_ROOT) + 1:]
+    return f"{path}:{f.f_lineno} {f.f_code.co_name}"
+
 @contextmanager
 def atomic(con=None, immediate=True):
     con = con or get_conn()
+    site = _caller_site()
+    wait = 0.0
+    t1 = None
     try:
+        t0 = time.perf_counter()
         con.execute("BEGIN IMMEDIATE;" if immediate else "BEGIN;")
+        t1 = time.perf_counter()
+        wait = t1 - t0  # ≈ attente du verrou d'écriture (busy_timeout)
         yield con
         con.execute("COMMIT;")
+        metrics.record_tx(wait, True, time.perf_counter() - t1, site)
     except Exception:
         con.execute("ROLLBACK;")
+        metrics.record_tx(wait, False, time.perf_counter() - t1 if t1 else 0.0, site)
         raise
 
 # Petit helper debug (à logger au boot ou via /debug)
@@ -0,0 +1,213 @@
+# bot/core/db/maintenance.py
+"""
+Entretien périodique de la base, hors event loop:
+- checkpoint WAL: TRUNCATE en période creuse (attend les lecteurs et retient les écrivains le temps
+  de recopier le WAL), PASSIVE à tout moment si plus de MAINT_WAL_MAX_MB restent à recopier (ne
+  bloque personne; le fichier est ramené à cette taille au redémarrage du WAL, journal_size_limit);
+- PRAGMA optimize (ANALYZE échantillonné des tables jamais analysées ou dont la taille a beaucoup
+  changé depuis);
+- incremental_vacuum (pages libres rendues au fichier, cf. retention.reclaim);
+- sauvegarde à chaud toutes les BACKUP_INTERVAL_H heures (cf. backup.py).
+
+Période creuse = débit de commandes des 5 dernières minutes sous un seuil: le plancher
+MAINT_QUIET_PER_MIN, relevé par le profil horaire observé (1,25 × l'heure la plus calme) pour qu'un
+serveur jamais vraiment calme ait quand même ses fenêtres. Un travail en retard de
+MAX_DEFER × sa cadence passe malgré tout (sauf le checkpoint TRUNCATE, remplacé par PASSIVE).
+"""
+from __future__ import annotations
+import asyncio, collections, logging, os, time
+
+from bot.core import metrics
+from bot.core.config import settings
+from .base import DB_PATH, atomic, get_conn
+from . import backup, retention
+
+log = logging.getLogger("larue")
+
+INTERVAL_S = max(10.0, settings.maint_interval_s)
+QUIET_WINDOW_MIN = 5
+MAX_DEFER = 4
+
+# travail -> cadence (s)
+EVERY_S: dict[str, float] = {
+    "checkpoint": 10 * 60,
+    "vacuum": 60 * 60,
+    "optimize": 6 * 60 * 60,
+}
+if settings.backup_interval_h > 0:
+    EVERY_S["backup"] = settings.backup_interval_h * 3600
+
+LAST: dict[str, dict] = {}                      # dernier résultat par travail (pour /debug)
+_done_at: dict[str, float] = {}                 # monotonic du dernier passage
+_rates: collections.deque[float] = collections.deque(maxlen=QUIET_WINDOW_MIN)
+_hourly: list[float | None] = [None] * 24       # commandes/min, moyenne glissante par heure locale
+_task: asyncio.Task | None = None
+
+
+def wal_bytes() -> int:
+    try:
+        return os.path.getsize(DB_PATH + "-wal")
+    except OSError:
+        return 0
+
+# Après un checkpoint: taille du fichier WAL et frames non recopiées (lecteurs). La taille du fichier
+# seule ne dit rien: un PASSIVE réussi ne la réduit pas (journal_size_limit la ramène au prochain
+# redémarrage du WAL), il faut compter ce qui reste à recopier.
+_wal_mark: dict[str, int] = {"bytes": 0, "backlog": 0, "frames": 0, "moved": 0}
+
+def wal_pending() -> int:
+    """Octets de WAL pas encore recopiés dans la base (estimation: reliquat + croissance depuis)."""
+    (page,) = get_conn().execute("PRAGMA page_size").fetchone()
+    size = wal_bytes()
+    if size < _wal_mark["bytes"]:           # WAL redémarré/tronqué depuis: tout est à recopier
+        _wal_mark["bytes"], _wal_mark["backlog"] = 0, 0
+    return _wal_mark["backlog"] * (int(page) + 24) + max(0, size - _wal_mark["bytes"])
+
+# ─────────────────────────────
+# Travaux (synchrones, à lancer dans un thread)
+# ─────────────────────────────
+def checkpoint(mode: str = "TRUNCATE") -> dict:
+    con = get_conn()
+    before, t0 = wal_bytes(), time.perf_counter()
+    busy, frames, moved = (int(v) for v in con.execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
+    # `moved` compte tout ce qui a été recopié depuis le début du WAL: on garde la part de CE checkpoint
+    prev = _wal_mark
+    fresh = moved - prev["moved"] if frames >= prev["frames"] and moved >= prev["moved"] else moved
+    _wal_mark.update(bytes=wal_bytes(), backlog=max(0, frames - moved), frames=max(0, frames), moved=max(0, moved))
+    return {"mode": mode, "busy": bool(busy), "frames": frames, "moved": max(0, fresh),
+            "wal_before": before, "wal_after": wal_bytes(), "seconds": time.perf_counter() - t0}
+
+def _stat_rows(con, table: str) -> int | None:
+    """Lignes de `table` estimées par sqlite_stat1 (None: jamais analysée, ou vide)."""
+    if not con.execute("SELECT 1 FROM sqlite_master WHERE name='sqlite_stat1'").fetchone():
+        return None
+    (n,) = con.execute("SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl=?", (table,)).fetchone()
+    return int(n) if n else None
+
+def optimize() -> dict:
+    """
+    Équivalent de PRAGMA optimize=0x10002, écrit à la main: avant SQLite 3.46, optimize ne regarde que
+    les tables déjà interrogées par SA connexion (donc rien depuis le thread de maintenance).
+    Pas de COUNT(*) (parcours complet du ledger): l'ANALYZE échantillonné (analysis_limit) sert de mesure,
+    son nombre de lignes est estimé depuis la forme de l'arbre. Il est joué dans un SAVEPOINT et annulé si
+    l'estimation reste entre la moitié et le double de la précédente (statistiques inchangées).
+    """
+    con = get_conn()
+    t0 = time.perf_counter()
+    names = [r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' "
+                                       "AND name NOT LIKE '%\\_\\_%' ESCAPE '\\'").fetchall()]
+    (limit,) = con.execute("PRAGMA analysis_limit").fetchone()
+    con.execute("PRAGMA analysis_limit=1000")        # échantillon: borné sur un gros ledger
+    tables = []
+    try:
+        for name in names:
+            with atomic(con):
+                before = _stat_rows(con, name)
+                con.execute("SAVEPOINT optimize")
+                con.execute(f"ANALYZE {name}")
+                after = _stat_rows(con, name)
+                if after is None or (before is not None and before / 2 <= after <= before * 2):
+                    con.execute("ROLLBACK TO optimize")
+                else:
+                    tables.append(name)
+                con.execute("RELEASE optimize")
+    finally:
+        con.execute(f"PRAGMA analysis_limit={int(limit)}")
+    return {"tables": sorted(tables), "seconds": time.perf_counter() - t0}
+
+def vacuum() -> dict:
+    t0 = time.perf_counter()
+    freed, left = retention.reclaim(get_conn())
+    return {"pages": freed, "free_left": left, "seconds": time.perf_counter() - t0}
+
+def run(job: str, quiet: bool = True) -> dict:
+    if job == "checkpoint":
+        # TRUNCATE attendrait l'instantané de la sauvegarde en retenant les écrivains (busy_timeout)
+        out = checkpoint("TRUNCATE" if quiet and not backup.running() else "PASSIVE")
+    elif job == "backup":
+        return backup.run()                          # journalise elle-même
+    elif job == "optimize":
+        out = optimize()
+    elif job == "vacuum":
+        out = vacuum()
+    else:
+        raise ValueError(f"travail de maintenance inconnu: {job}")
+    _log(job, out)
+    return out
+
+def _log(job: str, out: dict) -> None:
+    mib = 1024 ** 2
+    if job == "checkpoint":
+        if not out["moved"] and out["wal_after"] >= out["wal_before"]:
+            return                                   # rien recopié ni rendu: pas de bruit
+        # TRUNCATE remet les compteurs du WAL à zéro: seules les tailles parlent
+        moved = f"{out['moved']} pages recopiées, " if out["moved"] else ""
+        log.info("Maintenance: checkpoint %s, WAL %.1f Mo → %.1f Mo (%s%s%.0f ms)",
+                 out["mode"], out["wal_before"] / mib, out["wal_after"] / mib, moved,
+                 "lecteurs actifs, " if out["busy"] else "", out["seconds"] * 1000)
+    elif job == "optimize":
+        log.info("Maintenance: optimize en %.0f ms (ANALYZE: %s)", out["seconds"] * 1000,
+                 ", ".join(out["tables"]) or "rien à refaire")
+    elif out["pages"] or out["free_left"]:
+        log.info("Maintenance: %d pages rendues, %d libres restantes (%.0f ms)",
+                 out["pages"], out["free_left"], out["seconds"] * 1000)
+
+# ─────────────────────────────
+# Périodes creuses
+# ─────────────────────────────
+def _total_calls() -> int:
+    return sum(st.calls for st in list(metrics.COMMANDS.values()))
+
+def quiet_threshold() -> float:
+    known = [r for r in _hourly if r is not None]
+    return max(settings.maint_quiet_per_min, 1.25 * min(known)) if known else settings.maint_quiet_per_min
+
+def recent_rate() -> float:
+    return sum(_rates) / len(_rates) if _rates else 0.0
+
+def _observe(calls: int, prev: int, dt: float) -> None:
+    rate = (calls - prev) * 60.0 / max(dt, 1e-9)
+    _rates.append(rate)
+    hour = time.localtime().tm_hour
+    old = _hourly[hour]
+    _hourly[hour] = rate if old is None else 0.9 * old + 0.1 * rate
+
+def _due(now: float, quiet: bool, wal_over: bool) -> list[tuple[str, bool]]:
+    """[(travail, en période creuse)] à lancer maintenant."""
+    out = []
+    for job, every in EVERY_S.items():
+        age = now - _done_at.get(job, -1e18)
+        if quiet and age >= every:
+            out.append((job, True))
+        elif job == "checkpoint" and wal_over:
+            out.append((job, False))                 # PASSIVE: ne bloque ni lecteurs ni écrivains
+        elif age >= MAX_DEFER * every:
+            out.append((job, False))
+    return out
+
+async def _run() -> None:
+    prev, t_prev = _total_calls(), time.monotonic()
+    # checkpoint/vacuum: pas au boot (les migrations viennent de passer); optimize au premier tour
+    _done_at.update({"checkpoint": t_prev, "vacuum": t_prev})
+    last = backup.archives()
+    if last:   # sauvegarde: cadence comptée depuis la dernière archive, redémarrages compris
+        _done_at["backup"] = t_prev - max(0.0, time.time() - os.path.getmtime(last[-1]))
+    while True:
+        await asyncio.sleep(INTERVAL_S)
+        calls, now = _total_calls(), time.monotonic()
+        _observe(calls, prev, now - t_prev)
+        prev, t_prev = calls, now
+        quiet = len(_rates) >= _rates.maxlen and recent_rate() <= quiet_threshold()
+        wal_over = wal_pending() > settings.maint_wal_max_mb * 1024 ** 2
+        for job, in_quiet in _due(now, quiet, wal_over):
+            try:
+                LAST[job] = await asyncio.to_thread(run, job, in_quiet)
+            except Exception as e:
+                log.warning("Maintenance %s échouée (nouvel essai au prochain créneau): %s", job, e)
+            _done_at[job] = time.monotonic()
+
+def start() -> None:
+    """À appeler depuis l'event loop (on_ready). Idempotent."""
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.create_task(_run())
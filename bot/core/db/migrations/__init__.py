@@ -1,4 +1,4 @@
-from . import v0001_base, v0002_recycler, v0003_idx, v0004_ledger
+from . import v0001_base, v0002_recycler, v0003_idx, v0004_ledger, v0005_stats_idx, v0006_rollups, v0007_snapshots, v0008_ledger_keyset, v0009_int_user_ids, v0010_ledger_compact, v0011_incremental_vacuum
 
 def migrate_if_needed(con):
     (ver,) = con.execute("PRAGMA user_version").fetchone()
@@ -12,3 +12,17 @@ def migrate_if_needed(con):
         v0003_idx.apply(con); con.execute("PRAGMA user_version=3"); ver = 3
     if ver < 4:
         v0004_ledger.apply(con); con.execute("PRAGMA user_version=4"); ver = 4
+    if ver < 5:
+        v0005_stats_idx.apply(con); con.execute("PRAGMA user_version=5"); ver = 5
+    if ver < 6:
+        v0006_rollups.apply(con); con.execute("PRAGMA user_version=6"); ver = 6
+    if ver < 7:
+        v0007_snapshots.apply(con); con.execute("PRAGMA user_version=7"); ver = 7
+    if ver < 8:
+        v0008_ledger_keyset.apply(con); con.execute("PRAGMA user_version=8"); ver = 8
+    if ver < 9:
+        v0009_int_user_ids.apply(con); con.execute("PRAGMA user_version=9"); ver = 9
+    if ver < 10:
+        v0010_ledger_compact.apply(con); con.execute("PRAGMA user_version=10"); ver = 10
+    if ver < 11:
+        v0011_incremental_vacuum.apply(con); con.execute("PRAGMA user_version=11"); ver = 11
@@ -0,0 +1,9 @@
+DDL = """
+CREATE INDEX IF NOT EXISTS idx_stats_key_value ON stats(key, value DESC, user_id);
+
+-- Record de série recyclerie: initialisé depuis la série courante
+INSERT INTO stats(user_id, key, value)
+SELECT user_id, 'recycler_best_streak', streak FROM recycler_state WHERE streak > 0
+ON CONFLICT(user_id, key) DO UPDATE SET value = MAX(value, excluded.value);
+"""
+def apply(con): con.executescript(DDL)
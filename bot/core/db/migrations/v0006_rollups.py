@@ -0,0 +1,35 @@
+# Agrégats incrémentaux du ledger (alimentés par persistence.ledger.add_once)
+_SOURCE = "CASE WHEN instr(reason, ':') > 0 THEN substr(reason, 1, instr(reason, ':') - 1) ELSE reason END"
+
+DDL = f"""
+CREATE TABLE IF NOT EXISTS ledger_rollup_hourly (
+  bucket  INTEGER NOT NULL,            -- epoch UTC arrondi à l'heure
+  source  TEXT NOT NULL,               -- reason sans suffixe (shop:chien -> shop)
+  inflow  INTEGER NOT NULL DEFAULT 0,  -- somme des deltas > 0
+  outflow INTEGER NOT NULL DEFAULT 0,  -- somme des |deltas| < 0
+  n       INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (bucket, source)
+);
+
+CREATE TABLE IF NOT EXISTS ledger_rollup_daily (
+  bucket  INTEGER NOT NULL,            -- epoch UTC arrondi au jour
+  source  TEXT NOT NULL,
+  inflow  INTEGER NOT NULL DEFAULT 0,
+  outflow INTEGER NOT NULL DEFAULT 0,
+  n       INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (bucket, source)
+);
+
+-- Rattrapage unique de l'historique existant
+INSERT OR REPLACE INTO ledger_rollup_hourly(bucket, source, inflow, outflow, n)
+SELECT ts - ts % 3600, {_SOURCE},
+       SUM(CASE WHEN delta > 0 THEN delta ELSE 0 END),
+       SUM(CASE WHEN delta < 0 THEN -delta ELSE 0 END),
+       COUNT(*)
+FROM ledger GROUP BY 1, 2;
+
+INSERT OR REPLACE INTO ledger_rollup_daily(bucket, source, inflow, outflow, n)
+SELECT bucket - bucket % 86400, source, SUM(inflow), SUM(outflow), SUM(n)
+FROM ledger_rollup_hourly GROUP BY 1, 2;
+"""
+def apply(con): con.executescript(DDL)
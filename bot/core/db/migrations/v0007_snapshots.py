@@ -0,0 +1,19 @@
+DDL = """
+-- Petit key/value pour l'état des jobs (curseurs, dernières exécutions…)
+CREATE TABLE IF NOT EXISTS meta (
+  key   TEXT PRIMARY KEY,
+  value TEXT NOT NULL DEFAULT ''
+);
+
+-- 1 ligne par joueur actif et par jour de jeu (reset 08:00 Paris)
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+  user_id TEXT NOT NULL,
+  day     TEXT NOT NULL,              -- "YYYY-MM-DD" (clock.today_key)
+  balance INTEGER NOT NULL,
+  PRIMARY KEY (user_id, day)
+);
+
+-- Postings d'une journée sans balayer tout le ledger
+CREATE INDEX IF NOT EXISTS idx_ledger_ts ON ledger(ts);
+"""
+def apply(con): con.executescript(DDL)
@@ -0,0 +1,6 @@
+# (user_id, ts, key): curseur keyset (ts, key) servi entièrement par l'index, sans tri temporaire
+DDL = """
+DROP INDEX IF EXISTS idx_ledger_user_ts;
+CREATE INDEX IF NOT EXISTS idx_ledger_user_ts ON ledger(user_id, ts, key);
+"""
+def apply(con): con.executescript(DDL)
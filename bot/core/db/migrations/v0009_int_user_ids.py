@@ -0,0 +1,120 @@
+# user_id (et respect_log.from_id) en INTEGER: un snowflake tient en 8 octets au lieu de ~19 en texte,
+# dans la table ET dans chaque index qui le porte. Les tables à PK composite passent en WITHOUT ROWID:
+# la ligne vit directement dans l'arbre de la PK (plus d'autoindex dupliquant la clé, plus de saut rowid).
+# Reconstruction en ligne par lots (cf. rebuild.py): reprise possible si le bot est coupé en route.
+# Les index secondaires changent de nom (idx_<table>_by_…): construits à côté des anciens pendant la copie.
+# Le ledger n'est pas traité ici: v0010 le reconstruit une seule fois (user_id converti au passage).
+from ..rebuild import column_type, drop_in_batches, rebuild_table
+
+UID = "CAST({} AS INTEGER)"
+
+TABLES = [
+    ("players", """
+CREATE TABLE {name} (
+  user_id     INTEGER PRIMARY KEY,
+  has_started INTEGER NOT NULL DEFAULT 0 CHECK (has_started IN (0,1)),
+  money       INTEGER NOT NULL DEFAULT 0
+)""", ["user_id", "has_started", "money"], ["user_id"],
+     ["CREATE INDEX idx_players_by_money ON {table}(money DESC)"]),
+
+    ("actions", """
+CREATE TABLE {name} (
+  user_id  INTEGER NOT NULL,
+  action   TEXT NOT NULL,
+  last_ts  INTEGER NOT NULL DEFAULT 0,
+  day      TEXT NOT NULL DEFAULT '',
+  count    INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, action)
+) WITHOUT ROWID""", ["user_id", "action", "last_ts", "day", "count"], ["user_id", "action"],
+     ["CREATE INDEX idx_actions_by_day ON {table}(day)",
+      "CREATE INDEX idx_actions_by_user_day ON {table}(user_id, day)"]),
+
+    ("inventory", """
+CREATE TABLE {name} (
+  user_id INTEGER NOT NULL,
+  item_id TEXT NOT NULL,
+  qty     INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, item_id)
+) WITHOUT ROWID""", ["user_id", "item_id", "qty"], ["user_id", "item_id"], []),
+
+    ("stats", """
+CREATE TABLE {name} (
+  user_id INTEGER NOT NULL,
+  key     TEXT NOT NULL,
+  value   INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, key)
+) WITHOUT ROWID""", ["user_id", "key", "value"], ["user_id", "key"],
+     ["CREATE INDEX idx_stats_by_key_value ON {table}(key, value DESC, user_id)"]),
+
+    ("profiles", """
+CREATE TABLE {name} (
+  user_id    INTEGER PRIMARY KEY,
+  bio        TEXT NOT NULL DEFAULT '',
+  color_hex  TEXT NOT NULL DEFAULT 'FFD166',
+  title      TEXT NOT NULL DEFAULT '',
+  cred       INTEGER NOT NULL DEFAULT 0,
+  created_ts INTEGER NOT NULL DEFAULT (strftime('%s','now'))
+)""", ["user_id", "bio", "color_hex", "title", "cred", "created_ts"], ["user_id"], []),
+
+    ("respect_log", """
+CREATE TABLE {name} (
+  user_id INTEGER NOT NULL,
+  from_id INTEGER NOT NULL,
+  day     TEXT NOT NULL,
+  delta   INTEGER NOT NULL,
+  ts      INTEGER NOT NULL,
+  PRIMARY KEY (user_id, from_id, day)
+) WITHOUT ROWID""", ["user_id", "from_id", "day", "delta", "ts"], ["user_id", "from_id", "day"], []),
+
+    ("recycler_state", """
+CREATE TABLE {name} (
+  user_id    INTEGER PRIMARY KEY,
+  level      INTEGER NOT NULL DEFAULT 1,
+  canettes   INTEGER NOT NULL DEFAULT 0,
+  sacs       INTEGER NOT NULL DEFAULT 0,
+  streak     INTEGER NOT NULL DEFAULT 0,
+  last_day   INTEGER NOT NULL DEFAULT 0,
+  updated_ts INTEGER NOT NULL DEFAULT (strftime('%s','now'))
+)""", ["user_id", "level", "canettes", "sacs", "streak", "last_day", "updated_ts"], ["user_id"], []),
+
+    # id AUTOINCREMENT conservé (rowid): UNIQUE(user_id, day_key) sert aussi les recherches par joueur
+    ("recycler_claims", """
+CREATE TABLE {name} (
+  id        INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id   INTEGER NOT NULL,
+  day_key   INTEGER NOT NULL,
+  sacs_used INTEGER NOT NULL,
+  gross     INTEGER NOT NULL,
+  tax       INTEGER NOT NULL,
+  net       INTEGER NOT NULL,
+  ts        INTEGER NOT NULL DEFAULT (strftime('%s','now')),
+  UNIQUE(user_id, day_key)
+)""", ["id", "user_id", "day_key", "sacs_used", "gross", "tax", "net", "ts"], ["id"], []),
+
+    ("balance_snapshots", """
+CREATE TABLE {name} (
+  user_id INTEGER NOT NULL,
+  day     TEXT NOT NULL,              -- "YYYY-MM-DD" (clock.today_key)
+  balance INTEGER NOT NULL,
+  PRIMARY KEY (user_id, day)
+) WITHOUT ROWID""", ["user_id", "day", "balance"], ["user_id", "day"], []),
+]
+
+def _check_numeric(con, table: str, column: str) -> None:
+    (bad,) = con.execute(
+        f"SELECT COUNT(*) FROM {table} WHERE CAST(CAST({column} AS INTEGER) AS TEXT) <> {column}").fetchone()
+    if bad:
+        raise RuntimeError(f"v0009: {bad} valeur(s) non numérique(s) dans {table}.{column}, conversion impossible")
+
+def apply(con) -> dict[str, dict]:
+    done: dict[str, dict] = {}
+    for table, ddl, columns, pk, indexes in TABLES:
+        if column_type(con, table, "user_id") == "INTEGER":
+            drop_in_batches(con, f"{table}__old")   # déjà reconstruite (reprise après interruption)
+            continue
+        convert = {c: UID for c in ("user_id", "from_id") if c in columns}
+        for c in convert:
+            _check_numeric(con, table, c)
+        done[table] = rebuild_table(con, table, ddl=ddl, columns=columns, pk=pk, convert=convert,
+                                    indexes=indexes)
+    return done
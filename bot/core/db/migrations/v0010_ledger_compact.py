@@ -0,0 +1,64 @@
+# Ledger compact: la raison devient un petit entier (table ledger_reasons, quelques dizaines de lignes)
+# et la clé d'idempotence un digest blake2b de 16 octets (key_digest, cf. base.py) au lieu de ~35
+# caractères répétés dans la table ET dans chaque index (PK comprise). La clé d'origine n'est plus stockée:
+# key_check (8 octets, hors index) permet à add_once de distinguer un rejeu d'une collision de digest.
+# user_id passe en INTEGER dans la même reconstruction (cf. v0009, qui laisse le ledger à cette migration:
+# une seule copie de la plus grosse table). Reconstruction en ligne par lots (cf. rebuild.py); les index
+# changent de nom pour la même raison que dans v0009.
+from ..rebuild import column_type, drop_in_batches, rebuild_table
+from .v0009_int_user_ids import UID, _check_numeric
+
+REASONS_DDL = """
+CREATE TABLE IF NOT EXISTS ledger_reasons (
+  id     INTEGER PRIMARY KEY,
+  reason TEXT NOT NULL UNIQUE
+);
+"""
+
+LEDGER_DDL = """
+CREATE TABLE {name} (
+  user_id   INTEGER NOT NULL,
+  key_hash  BLOB NOT NULL,                  -- key_digest(idem_key), 16 octets
+  key_check INTEGER NOT NULL,               -- key_check(idem_key), contrôle indépendant
+  delta     INTEGER NOT NULL,
+  reason_id INTEGER NOT NULL,               -- ledger_reasons.id
+  ts        INTEGER NOT NULL DEFAULT (strftime('%s','now')),
+  PRIMARY KEY (user_id, key_hash)
+) WITHOUT ROWID"""
+
+INDEXES = [
+    "CREATE INDEX idx_ledger_hist ON {table}(user_id, ts, key_hash)",   # historique keyset (ts, key_hash)
+    "CREATE INDEX idx_ledger_by_time ON {table}(ts)",                   # postings d'une journée
+]
+
+# Lignes de la copie sans équivalent exact dans la source (raison comprise): doit rester à 0
+VERIFY = """
+SELECT COUNT(*) FROM {table} AS src
+LEFT JOIN {new} AS n ON n.user_id = CAST(src.user_id AS INTEGER) AND n.key_hash = key_digest(src.key)
+LEFT JOIN ledger_reasons AS r ON r.id = n.reason_id
+WHERE r.reason IS NOT src.reason OR n.delta IS NOT src.delta OR n.key_check IS NOT key_check(src.key)
+"""
+
+def apply(con) -> dict | None:
+    con.executescript(REASONS_DDL)
+    if column_type(con, "ledger", "key_hash"):
+        drop_in_batches(con, "ledger__old")   # déjà reconstruit (reprise après interruption)
+        return None
+    # Raisons existantes lues hors transaction d'écriture (lecture WAL), puis internées d'un coup.
+    # Le trigger d'internement est posé AVANT la lecture: une écriture entre les deux aurait une raison
+    # inconnue (reason_id NULL: ligne ignorée par la copie OR IGNORE); il part avec ledger__old.
+    # Pendant la copie, les triggers de la fantôme internent aussi (prelude, ordre des triggers non garanti).
+    con.execute("CREATE TRIGGER IF NOT EXISTS ledger__intern_ai AFTER INSERT ON ledger BEGIN "
+                "INSERT OR IGNORE INTO ledger_reasons(reason) VALUES(NEW.reason); END")
+    _check_numeric(con, "ledger", "user_id")
+    reasons = [r[0] for r in con.execute("SELECT DISTINCT reason FROM ledger")]
+    con.executemany("INSERT OR IGNORE INTO ledger_reasons(reason) VALUES(?)", [(r,) for r in reasons])
+    return rebuild_table(
+        con, "ledger", ddl=LEDGER_DDL,
+        columns=["user_id", "key_hash", "key_check", "delta", "reason_id", "ts"],
+        pk=["user_id", "key_hash"], order_by=["user_id", "key"],
+        convert={"user_id": UID, "key_hash": "key_digest({row}key)", "key_check": "key_check({row}key)",
+                 "reason_id": "(SELECT id FROM ledger_reasons WHERE reason = {row}reason)"},
+        prelude="INSERT OR IGNORE INTO ledger_reasons(reason) VALUES({row}reason)",
+        indexes=INDEXES, verify=VERIFY,
+    )
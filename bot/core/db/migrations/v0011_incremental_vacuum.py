@@ -0,0 +1,20 @@
+# auto_vacuum=INCREMENTAL (cf. base._connect) ne s'applique qu'à une base neuve: une base existante reste
+# en auto_vacuum=NONE tant qu'un VACUUM complet ne l'a pas réécrite, et retention.reclaim / le travail
+# vacuum de la maintenance ne rendraient jamais rien. Bascule unique, juste après les reconstructions
+# de v0009/v0010 (pages libérées par les anciennes tables récupérées au passage).
+import logging, time
+
+log = logging.getLogger("larue")
+
+def apply(con) -> None:
+    (mode,) = con.execute("PRAGMA auto_vacuum").fetchone()
+    if int(mode) == 2:
+        return
+    (page,) = con.execute("PRAGMA page_size").fetchone()
+    con.execute(f"PRAGMA page_size={int(page)}")   # taille actuelle: celle du profil ne vaut que pour une base neuve
+    con.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    t0 = time.perf_counter()
+    con.execute("VACUUM")
+    (mode,) = con.execute("PRAGMA auto_vacuum").fetchone()
+    log.info("Migration v0011: VACUUM en %.1fs, auto_vacuum=%s", time.perf_counter() - t0,
+             "INCREMENTAL" if int(mode) == 2 else mode)
@@ -0,0 +1,176 @@
+# bot/core/db/rebuild.py
+"""
+Reconstruction « en ligne » d'une table (changement de types / de structure) sans gros verrou:
+
+1. table fantôme `<table>__rebuild` au nouveau schéma, avec ses index secondaires, + triggers qui y
+   recopient chaque écriture;
+2. copie par lots dans l'ordre de la PK, une courte transaction par lot (curseur dans meta → reprise
+   après un crash là où on s'était arrêté);
+3. bascule atomique: l'ancienne table devient `<table>__old`, la fantôme prend son nom;
+4. `<table>__old` est vidée par lots puis supprimée (un DROP d'un bloc tiendrait le verrou le temps
+   de libérer chaque page); ANALYZE échantillonné de la nouvelle table.
+
+Les lecteurs/écrivains continuent sur l'ancienne table jusqu'à la bascule. Les index sont entretenus
+pendant la copie plutôt que construits d'un bloc à la bascule (plusieurs secondes de verrou sur un
+gros ledger): ils doivent donc porter des noms différents de ceux de l'ancienne table.
+"""
+from __future__ import annotations
+import json, logging, time
+
+from .base import atomic
+
+log = logging.getLogger("larue")
+
+BATCH = 5_000
+
+
+def column_type(con, table: str, column: str) -> str:
+    for r in con.execute(f"PRAGMA table_info({table})"):
+        if r[1] == column:
+            return str(r[2]).upper()
+    return ""
+
+def rebuild_table(con, table: str, *, ddl: str, columns: list[str], pk: list[str],
+                  convert: dict[str, str] | None = None, indexes: list[str] = (),
+                  order_by: list[str] | None = None, prelude: str = "", verify: str = "",
+                  batch: int | None = None) -> dict[str, float]:
+    """
+    Reconstruit `table` selon `ddl` (CREATE TABLE avec {name} pour le nom), colonnes `columns`, PK `pk`.
+    - `convert`: par colonne cible, l'expression SQL de conversion ({} = même colonne source,
+      {row} = préfixe de la ligne source, ex. "key_digest({row}key)");
+    - `order_by`: PK de l'ANCIENNE table si les noms changent (ordre de copie, défaut `pk`);
+    - `prelude`: instruction jouée par les triggers avant chaque recopie ({row} = "NEW.");
+    - `indexes`: les CREATE INDEX ({table} pour la table);
+    - `verify`: requête comptant les lignes mal converties ({table} = source, {new} = fantôme), jouée
+      après la copie: non nul → fantôme supprimée, RuntimeError, l'ancienne table reste en place.
+    Renvoie {rows, batches, max_batch_s, swap_s, seconds} (purge de l'ancienne table comprise).
+    """
+    convert = convert or {}
+    batch = int(batch or BATCH)
+    new = f"{table}__rebuild"
+    cursor_key = f"rebuild.{table}"
+    cols = ", ".join(columns)
+    def exprs(prefix: str) -> str:
+        return ", ".join(convert.get(c, "{}").format(prefix + c, row=prefix) for c in columns)
+    def pk_match(prefix: str) -> str:
+        return " AND ".join(f"{c} = {convert.get(c, '{}').format(prefix + c, row=prefix)}" for c in pk)
+    src_pk = order_by or pk
+    pk_cols = ", ".join(src_pk)
+    row_pk = f"({pk_cols})" if len(src_pk) > 1 else pk_cols
+    marks = f"({', '.join('?' * len(src_pk))})" if len(src_pk) > 1 else "?"
+    pre = f"{prelude.format(row='NEW.')};" if prelude else ""
+
+    idx_sql = "".join(sql.format(table=new).replace("CREATE INDEX ", "CREATE INDEX IF NOT EXISTS ", 1) + ";"
+                      for sql in indexes)
+
+    t0 = time.perf_counter()
+    # 1) fantôme + réplication des écritures concurrentes (idempotent: reprise possible)
+    con.executescript(f"""
+        {ddl.format(name=new).replace("CREATE TABLE ", "CREATE TABLE IF NOT EXISTS ", 1)};
+        {idx_sql}
+        CREATE TRIGGER IF NOT EXISTS {new}_ai AFTER INSERT ON {table} BEGIN
+          {pre}
+          INSERT OR REPLACE INTO {new}({cols}) VALUES({exprs("NEW.")});
+        END;
+        CREATE TRIGGER IF NOT EXISTS {new}_au AFTER UPDATE ON {table} BEGIN
+          DELETE FROM {new} WHERE {pk_match("OLD.")};
+          {pre}
+          INSERT OR REPLACE INTO {new}({cols}) VALUES({exprs("NEW.")});
+        END;
+        CREATE TRIGGER IF NOT EXISTS {new}_ad AFTER DELETE ON {table} BEGIN
+          DELETE FROM {new} WHERE {pk_match("OLD.")};
+        END;
+    """)
+
+    # 2) copie par lots: OR IGNORE → une ligne déjà répliquée par trigger (plus récente) gagne.
+    #    Source aliasée: dans une sous-requête de `convert`, {row}col doit désigner la ligne copiée,
+    #    pas une colonne homonyme de la table interrogée
+    row = con.execute("SELECT value FROM meta WHERE key=?", (cursor_key,)).fetchone()
+    lo = json.loads(row[0]) if row else None
+    rows = batches = 0
+    max_batch = 0.0
+    while True:
+        s = time.perf_counter()
+        with atomic(con):
+            where = f"WHERE {row_pk} > {marks}" if lo is not None else ""
+            params = tuple(lo) if lo is not None else ()
+            hi = con.execute(f"SELECT {pk_cols} FROM {table} {where} ORDER BY {pk_cols} LIMIT 1 OFFSET ?",
+                             params + (batch - 1,)).fetchone()
+            bound = (f"{where} {'AND' if where else 'WHERE'} {row_pk} <= {marks}", params + tuple(hi)) \
+                if hi is not None else (where, params)
+            before = con.total_changes
+            con.execute(f"INSERT OR IGNORE INTO {new}({cols}) SELECT {exprs('src.')} FROM {table} AS src {bound[0]} "
+                        f"ORDER BY {pk_cols}", bound[1])
+            rows += con.total_changes - before
+            if hi is not None:
+                lo = list(hi)
+                con.execute("INSERT INTO meta(key, value) VALUES(?, ?) "
+                            "ON CONFLICT(key) DO UPDATE SET value=excluded.value", (cursor_key, json.dumps(lo)))
+        batches += 1
+        max_batch = max(max_batch, time.perf_counter() - s)
+        if hi is None:
+            break
+
+    if verify:
+        (bad,) = con.execute(verify.format(table=table, new=new)).fetchone()
+        if bad:
+            _abort(con, table)
+            raise RuntimeError(f"reconstruction {table}: {bad} ligne(s) mal convertie(s), table d'origine conservée")
+
+    # 3) bascule: plus aucune fenêtre où la table manque ou diverge
+    s = time.perf_counter()
+    with atomic(con):
+        for suffix in ("ai", "au", "ad"):
+            con.execute(f"DROP TRIGGER IF EXISTS {new}_{suffix}")
+        con.execute(f"ALTER TABLE {table} RENAME TO {table}__old")
+        con.execute(f"ALTER TABLE {new} RENAME TO {table}")   # les index suivent la table
+        con.execute("DELETE FROM meta WHERE key=?", (cursor_key,))
+    swap = time.perf_counter() - s
+
+    # 4) purge de l'ancienne table, puis statistiques du planificateur: celles de sqlite_stat1 décrivent
+    #    encore les anciens index (le planificateur choisirait un index non couvrant au lieu de la PK)
+    max_batch = max(max_batch, drop_in_batches(con, f"{table}__old", batch))
+    (limit,) = con.execute("PRAGMA analysis_limit").fetchone()
+    con.execute("PRAGMA analysis_limit=1000")   # échantillon: borné même sur un gros ledger
+    con.execute(f"ANALYZE {table}")
+    con.execute(f"PRAGMA analysis_limit={int(limit)}")
+    out = {"rows": rows, "batches": batches, "max_batch_s": max_batch, "swap_s": swap,
+           "seconds": time.perf_counter() - t0}
+    (log.info if rows else log.debug)("Reconstruction %s: %d lignes en %d lots (%.1fs, lot max %.0f ms, bascule %.0f ms)",
+             table, rows, batches, out["seconds"], max_batch * 1000, swap * 1000)
+    return out
+
+def _abort(con, table: str) -> None:
+    """Abandon d'une reconstruction: triggers, fantôme et curseur supprimés (la suivante repart de zéro)."""
+    new = f"{table}__rebuild"
+    with atomic(con):
+        for suffix in ("ai", "au", "ad"):
+            con.execute(f"DROP TRIGGER IF EXISTS {new}_{suffix}")
+        con.execute("DELETE FROM meta WHERE key=?", (f"rebuild.{table}",))
+    drop_in_batches(con, new)
+
+def row_key(con, table: str) -> list[str]:
+    """Colonnes identifiant une ligne pour les traitements par lots: l'alias INTEGER PRIMARY KEY ou
+    rowid, la PK d'une table WITHOUT ROWID."""
+    (sql,) = con.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    pk = [r for r in sorted(con.execute(f"PRAGMA table_info({table})"), key=lambda r: r[5]) if r[5]]
+    if "WITHOUT ROWID" in sql.upper():
+        return [r[1] for r in pk]
+    if len(pk) == 1 and str(pk[0][2]).upper() == "INTEGER":
+        return [pk[0][1]]
+    return ["rowid"]
+
+def drop_in_batches(con, name: str, batch: int | None = None) -> float:
+    """Vide `name` par lots puis la supprime (sans effet si elle n'existe pas). Renvoie le lot le plus long (s)."""
+    batch = int(batch or BATCH)
+    worst = 0.0
+    while con.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone():
+        cols = ", ".join(row_key(con, name))
+        s = time.perf_counter()
+        with atomic(con):
+            n = con.execute(f"DELETE FROM {name} WHERE ({cols}) IN (SELECT {cols} FROM {name} LIMIT ?)",
+                            (batch,)).rowcount
+            if n < batch:
+                con.execute(f"DROP TABLE {name}")
+        worst = max(worst, time.perf_counter() - s)
+    return worst
@@ -0,0 +1,106 @@
+# bot/core/db/retention.py
+"""
+Purge par lots des tables qui ne font que grossir (journaux dont le jeu ne relit que le jour courant).
+
+Découpage par plages de clé de ligne (rowid / alias INTEGER PRIMARY KEY, ou PK des tables WITHOUT
+ROWID): chaque lot parcourt au plus `batch` lignes, quel que soit le nombre de lignes à supprimer,
+et ne tient le verrou d'écriture que le temps de son DELETE (bornes lues hors transaction).
+
+Mode archive: les lignes sont d'abord copiées dans `archive.db` (même schéma, INSERT OR IGNORE),
+puis supprimées de la base principale seulement si elles sont bien dans l'archive: en WAL, une
+transaction sur deux fichiers n'est pas atomique, on ne supprime donc jamais avant d'avoir archivé.
+"""
+from __future__ import annotations
+import os, re, time
+from contextlib import contextmanager
+
+from .base import DATA_DIR, atomic
+from .rebuild import row_key
+
+ARCHIVE_PATH = os.path.join(DATA_DIR, "archive.db")
+BATCH = 5_000
+VACUUM_STEP = 2_000   # pages rendues par transaction (PRAGMA incremental_vacuum)
+
+
+@contextmanager
+def archive_attached(con, path: str = ARCHIVE_PATH):
+    """Attache l'archive sous le schéma `archive` le temps du bloc (hors transaction)."""
+    con.execute("ATTACH DATABASE ? AS archive", (path,))
+    try:
+        yield con
+    finally:
+        con.execute("DETACH DATABASE archive")
+
+def _ensure_archive_table(con, table: str) -> None:
+    (sql,) = con.execute("SELECT sql FROM main.sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    ddl = re.sub(r'^CREATE TABLE\s+("?)\w+\1', f"CREATE TABLE IF NOT EXISTS archive.{table}", sql, count=1, flags=re.I)
+    con.execute(ddl)
+
+def prune(con, table: str, where: str, params: tuple = (), *, archive: bool = False,
+          batch: int | None = None) -> dict[str, float]:
+    """
+    Supprime de `table` les lignes vérifiant `where` (paramètres positionnels `params`), lot par lot.
+    `archive=True`: copie préalable dans le schéma `archive` (cf. archive_attached).
+    Renvoie {rows, batches, max_batch_s}.
+    """
+    batch = int(batch or BATCH)
+    cols = row_key(con, table)
+    key = ", ".join(cols)
+    tup = f"({key})"
+    marks = f"({', '.join('?' * len(cols))})"
+    if archive:
+        _ensure_archive_table(con, table)
+
+    lo: tuple | None = None
+    rows = batches = 0
+    max_batch = 0.0
+    while True:
+        start = (f"{tup} > {marks}", lo) if lo is not None else ("1", ())
+        hi = con.execute(f"SELECT {key} FROM main.{table} WHERE {start[0]} ORDER BY {key} LIMIT 1 OFFSET ?",
+                         start[1] + (batch - 1,)).fetchone()
+        rng, rng_params = start
+        if hi is not None:
+            rng, rng_params = f"{rng} AND {tup} <= {marks}", rng_params + tuple(hi)
+        cond, cond_params = f"{rng} AND ({where})", rng_params + tuple(params)
+
+        s = time.perf_counter()
+        if archive:
+            # BEGIN différé: seul le fichier d'archive est verrouillé en écriture
+            with atomic(con, immediate=False):
+                con.execute(f"INSERT OR IGNORE INTO archive.{table} SELECT * FROM main.{table} WHERE {cond}",
+                            cond_params)
+            with atomic(con):
+                n = con.execute(f"DELETE FROM main.{table} WHERE {cond} AND {tup} IN "
+                                f"(SELECT {key} FROM archive.{table} WHERE {rng})",
+                                cond_params + rng_params).rowcount
+        else:
+            with atomic(con):
+                n = con.execute(f"DELETE FROM main.{table} WHERE {cond}", cond_params).rowcount
+        rows += max(0, n)
+        batches += 1
+        max_batch = max(max_batch, time.perf_counter() - s)
+        if hi is None:
+            break
+        lo = tuple(hi)
+    return {"rows": rows, "batches": batches, "max_batch_s": max_batch}
+
+def reclaim(con, step: int | None = None) -> tuple[int, int]:
+    """
+    Rend au fichier les pages libres (auto_vacuum=INCREMENTAL), `step` pages par transaction.
+    Renvoie (pages rendues, pages encore libres: non nul si la base n'est pas en auto_vacuum incrémental).
+    """
+    step = int(step or VACUUM_STEP)
+    (mode,) = con.execute("PRAGMA auto_vacuum").fetchone()
+    (free,) = con.execute("PRAGMA freelist_count").fetchone()
+    if int(mode) != 2:
+        return 0, int(free)
+    freed = 0
+    while free:
+        with atomic(con):
+            con.execute(f"PRAGMA incremental_vacuum({step})").fetchall()   # une page par pas: tout consommer
+            (left,) = con.execute("PRAGMA freelist_count").fetchone()
+        if left >= free:
+            break
+        freed += free - left
+        free = left
+    return freed, int(free)
@@ -0,0 +1,89 @@
+# bot/core/db/slowlog.py
+"""
+Traçage SQL (activé par SQL_TRACE=1): temps par requête normalisée, log des requêtes
+au-delà de SQL_SLOW_MS avec la forme des paramètres et l'EXPLAIN QUERY PLAN.
+"""
+from __future__ import annotations
+import logging, re, sqlite3
+from dataclasses import dataclass
+
+from bot.core.config import settings
+
+log = logging.getLogger("larue")
+
+ENABLED = bool(settings.sql_trace)
+SLOW_S = float(settings.sql_slow_ms) / 1000
+MAX_ENTRIES = 500
+
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+_RE_STR = re.compile(r"'(?:[^']|'')*'")
+_RE_NUM = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_WS = re.compile(r"\s+")
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    slow: int = 0
+    plan: str | None = None
+
+
+QUERIES: dict[str, QueryStats] = {}
+
+
+def normalize(sql: str) -> str:
+    s = _RE_STR.sub("?", sql)
+    s = _RE_NUM.sub("?", s)
+    return _RE_WS.sub(" ", s).strip().rstrip(";")
+
+def params_shape(params) -> str:
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}:{type(v).__name__}" for k, v in params.items()) + "}"
+    if isinstance(params, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in params) + ")"
+    return "[many]"
+
+def _stats_for(norm: str) -> QueryStats:
+    st = QUERIES.get(norm)
+    if st is None:
+        if len(QUERIES) >= MAX_ENTRIES:
+            # on oublie la requête la moins coûteuse pour rester borné
+            QUERIES.pop(min(QUERIES, key=lambda k: QUERIES[k].total_s))
+        st = QUERIES[norm] = QueryStats()
+    return st
+
+def _explain(con: sqlite3.Connection, sql: str, params) -> str:
+    try:
+        rows = sqlite3.Connection.execute(con, "EXPLAIN QUERY PLAN " + sql, params or ()).fetchall()
+        return " | ".join(str(r[3]) for r in rows)
+    except Exception as e:
+        return f"n/a ({e})"
+
+def record(sql: str, elapsed_s: float, cumulative_s: float, *, new_call: bool) -> None:
+    """
+    new_call=True à l'exécution; False pour un fetch du même curseur (temps ajouté, pas recompté).
+    cumulative_s = exécution + fetchs déjà vus pour cet appel.
+    """
+    st = _stats_for(normalize(sql))
+    if new_call:
+        st.count += 1
+    st.total_s += elapsed_s
+    st.max_s = max(st.max_s, cumulative_s)
+
+def log_slow(con: sqlite3.Connection, sql: str, params, elapsed_s: float) -> None:
+    """Une fois par appel, quand le temps cumulé franchit SQL_SLOW_MS."""
+    norm = normalize(sql)
+    st = _stats_for(norm)
+    st.slow += 1
+    if st.plan is None and norm.upper().startswith(_EXPLAINABLE) and isinstance(params, (tuple, list, dict)):
+        st.plan = _explain(con, sql, params)
+    log.warning("SQL lente %.1f ms: %s | params=%s | plan=%s",
+                elapsed_s * 1000, norm, params_shape(params), st.plan or "n/a")
+
+def top(limit: int = 5) -> list[tuple[str, QueryStats]]:
+    """Requêtes les plus coûteuses (temps cumulé)."""
+    return sorted(QUERIES.items(), key=lambda kv: kv[1].total_s, reverse=True)[:limit]
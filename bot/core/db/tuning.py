@@ -0,0 +1,136 @@
+# bot/core/db/tuning.py
+"""
+Profils de réglage SQLite (DB_PROFILE), dimensionnés une fois au démarrage d'après la taille de la
+base et la RAM disponible (limite du conteneur comprise):
+- low-memory: petit VPS (≤ 1 Go): cache minimal, pas de mmap, temporaires sur disque, WAL court;
+- default: cache ≈ 1/4 de la base, mmap de la base entière (plafonné), temporaires en mémoire;
+- throughput: base entière en cache et en mmap (avec marge de croissance), WAL long: moins de
+  checkpoints sur le chemin des écritures (maintenance.py les fait en période creuse).
+
+Le cache est PAR connexion (thread de la boucle, threads de travail, pool de lecture): son plafond
+RAM est partagé entre elles. Le mmap, lui, est le cache de l'OS, commun à tout le process.
+DB_CACHE_MB / DB_MMAP_MB (≥ 0) forcent une valeur, DB_RAM_MB la RAM vue (0 = détectée).
+page_size ne s'applique qu'à une base neuve. Choisir un profil: python -m bench.tuning
+"""
+from __future__ import annotations
+import logging, os
+from dataclasses import dataclass
+
+from bot.core.config import settings
+
+try:
+    import psutil  # facultatif
+except Exception:  # pragma: no cover
+    psutil = None  # type: ignore
+
+log = logging.getLogger("larue")
+
+MIB = 1024 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class Profile:
+    cache_db_frac: float        # part de la base gardée en cache de pages
+    cache_min_mb: int
+    cache_max_mb: int
+    mmap_db_frac: float         # 0 = pas de mmap; > 1 = marge pour la croissance
+    mmap_max_mb: int
+    ram_frac: float             # plafond (cache de toutes les connexions + mmap) en part de la RAM
+    temp_store: str             # MEMORY | FILE
+    wal_autocheckpoint: int     # pages
+    page_size: int              # base neuve uniquement
+
+
+PROFILES: dict[str, Profile] = {
+    "low-memory": Profile(0.05, 2, 8, 0.0, 0, 0.05, "FILE", 500, 4096),
+    "default":    Profile(0.25, 8, 64, 1.5, 256, 0.15, "MEMORY", 1000, 4096),
+    "throughput": Profile(1.0, 32, 512, 2.0, 4096, 0.40, "MEMORY", 4000, 8192),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Tuning:
+    profile: str
+    cache_kib: int              # par connexion
+    mmap_bytes: int
+    temp_store: str
+    wal_autocheckpoint: int
+    page_size: int
+    db_bytes: int
+    ram_bytes: int | None
+
+
+def _cgroup_free() -> int | None:
+    """Marge sous la limite mémoire du cgroup (v2 puis v1), None sans limite."""
+    for limit_f, used_f in (("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+                            ("/sys/fs/cgroup/memory/memory.limit_in_bytes",
+                             "/sys/fs/cgroup/memory/memory.usage_in_bytes")):
+        try:
+            with open(limit_f) as f:
+                raw = f.read().strip()
+            if raw == "max" or int(raw) >= 1 << 60:
+                return None
+            with open(used_f) as f:
+                return max(0, int(raw) - int(f.read().strip()))
+        except (OSError, ValueError):
+            continue
+    return None
+
+def available_ram() -> int | None:
+    """RAM disponible (octets): DB_RAM_MB, sinon min(OS, cgroup); None si introuvable."""
+    if settings.db_ram_mb > 0:
+        return settings.db_ram_mb * MIB
+    avail = None
+    if psutil:
+        avail = int(psutil.virtual_memory().available)
+    else:
+        try:
+            with open("/proc/meminfo") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        avail = int(line.split()[1]) * 1024
+                        break
+        except (OSError, ValueError):
+            pass
+    cg = _cgroup_free()
+    if cg is not None:
+        avail = cg if avail is None else min(avail, cg)
+    return avail
+
+def resolve(name: str | None = None, db_bytes: int = 0, ram_bytes: int | None = None) -> Tuning:
+    name = (name or settings.db_profile).strip().lower()
+    p = PROFILES.get(name)
+    if p is None:
+        raise ValueError(f"DB_PROFILE inconnu: {name!r} (choix: {', '.join(PROFILES)})")
+
+    cache = min(max(db_bytes * p.cache_db_frac, p.cache_min_mb * MIB), p.cache_max_mb * MIB)
+    mmap = min(db_bytes * p.mmap_db_frac, p.mmap_max_mb * MIB) if p.mmap_db_frac else 0
+    if ram_bytes:
+        budget = ram_bytes * p.ram_frac
+        mmap = min(mmap, budget / 2)
+        conns = max(1, settings.db_read_pool) + 2     # pool + boucle + un thread de travail
+        cache = max(p.cache_min_mb * MIB, min(cache, (budget - mmap) / conns))
+    if settings.db_cache_mb >= 0:
+        cache = settings.db_cache_mb * MIB
+    if settings.db_mmap_mb >= 0:
+        mmap = settings.db_mmap_mb * MIB
+    return Tuning(name, int(cache // 1024), int(mmap), p.temp_store, p.wal_autocheckpoint, p.page_size,
+                  int(db_bytes), ram_bytes)
+
+_current: Tuning | None = None
+
+def current(db_path: str) -> Tuning:
+    """Réglage du process, calculé à la première connexion (la taille de la base n'est lue qu'une fois)."""
+    global _current
+    if _current is None:
+        try:
+            db_bytes = os.path.getsize(db_path) + os.path.getsize(db_path + "-wal")
+        except OSError:
+            db_bytes = os.path.getsize(db_path) if os.path.exists(db_path) else 0
+        _current = resolve(db_bytes=db_bytes, ram_bytes=available_ram())
+        t = _current
+        log.info("SQLite: profil %s, cache %.0f Mo/connexion, mmap %.0f Mo, temp_store %s, "
+                 "wal_autocheckpoint %d (base %.0f Mo, RAM dispo %s)",
+                 t.profile, t.cache_kib / 1024, t.mmap_bytes / MIB, t.temp_store, t.wal_autocheckpoint,
+                 t.db_bytes / MIB, f"{t.ram_bytes / MIB:.0f} Mo" if t.ram_bytes else "n/a")
+    return _current
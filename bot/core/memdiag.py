@@ -0,0 +1,116 @@
+# bot/core/memdiag.py
+"""
+Diagnostic mémoire: instantanés tracemalloc comparés à une référence, Views vivantes par
+classe, tailles des caches discord.py et des caches internes (metrics.CACHES & co).
+tracemalloc ralentit les allocations → activé seulement à la demande (/admin memoire).
+"""
+from __future__ import annotations
+import collections, os, tracemalloc, weakref
+from typing import Any
+
+from . import metrics
+
+FRAMES = 10
+_PKG_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Toutes les InstrumentedView construites et pas encore collectées
+LIVE_VIEWS: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+_baseline: tracemalloc.Snapshot | None = None
+
+
+def track_view(view) -> None:
+    LIVE_VIEWS.add(view)
+
+def view_counts() -> dict[str, tuple[int, int]]:
+    """classe -> (vivantes, dont terminées mais encore référencées)."""
+    out: dict[str, list[int]] = collections.defaultdict(lambda: [0, 0])
+    for v in list(LIVE_VIEWS):
+        row = out[type(v).__name__]
+        row[0] += 1
+        row[1] += 1 if v.is_finished() else 0
+    return {k: (a, b) for k, (a, b) in sorted(out.items())}
+
+def discord_caches(client) -> dict[str, int]:
+    """Tailles des caches internes de discord.py (best effort, attributs privés)."""
+    state = getattr(client, "_connection", None)
+    guilds = list(getattr(client, "guilds", []))
+    out = {
+        "guilds": len(guilds),
+        "members": sum(len(g.members) for g in guilds),
+        "channels": sum(len(g.channels) for g in guilds),
+        "roles": sum(len(g.roles) for g in guilds),
+        "users": len(getattr(client, "users", [])),
+        "emojis": len(getattr(client, "emojis", [])),
+        "messages": len(getattr(client, "cached_messages", [])),
+    }
+    store = getattr(state, "_view_store", None)
+    if store is not None:
+        out["view_store.items"] = sum(len(d) for d in getattr(store, "_views", {}).values())
+        out["view_store.messages"] = len(getattr(store, "_synced_message_views", {}))
+    return out
+
+def app_caches() -> dict[str, int]:
+    """Caches et tampons internes du bot."""
+    from .db import slowlog
+    from . import sysmon, watchdog
+    from ..persistence import stats as stats_repo
+    out = {f"cache:{name}": len(c) for name, c in sorted(metrics.CACHES.items())}
+    out.update({
+        "metrics.commands": len(metrics.COMMANDS),
+        "metrics.tx_sites": len(metrics.TX_SITES),
+        "slowlog.queries": len(slowlog.QUERIES),
+        "sysmon.ring": len(sysmon.RING),
+        "watchdog.stalls": len(watchdog.RECENT_STALLS),
+        "stats.pending": stats_repo.pending_count(),
+    })
+    return out
+
+# ─────────────────────────────
+# tracemalloc
+# ─────────────────────────────
+def is_tracing() -> bool:
+    return tracemalloc.is_tracing()
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+
+def start() -> None:
+    """Démarre le traçage (si besoin) et prend l'instantané de référence."""
+    global _baseline
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(FRAMES)
+    _baseline = _snapshot()
+
+def stop() -> None:
+    global _baseline
+    _baseline = None
+    tracemalloc.stop()
+
+def _where(tb: tracemalloc.Traceback) -> str:
+    # frame la plus récente dans le code du bot si possible, sinon la plus récente tout court
+    frames = list(tb)
+    pick = next((f for f in reversed(frames) if f.filename.startswith(_PKG_ROOT)), frames[-1])
+    path = pick.filename[len(_PKG_ROOT) + 1:] if pick.filename.startswith(_PKG_ROOT) else pick.filename
+    return f"{path}:{pick.lineno}"
+
+def diff(limit: int = 10) -> tuple[int, int, list[tuple[str, int, int]]]:
+    """
+    Compare à la référence: (mémoire tracée actuelle, pic, [(site, Δoctets, Δblocs)])
+    regroupé par site d'allocation (traceback). Lourd: à lancer hors event loop.
+    """
+    if not tracemalloc.is_tracing() or _baseline is None:
+        raise RuntimeError("tracemalloc inactif: lance d'abord l'action 'démarrer'")
+    current, peak = tracemalloc.get_traced_memory()
+    stats = _snapshot().compare_to(_baseline, "traceback")
+    grouped: dict[str, list[int]] = collections.defaultdict(lambda: [0, 0])
+    for st in stats:
+        row = grouped[_where(st.traceback)]
+        row[0] += st.size_diff
+        row[1] += st.count_diff
+    top = sorted(grouped.items(), key=lambda kv: abs(kv[1][0]), reverse=True)[:limit]
+    return current, peak, [(site, d[0], d[1]) for site, d in top]
@@ -0,0 +1,280 @@
+# bot/core/metrics.py
+"""
+Instrumentation légère des commandes: latence totale + découpage DB / API Discord / sleeps.
+Histogrammes à seaux fixes sur fenêtre glissante → mémoire constante par commande.
+"""
+from __future__ import annotations
+import asyncio, bisect, contextvars, functools, logging, time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from bot.domain import clock
+from . import traffic
+
+log = logging.getLogger("larue")
+
+# Bornes (ms): 0 (phase absente) puis géométriques ×1.35 de 0.1 ms à ~100 s
+BOUNDS_MS: tuple[float, ...] = (0.0,) + tuple(0.1 * 1.35 ** i for i in range(47))
+
+WINDOW_S = 60      # largeur d'une fenêtre
+WINDOWS = 15       # fenêtres conservées → 15 min glissantes
+
+
+class RollingHistogram:
+    """Compteurs par seau, sur WINDOWS fenêtres de WINDOW_S secondes (anneau)."""
+
+    __slots__ = ("_counts", "_epochs")
+
+    def __init__(self) -> None:
+        self._counts = [[0] * (len(BOUNDS_MS) + 1) for _ in range(WINDOWS)]
+        self._epochs = [-1] * WINDOWS
+
+    def observe(self, ms: float) -> None:
+        epoch = int(time.monotonic() // WINDOW_S)
+        slot = epoch % WINDOWS
+        if self._epochs[slot] != epoch:
+            self._counts[slot] = [0] * (len(BOUNDS_MS) + 1)
+            self._epochs[slot] = epoch
+        self._counts[slot][bisect.bisect_left(BOUNDS_MS, ms)] += 1
+
+    def merged(self) -> list[int]:
+        oldest = int(time.monotonic() // WINDOW_S) - WINDOWS + 1
+        out = [0] * (len(BOUNDS_MS) + 1)
+        for slot, epoch in enumerate(self._epochs):
+            if epoch >= oldest:
+                for i, c in enumerate(self._counts[slot]):
+                    out[i] += c
+        return out
+
+    def percentiles(self, *qs: float) -> tuple[int, list[float]]:
+        """(nb d'observations, [valeurs ms]) — borne haute du seau contenant le quantile."""
+        counts = self.merged()
+        n = sum(counts)
+        if n == 0:
+            return 0, [0.0 for _ in qs]
+        res: list[float] = []
+        for q in qs:
+            rank, acc = q * n, 0
+            for i, c in enumerate(counts):
+                acc += c
+                if acc >= rank:
+                    res.append(BOUNDS_MS[i] if i < len(BOUNDS_MS) else BOUNDS_MS[-1])
+                    break
+        return n, res
+
+
+@dataclass
+class CommandStats:
+    total: RollingHistogram = field(default_factory=RollingHistogram)
+    db: RollingHistogram = field(default_factory=RollingHistogram)
+    api: RollingHistogram = field(default_factory=RollingHistogram)
+    sleep: RollingHistogram = field(default_factory=RollingHistogram)
+    calls: int = 0          # depuis le boot
+    errors: int = 0
+    sum_ms: float = 0.0
+    statements: int = 0     # requêtes SQL cumulées (→ SQL par appel)
+
+
+@dataclass
+class _Span:
+    db_s: float = 0.0
+    api_s: float = 0.0
+    sleep_s: float = 0.0
+    db_n: int = 0
+
+
+@dataclass
+class TxStats:
+    """Transactions atomic() d'un site d'appel: attente du verrou d'écriture et durée de détention."""
+    wait: RollingHistogram = field(default_factory=RollingHistogram)
+    hold: RollingHistogram = field(default_factory=RollingHistogram)
+    count: int = 0          # depuis le boot
+    rollbacks: int = 0
+    wait_s: float = 0.0
+    hold_s: float = 0.0
+    max_wait_s: float = 0.0
+
+
+COMMANDS: dict[str, CommandStats] = {}
+TX_SITES: dict[str, TxStats] = {}
+
+# Compteurs DB globaux (depuis le boot)
+BUSY_WAIT_MS = 1.0   # un BEGIN IMMEDIATE plus lent que ça = on a attendu le verrou d'écriture
+DB: dict[str, float] = {
+    "statements": 0,
+    "tx_commit": 0,
+    "tx_rollback": 0,
+    "busy_waits": 0,
+    "busy_wait_s": 0.0,
+}
+
+# Caches exposés (objets avec .hits / .misses / __len__)
+CACHES: dict[str, Any] = {}
+
+def register_cache(name: str, cache: Any) -> None:
+    CACHES[name] = cache
+
+_span: contextvars.ContextVar[_Span | None] = contextvars.ContextVar("larue_span", default=None)
+
+
+# ─────────────────────────────
+# Comptabilité des phases
+# ─────────────────────────────
+def add_db(elapsed_s: float, statements: int = 1) -> None:
+    DB["statements"] += statements
+    span = _span.get()
+    if span is not None:
+        span.db_s += elapsed_s
+        span.db_n += statements
+
+def add_api(elapsed_s: float) -> None:
+    span = _span.get()
+    if span is not None:
+        span.api_s += elapsed_s
+
+def record_tx(begin_wait_s: float, committed: bool, hold_s: float = 0.0, site: str | None = None) -> None:
+    DB["tx_commit" if committed else "tx_rollback"] += 1
+    if begin_wait_s * 1000 >= BUSY_WAIT_MS:
+        DB["busy_waits"] += 1
+        DB["busy_wait_s"] += begin_wait_s
+    if site is None:
+        return
+    st = TX_SITES.get(site)
+    if st is None:
+        st = TX_SITES[site] = TxStats()
+    st.count += 1
+    st.rollbacks += 0 if committed else 1
+    st.wait_s += begin_wait_s
+    st.hold_s += hold_s
+    st.max_wait_s = max(st.max_wait_s, begin_wait_s)
+    st.wait.observe(begin_wait_s * 1000)
+    st.hold.observe(hold_s * 1000)
+
+async def sleep(delay: float) -> None:
+    """asyncio.sleep compté comme temps d'animation de la commande en cours."""
+    t0 = time.perf_counter()
+    try:
+        await asyncio.sleep(delay)
+    finally:
+        span = _span.get()
+        if span is not None:
+            span.sleep_s += time.perf_counter() - t0
+
+async def timed(name: str, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+    """Exécute `fn` dans un span et enregistre sa latence sous `name`."""
+    parent = _span.get()
+    span = _Span()
+    token = _span.set(span)
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        result = await fn(*args, **kwargs)
+        ok = True
+        return result
+    finally:
+        _span.reset(token)
+        total_ms = (time.perf_counter() - t0) * 1000
+        st = COMMANDS.get(name)
+        if st is None:
+            st = COMMANDS[name] = CommandStats()
+        st.calls += 1
+        st.errors += 0 if ok else 1
+        st.sum_ms += total_ms
+        st.statements += span.db_n
+        st.total.observe(total_ms)
+        st.db.observe(span.db_s * 1000)
+        st.api.observe(span.api_s * 1000)
+        st.sleep.observe(span.sleep_s * 1000)
+        if parent is not None:
+            parent.db_s += span.db_s
+            parent.api_s += span.api_s
+            parent.sleep_s += span.sleep_s
+            parent.db_n += span.db_n
+
+
+# ─────────────────────────────
+# Middleware: commandes slash & callbacks de View
+# ─────────────────────────────
+def _wrap(name: str, fn: Callable[..., Awaitable[Any]], view=None, item=None) -> Callable[..., Awaitable[Any]]:
+    @functools.wraps(fn)
+    async def wrapped(*args: Any, **kwargs: Any) -> Any:
+        pinned = clock.pin()
+        token = traffic.capture(name, args, kwargs, origin=getattr(view, "origin_id", None),
+                                values=getattr(item, "values", None)) if traffic.ENABLED else None
+        try:
+            return await timed(name, fn, *args, **kwargs)
+        finally:
+            traffic.release(token)
+            clock.unpin(pinned)
+    wrapped.__larue_timed__ = True  # type: ignore[attr-defined]
+    return wrapped
+
+def instrument_tree(tree, guild=None) -> int:
+    """Enveloppe chaque commande (sous-commandes comprises) pas encore instrumentée."""
+    from discord import app_commands
+    n = 0
+    for cmd in tree.walk_commands(guild=guild):
+        if isinstance(cmd, app_commands.Command) and not getattr(cmd._callback, "__larue_timed__", False):
+            cmd._callback = _wrap(cmd.qualified_name, cmd._callback)
+            n += 1
+    return n
+
+def instrument_view(view) -> None:
+    for item in view.children:
+        cb = getattr(item, "callback", None)
+        if cb is None or getattr(cb, "__larue_timed__", False):
+            continue
+        fn_name = getattr(getattr(cb, "callback", None), "__name__", None) or type(item).__name__
+        item.callback = _wrap(f"view:{type(view).__name__}.{fn_name}", cb, view, item)
+
+def install_http_timing(client) -> None:
+    """Compte le temps passé dans les appels REST (client.http + webhooks d'interaction)."""
+    from discord.webhook import async_ as wh
+
+    def _timed_request(orig):
+        @functools.wraps(orig)
+        async def request(*args: Any, **kwargs: Any) -> Any:
+            t0 = time.perf_counter()
+            try:
+                return await orig(*args, **kwargs)
+            finally:
+                add_api(time.perf_counter() - t0)
+        request.__larue_timed__ = True  # type: ignore[attr-defined]
+        return request
+
+    if not getattr(client.http.request, "__larue_timed__", False):
+        client.http.request = _timed_request(client.http.request)
+    if not getattr(wh.AsyncWebhookAdapter.request, "__larue_timed__", False):
+        wh.AsyncWebhookAdapter.request = _timed_request(wh.AsyncWebhookAdapter.request)
+
+
+# ─────────────────────────────
+# Lecture (pour /debug)
+# ─────────────────────────────
+def latency_report(limit: int = 8) -> list[dict]:
+    """Commandes les plus appelées sur la fenêtre glissante, avec p50/p95/p99 et p95 par phase."""
+    out: list[dict] = []
+    for name, st in COMMANDS.items():
+        n, (p50, p95, p99) = st.total.percentiles(0.50, 0.95, 0.99)
+        if n == 0:
+            continue
+        _, (db95,) = st.db.percentiles(0.95)
+        _, (api95,) = st.api.percentiles(0.95)
+        _, (sl95,) = st.sleep.percentiles(0.95)
+        out.append({"name": name, "n": n, "p50": p50, "p95": p95, "p99": p99,
+                    "db95": db95, "api95": api95, "sleep95": sl95})
+    out.sort(key=lambda r: r["n"], reverse=True)
+    return out[:limit]
+
+def contention_report(limit: int = 5) -> list[dict]:
+    """Sites atomic() classés par temps d'attente du verrou (fenêtre glissante pour les percentiles)."""
+    out: list[dict] = []
+    for site, st in TX_SITES.items():
+        n, (w50, w95, w99) = st.wait.percentiles(0.50, 0.95, 0.99)
+        if n == 0:
+            continue
+        _, (h95,) = st.hold.percentiles(0.95)
+        out.append({"site": site, "n": n, "wait50": w50, "wait95": w95, "wait99": w99,
+                    "hold95": h95, "wait_s": st.wait_s, "max_wait_ms": st.max_wait_s * 1000})
+    out.sort(key=lambda r: (r["wait_s"], r["hold95"]), reverse=True)
+    return out[:limit]
@@ -0,0 +1,147 @@
+# bot/core/metrics_http.py
+"""
+Petit serveur HTTP local (aiohttp) pour l'orchestrateur:
+  /metrics  → format texte Prometheus
+  /healthz  → process vivant + DB qui répond
+  /readyz   → idem + gateway Discord prête
+Ne démarre que si METRICS_PORT > 0; écoute sur METRICS_HOST (localhost par défaut).
+"""
+from __future__ import annotations
+import asyncio, logging, math
+
+from aiohttp import web
+
+from .config import settings
+from . import memdiag, metrics, watchdog
+from .db.base import get_conn
+
+log = logging.getLogger("larue")
+
+_runner: web.AppRunner | None = None
+
+def _ping_db() -> None:
+    get_conn().execute("SELECT 1").fetchone()
+
+async def _db_ok(timeout: float = 2.0) -> bool:
+    try:
+        await asyncio.wait_for(asyncio.to_thread(_ping_db), timeout)
+        return True
+    except Exception as e:
+        log.warning("healthcheck DB KO: %s", e)
+        return False
+
+# ─────────────────────────────
+# Rendu Prometheus
+# ─────────────────────────────
+def _esc(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render_prometheus(client) -> str:
+    out: list[str] = []
+
+    def metric(name: str, kind: str, help_: str, samples: list[tuple[str, float]]) -> None:
+        out.append(f"# HELP {name} {help_}")
+        out.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            out.append(f"{name}{labels} {value:.6g}" if isinstance(value, float) else f"{name}{labels} {value}")
+
+    cmds = sorted(metrics.COMMANDS.items())
+    metric("larue_command_calls_total", "counter", "Commandes exécutées depuis le boot.",
+           [(f'{{command="{_esc(n)}"}}', st.calls) for n, st in cmds])
+    metric("larue_command_errors_total", "counter", "Commandes terminées en exception.",
+           [(f'{{command="{_esc(n)}"}}', st.errors) for n, st in cmds])
+
+    lat: list[tuple[str, float]] = []
+    phases: list[tuple[str, float]] = []
+    for n, st in cmds:
+        _, qs = st.total.percentiles(0.5, 0.95, 0.99)
+        for q, v in zip(("0.5", "0.95", "0.99"), qs):
+            lat.append((f'{{command="{_esc(n)}",quantile="{q}"}}', v / 1000))
+        for phase in ("db", "api", "sleep"):
+            _, (p95,) = getattr(st, phase).percentiles(0.95)
+            phases.append((f'{{command="{_esc(n)}",phase="{phase}",quantile="0.95"}}', p95 / 1000))
+    metric("larue_command_latency_seconds", "summary", "Latence des commandes (fenêtre glissante 15 min).",
+           lat + [(f'_sum{{command="{_esc(n)}"}}', st.sum_ms / 1000) for n, st in cmds]
+               + [(f'_count{{command="{_esc(n)}"}}', st.calls) for n, st in cmds])
+    metric("larue_command_phase_seconds", "gauge", "p95 par phase (db/api/sleep), fenêtre 15 min.", phases)
+
+    db = metrics.DB
+    metric("larue_db_statements_total", "counter", "Requêtes SQL exécutées.", [("", int(db["statements"]))])
+    metric("larue_db_transactions_total", "counter", "Transactions atomic() par issue.",
+           [('{result="commit"}', int(db["tx_commit"])), ('{result="rollback"}', int(db["tx_rollback"]))])
+    metric("larue_db_busy_waits_total", "counter", "BEGIN IMMEDIATE ayant attendu le verrou d'écriture.",
+           [("", int(db["busy_waits"]))])
+    metric("larue_db_busy_wait_seconds_total", "counter", "Temps cumulé d'attente du verrou d'écriture.",
+           [("", float(db["busy_wait_s"]))])
+
+    tx_wait: list[tuple[str, float]] = []
+    tx_hold: list[tuple[str, float]] = []
+    for site, st in sorted(metrics.TX_SITES.items()):
+        _, (w50, w95, w99) = st.wait.percentiles(0.5, 0.95, 0.99)
+        _, (h95,) = st.hold.percentiles(0.95)
+        for q, v in zip(("0.5", "0.95", "0.99"), (w50, w95, w99)):
+            tx_wait.append((f'{{site="{_esc(site)}",quantile="{q}"}}', v / 1000))
+        tx_hold.append((f'{{site="{_esc(site)}",quantile="0.95"}}', h95 / 1000))
+    tx_sites = sorted(metrics.TX_SITES.items())
+    metric("larue_db_lock_wait_seconds", "summary", "Attente du verrou d'écriture par site atomic() (fenêtre 15 min).",
+           tx_wait + [(f'_sum{{site="{_esc(s)}"}}', st.wait_s) for s, st in tx_sites]
+                   + [(f'_count{{site="{_esc(s)}"}}', st.count) for s, st in tx_sites])
+    metric("larue_db_lock_hold_seconds", "gauge", "p95 de détention du verrou par site atomic() (fenêtre 15 min).", tx_hold)
+
+    metric("larue_event_loop_lag_seconds", "gauge", "Retard de l'event loop (dernière mesure / max).",
+           [('{stat="last"}', watchdog.LAG["last_s"]), ('{stat="max"}', watchdog.LAG["max_s"])])
+    metric("larue_event_loop_stalls_total", "counter", "Blocages de l'event loop au-delà de LOOP_LAG_WARN_MS.",
+           [("", int(watchdog.STALLS["count"]))])
+    metric("larue_event_loop_stall_seconds_total", "counter", "Temps cumulé d'event loop bloquée.",
+           [("", float(watchdog.STALLS["total_s"]))])
+
+    latency = float(getattr(client, "latency", float("nan")))
+    metric("larue_gateway_latency_seconds", "gauge", "Latence heartbeat gateway Discord.",
+           [("", latency)] if math.isfinite(latency) else [])
+
+    hits = [(f'{{cache="{_esc(n)}"}}', int(c.hits)) for n, c in sorted(metrics.CACHES.items())]
+    misses = [(f'{{cache="{_esc(n)}"}}', int(c.misses)) for n, c in sorted(metrics.CACHES.items())]
+    sizes = [(f'{{cache="{_esc(n)}"}}', len(c)) for n, c in sorted(metrics.CACHES.items())]
+    metric("larue_cache_hits_total", "counter", "Hits par cache.", hits)
+    metric("larue_cache_misses_total", "counter", "Misses par cache.", misses)
+    metric("larue_cache_entries", "gauge", "Entrées par cache.", sizes)
+
+    metric("larue_live_views", "gauge", "Views (boutons) encore en mémoire, par classe.",
+           [(f'{{view="{_esc(k)}"}}', n) for k, (n, _) in memdiag.view_counts().items()])
+
+    return "\n".join(out) + "\n"
+
+# ─────────────────────────────
+# Serveur
+# ─────────────────────────────
+def _app(client) -> web.Application:
+    async def h_metrics(_: web.Request) -> web.Response:
+        return web.Response(text=render_prometheus(client), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    async def h_healthz(_: web.Request) -> web.Response:
+        ok = await _db_ok()
+        return web.json_response({"ok": ok, "db": ok}, status=200 if ok else 503)
+
+    async def h_readyz(_: web.Request) -> web.Response:
+        db_ok = await _db_ok()
+        gw_ok = bool(client.is_ready()) and not client.is_closed()
+        ok = db_ok and gw_ok
+        return web.json_response({"ok": ok, "db": db_ok, "gateway": gw_ok}, status=200 if ok else 503)
+
+    app = web.Application()
+    app.router.add_get("/metrics", h_metrics)
+    app.router.add_get("/healthz", h_healthz)
+    app.router.add_get("/readyz", h_readyz)
+    return app
+
+async def start(client) -> None:
+    """Idempotent (on_ready peut être rappelé après une reconnexion)."""
+    global _runner
+    if _runner is not None or settings.metrics_port <= 0:
+        return
+    runner = web.AppRunner(_app(client), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, settings.metrics_host, settings.metrics_port).start()
+    _runner = runner
+    log.info("Metrics HTTP sur http://%s:%d (/metrics /healthz /readyz)", settings.metrics_host, settings.metrics_port)
@@ -0,0 +1,143 @@
+# bot/core/profiler.py
+"""
+Profileur par échantillonnage, à chaud (sans redémarrer): un thread lit les piles de tous
+les threads via sys._current_frames() toutes les `interval_s`, pendant `seconds`.
+Sortie au format "collapsed stacks" (flamegraph.pl / speedscope / inferno) dans DATA_DIR/profiles.
+"""
+from __future__ import annotations
+import collections, os, sys, threading, time
+from dataclasses import dataclass, field
+
+from .db.base import DATA_DIR
+
+PROFILES_DIR = os.path.join(DATA_DIR, "profiles")
+MAX_SECONDS = 120
+MIN_INTERVAL_S = 0.001
+# Un thread est « en attente » s'il a consommé moins de IDLE_CPU_FRAC de CPU depuis la passe
+# précédente (horloge CPU du thread): time.sleep, select, Lock.acquire... sont du C sans frame Python,
+# la feuille de la pile n'est que leur appelant Python et ne dit rien de l'état réel.
+IDLE_CPU_FRAC = 0.05
+# Repli sans horloge CPU par thread (hors POSIX, ou première passe d'un thread): feuilles Python qui
+# n'appellent que de l'attente (selectors.select de l'event loop, Condition.wait, socket.accept...) et
+# appelants Python connus de time.sleep (watchdog._watch)
+IDLE_LEAVES = frozenset({"select", "poll", "wait", "_wait", "accept", "recv_into", "_worker", "_watch"})
+
+_lock = threading.Lock()
+_PKG_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass
+class Profile:
+    path: str
+    seconds: float
+    samples: int = 0                    # passes d'échantillonnage
+    idle: int = 0                       # piles de threads en attente (cf. IDLE_CPU_FRAC)
+    threads: dict[str, list[int]] = field(default_factory=dict)                      # nom -> [actives, attente]
+    overhead_s: float = 0.0             # temps passé à échantillonner
+    self_counts: collections.Counter = field(default_factory=collections.Counter)
+    total_counts: collections.Counter = field(default_factory=collections.Counter)   # frames du bot
+
+    @property
+    def overhead_pct(self) -> float:
+        return 100.0 * self.overhead_s / self.seconds if self.seconds else 0.0
+
+    def top(self, limit: int = 10, *, cumulative: bool = False) -> list[tuple[str, int]]:
+        return (self.total_counts if cumulative else self.self_counts).most_common(limit)
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    if path.startswith(_PKG_ROOT):
+        path = path[len(_PKG_ROOT) + 1:]
+    # ';' est le séparateur du format collapsed
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+def _stack(frame) -> list[str]:
+    out: list[str] = []
+    while frame is not None:
+        out.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    out.reverse()
+    return out
+
+def _cpu_clock(tid: int) -> int | None:
+    try:
+        return time.pthread_getcpuclockid(tid)
+    except (AttributeError, OSError):
+        return None
+
+def _cpu_time(clock: int | None) -> float | None:
+    if clock is None:
+        return None
+    try:
+        return time.clock_gettime(clock)
+    except OSError:      # thread terminé entre-temps
+        return None
+
+def is_running() -> bool:
+    return _lock.locked()
+
+def run(seconds: float, interval_s: float = 0.005) -> Profile:
+    """
+    Bloquant: à lancer via asyncio.to_thread. Un seul profil à la fois (RuntimeError sinon).
+    """
+    seconds = max(1.0, min(float(seconds), MAX_SECONDS))
+    interval_s = max(MIN_INTERVAL_S, float(interval_s))
+    if not _lock.acquire(blocking=False):
+        raise RuntimeError("un profil est déjà en cours")
+    try:
+        os.makedirs(PROFILES_DIR, exist_ok=True)
+        path = os.path.join(PROFILES_DIR, time.strftime("profile-%Y%m%d-%H%M%S.collapsed"))
+        prof = Profile(path=path, seconds=seconds)
+        stacks: collections.Counter[str] = collections.Counter()
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+
+        clocks: dict[int, int | None] = {}
+        cpu_prev: dict[int, float] = {}
+        t_prev = time.perf_counter()
+
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            t0 = time.perf_counter()
+            wall, t_prev = t0 - t_prev, t0
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                frames = _stack(frame)
+                if not frames:
+                    continue
+                leaf = frames[-1]
+                if tid not in clocks:
+                    clocks[tid] = _cpu_clock(tid)
+                cpu, before = _cpu_time(clocks[tid]), cpu_prev.get(tid)
+                if cpu is not None:
+                    cpu_prev[tid] = cpu
+                if cpu is not None and before is not None:
+                    waiting = cpu - before < IDLE_CPU_FRAC * wall
+                else:
+                    waiting = leaf.split(" ", 1)[0] in IDLE_LEAVES
+                if tid not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                per = prof.threads.setdefault(names.get(tid, str(tid)), [0, 0])
+                per[waiting] += 1
+                if waiting:
+                    prof.idle += 1
+                    continue
+                stacks[";".join([names.get(tid, str(tid)), *frames])] += 1
+                prof.self_counts[leaf] += 1
+                # cumulé: seulement le code du bot (la stdlib/asyncio est dans toutes les piles)
+                for f in set(frames):
+                    if f.split("(", 1)[1].startswith("bot" + os.sep):
+                        prof.total_counts[f] += 1
+            prof.samples += 1
+            spent = time.perf_counter() - t0
+            prof.overhead_s += spent
+            time.sleep(max(0.0, interval_s - spent))
+
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in stacks.most_common():
+                f.write(f"{stack} {n}\n")
+        return prof
+    finally:
+        _lock.release()
@@ -0,0 +1,136 @@
+# bot/core/sysmon.py
+"""
+Échantillonneur système en tâche de fond: CPU, RAM, disque, process du bot, latence WS.
+Un échantillon toutes les SYSMON_INTERVAL_S secondes, collecté hors event loop, rangé
+dans un anneau de taille fixe → /sysinfo et /debug lisent l'anneau sans rien mesurer.
+"""
+from __future__ import annotations
+import asyncio, collections, logging, math, os, shutil, socket, time
+from dataclasses import dataclass
+
+from .config import settings
+
+try:
+    import psutil  # facultatif
+except Exception:
+    psutil = None  # type: ignore
+
+log = logging.getLogger("larue")
+
+INTERVAL_S = max(1.0, settings.sysmon_interval_s)
+HISTORY = max(10, settings.sysmon_history)
+MAX_DUTY = 0.02          # l'échantillonnage ne doit pas coûter plus de 2 % d'un cœur
+
+
+@dataclass(frozen=True, slots=True)
+class Sample:
+    ts: float
+    cpu_pct: float | None          # machine, depuis l'échantillon précédent
+    load: tuple[float, float, float] | None
+    mem_used: int | None
+    mem_total: int | None
+    mem_pct: float | None
+    disk_used: int | None
+    disk_total: int | None
+    disk_free: int | None
+    proc_rss: int | None           # process du bot
+    proc_cpu_pct: float | None
+    proc_threads: int | None
+    sys_procs: int | None
+    ws_ms: float | None
+    cost_ms: float                 # coût de cet échantillon (CPU du thread collecteur)
+
+
+RING: collections.deque[Sample] = collections.deque(maxlen=HISTORY)
+COST: dict[str, float] = {"samples": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+HOST: dict[str, str] = {"name": "n/a", "ip": "n/a"}   # résolu une fois au démarrage
+
+_proc = psutil.Process() if psutil else None
+_task: asyncio.Task | None = None
+
+
+def _resolve_host() -> None:
+    try:
+        HOST["name"] = socket.gethostname()
+        HOST["ip"] = socket.gethostbyname(HOST["name"])
+    except Exception:
+        pass
+
+def _sys_procs() -> int | None:
+    # 4e champ de /proc/loadavg: "actifs/total" → évite psutil.pids() (un stat par PID)
+    try:
+        with open("/proc/loadavg", "r") as f:
+            return int(f.read().split()[3].split("/")[1])
+    except Exception:
+        return len(psutil.pids()) if psutil else None
+
+def _collect(ws_ms: float | None) -> Sample:
+    """Tourne dans un thread: aucun appel ici ne bloque l'event loop."""
+    t0 = time.thread_time()
+    cpu = mem_used = mem_total = mem_pct = rss = pcpu = threads = None
+    load = disk = None
+    if psutil:
+        try:
+            cpu = psutil.cpu_percent(interval=None)   # non bloquant: delta depuis l'appel précédent
+            v = psutil.virtual_memory()
+            mem_used, mem_total, mem_pct = int(v.used), int(v.total), float(v.percent)
+            with _proc.oneshot():
+                rss = int(_proc.memory_info().rss)
+                pcpu = _proc.cpu_percent(interval=None)
+                threads = _proc.num_threads()
+        except Exception:
+            pass
+    try:
+        load = os.getloadavg()
+    except Exception:
+        pass
+    try:
+        disk = shutil.disk_usage("/")
+    except Exception:
+        pass
+    procs = _sys_procs()
+    return Sample(
+        ts=time.time(), cpu_pct=cpu, load=load,
+        mem_used=mem_used, mem_total=mem_total, mem_pct=mem_pct,
+        disk_used=int(disk.used) if disk else None,
+        disk_total=int(disk.total) if disk else None,
+        disk_free=int(disk.free) if disk else None,
+        proc_rss=rss, proc_cpu_pct=pcpu, proc_threads=threads, sys_procs=procs,
+        ws_ms=ws_ms, cost_ms=(time.thread_time() - t0) * 1000,
+    )
+
+async def _run(client) -> None:
+    await asyncio.to_thread(_resolve_host)
+    while True:
+        latency = float(getattr(client, "latency", float("nan")))
+        ws_ms = latency * 1000 if math.isfinite(latency) else None
+        try:
+            s = await asyncio.to_thread(_collect, ws_ms)
+        except Exception as e:
+            log.warning("Échantillon système échoué: %s", e)
+            await asyncio.sleep(INTERVAL_S)
+            continue
+        RING.append(s)
+        COST["samples"] += 1
+        COST["total_ms"] += s.cost_ms
+        COST["max_ms"] = max(COST["max_ms"], s.cost_ms)
+        # Coût borné: si un échantillon coûte cher, on espace le suivant (≤ MAX_DUTY)
+        await asyncio.sleep(max(INTERVAL_S, s.cost_ms / 1000 / MAX_DUTY))
+
+def start(client) -> None:
+    """À appeler depuis l'event loop (on_ready). Idempotent."""
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.create_task(_run(client))
+
+def latest() -> Sample | None:
+    return RING[-1] if RING else None
+
+def series(attr: str, n: int = 30) -> list[float]:
+    """Les n dernières valeurs non nulles d'un champ (plus ancienne d'abord)."""
+    vals = [getattr(s, attr) for s in list(RING)[-n:]]
+    return [v for v in vals if v is not None]
+
+def avg_cost_ms() -> float:
+    return COST["total_ms"] / COST["samples"] if COST["samples"] else 0.0
@@ -0,0 +1,89 @@
+# bot/core/traffic.py
+"""
+Enregistreur de trafic (TRAFFIC_RECORD=1): une ligne JSON compacte par commande / callback de View,
+avec juste les entrées (heure, interaction, joueur, commande, options). Journal append-only, un
+fichier par jour UTC dans DATA_DIR/traffic, rejouable hors-ligne contre un snapshot (bench.replay).
+
+    {"t":1760000000.123,"i":1290…,"u":4101…,"c":"hess mendier","o":{}}
+    {"t":…,"i":…,"u":…,"c":"view:TabacView.btn_gratter","o":{},"v":<interaction d'origine de la View>}
+"""
+from __future__ import annotations
+import contextvars, json, logging, os, time
+from typing import Any, TextIO
+
+from bot.domain import clock
+from .config import settings
+
+log = logging.getLogger("larue")
+
+ENABLED = settings.traffic_record
+TRAFFIC_DIR = os.path.join(os.path.abspath(settings.data_dir), "traffic")
+
+# Interaction en cours de traitement (les Views créées pendant la commande s'y rattachent)
+_current: contextvars.ContextVar[int | None] = contextvars.ContextVar("larue_traffic", default=None)
+
+_fh: TextIO | None = None
+_fh_day = ""
+_failed = False
+
+
+def current() -> int | None:
+    return _current.get()
+
+def _encode(v: Any) -> Any:
+    """Options → JSON: primitives telles quelles, Choice → {"choice"}, objets Discord → {"user"|type: id}."""
+    if v is None or isinstance(v, (bool, int, float, str)):
+        return v
+    if isinstance(v, (list, tuple)):
+        return [_encode(x) for x in v]
+    if type(v).__name__ == "Choice":
+        return {"choice": _encode(v.value), "name": v.name}
+    vid = getattr(v, "id", None)
+    if isinstance(vid, int):
+        return {"user" if hasattr(v, "display_name") else type(v).__name__.lower(): vid}
+    return str(v)
+
+def _file(ts: float) -> TextIO:
+    global _fh, _fh_day
+    day = time.strftime("%Y%m%d", time.gmtime(ts))
+    if _fh is None or day != _fh_day:
+        if _fh is not None:
+            _fh.close()
+        os.makedirs(TRAFFIC_DIR, exist_ok=True)
+        _fh = open(os.path.join(TRAFFIC_DIR, f"traffic-{day}.jsonl"), "a", encoding="utf-8", buffering=1)
+        _fh_day = day
+    return _fh
+
+def capture(name: str, args: tuple, kwargs: dict, *, origin: int | None = None,
+            values: list | None = None) -> contextvars.Token | None:
+    """Écrit l'évènement (jamais d'exception vers la commande) et marque l'interaction comme courante."""
+    global _failed
+    inter = next((a for a in reversed(args) if hasattr(a, "response") and hasattr(a, "user")), None)
+    if inter is None:
+        return None
+    ts = clock.current()   # heure figée de l'interaction (cf. clock.pin)
+    ev: dict[str, Any] = {"t": int(ts * 1000) / 1000, "i": inter.id, "u": inter.user.id, "c": name,
+                          "o": {k: _encode(v) for k, v in kwargs.items()}}
+    if getattr(inter, "guild_id", None):
+        ev["g"] = inter.guild_id
+    if origin is not None:
+        ev["v"] = origin
+    if values:
+        ev["s"] = _encode(list(values))
+    try:
+        _file(ts).write(json.dumps(ev, ensure_ascii=False, separators=(",", ":")) + "\n")
+    except Exception as e:
+        if not _failed:
+            _failed = True
+            log.warning("Enregistrement du trafic impossible: %s", e)
+    return _current.set(inter.id)
+
+def release(token: contextvars.Token | None) -> None:
+    if token is not None:
+        _current.reset(token)
+
+def close() -> None:
+    global _fh
+    if _fh is not None:
+        _fh.close()
+        _fh = None
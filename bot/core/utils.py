@@ -0,0 +1,39 @@
+# bot/core/utils.py
+from __future__ import annotations
+import time
+from typing import Any, Callable, Hashable
+
+class TTLCache:
+    """
+    Petit cache mémoire à expiration (TTL) et taille bornée.
+    Compte les hits/misses pour pouvoir exposer un taux de réussite.
+    """
+
+    def __init__(self, ttl_s: float, max_entries: int = 256):
+        self.ttl_s = float(ttl_s)
+        self.max_entries = int(max_entries)
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        hit = self._data.get(key)
+        if hit is not None and hit[0] > now:
+            self.hits += 1
+            return hit[1]
+        self.misses += 1
+        value = loader()
+        if len(self._data) >= self.max_entries:
+            # purge des entrées expirées, sinon de la plus ancienne
+            self._data = {k: v for k, v in self._data.items() if v[0] > now}
+            if len(self._data) >= self.max_entries:
+                self._data.pop(next(iter(self._data)))
+        self._data[key] = (now + self.ttl_s, value)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,90 @@
+# bot/core/watchdog.py
+"""
+Chien de garde de l'event loop.
+- une tâche asyncio bat toutes les PROBE_S et mesure le retard de réveil (lag);
+- un thread annexe surveille ce battement: s'il s'arrête plus de LOOP_LAG_WARN_MS,
+  il échantillonne la pile du thread de l'event loop (sys._current_frames) jusqu'au retour,
+  puis logge la pile la plus vue → l'appel bloquant à sortir de la boucle.
+"""
+from __future__ import annotations
+import asyncio, collections, logging, os, sys, threading, time, traceback
+
+from .config import settings
+
+log = logging.getLogger("larue")
+
+PROBE_S = 0.1
+SAMPLE_S = 0.02              # pas d'échantillonnage pendant un blocage
+WARN_S = max(0.05, settings.loop_lag_warn_ms / 1000)
+MAX_FRAMES = 12              # frames gardées par pile (côté appelant le plus profond)
+RECENT = 10                  # derniers blocages conservés pour /debug
+
+# Retard de réveil de la tâche de battement (dernière mesure / max depuis le boot)
+LAG: dict[str, float] = {"last_s": 0.0, "max_s": 0.0}
+STALLS: dict[str, float] = {"count": 0, "total_s": 0.0}
+RECENT_STALLS: collections.deque[dict] = collections.deque(maxlen=RECENT)
+
+_beat = time.monotonic()
+_loop_thread_id: int | None = None
+_task: asyncio.Task | None = None
+_thread: threading.Thread | None = None
+
+_PKG_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def _heartbeat() -> None:
+    global _beat
+    while True:
+        t0 = time.perf_counter()
+        _beat = time.monotonic()
+        await asyncio.sleep(PROBE_S)
+        lag = max(0.0, time.perf_counter() - t0 - PROBE_S)
+        LAG["last_s"] = lag
+        LAG["max_s"] = max(LAG["max_s"], lag)
+
+def _short(path: str) -> str:
+    return path[len(_PKG_ROOT) + 1:] if path.startswith(_PKG_ROOT) else path
+
+def _stack_of(thread_id: int) -> tuple[str, ...] | None:
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return None
+    summary = traceback.extract_stack(frame)[-MAX_FRAMES:]
+    return tuple(f"{_short(fs.filename)}:{fs.lineno} {fs.name}" for fs in summary)
+
+def _watch() -> None:
+    """Thread annexe: ne touche jamais à l'event loop, lit seulement _beat."""
+    while True:
+        time.sleep(PROBE_S)
+        if _loop_thread_id is None or time.monotonic() - _beat < PROBE_S + WARN_S:
+            continue
+        started = _beat
+        samples: collections.Counter[tuple[str, ...]] = collections.Counter()
+        while _beat == started:
+            stack = _stack_of(_loop_thread_id)
+            if stack:
+                samples[stack] += 1
+            time.sleep(SAMPLE_S)
+        _report(time.monotonic() - started - PROBE_S, samples)
+
+def _report(stall_s: float, samples: collections.Counter) -> None:
+    STALLS["count"] += 1
+    STALLS["total_s"] += stall_s
+    if not samples:
+        return
+    stack, hits = samples.most_common(1)[0]
+    total = sum(samples.values())
+    RECENT_STALLS.append({"at": time.time(), "ms": stall_s * 1000, "leaf": stack[-1],
+                          "share": hits / total})
+    log.warning("Event loop bloquée ~%.0f ms (%d/%d échantillons sur cette pile):\n  %s",
+                stall_s * 1000, hits, total, "\n  ".join(stack))
+
+def start() -> None:
+    """À appeler depuis l'event loop (on_ready). Idempotent."""
+    global _task, _thread, _loop_thread_id
+    if _task is None or _task.done():
+        _loop_thread_id = threading.get_ident()
+        _task = asyncio.create_task(_heartbeat())
+    if _thread is None:
+        _thread = threading.Thread(target=_watch, name="larue-watchdog", daemon=True)
+        _thread.start()
@@ -1,4 +1,6 @@
 from ..core.db.base import get_conn
+from . import leaderboards
+from ..persistence import stats as stats_repo
 
 def reset_players() -> None:
     con = get_conn()
@@ -13,5 +15,5 @@ def reset_inventory() -> None:
     con.execute("DELETE FROM inventory;")
 
 def reset_stats() -> None:
-    con = get_conn()
-    con.execute("DELETE FROM stats;")
+    stats_repo.clear()
+    leaderboards.invalidate()
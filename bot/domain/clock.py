@@ -1,9 +1,53 @@
+import contextvars, time
 from datetime import datetime, timedelta
+from typing import Callable
 from zoneinfo import ZoneInfo
 TZ = ZoneInfo("Europe/Paris")
 
+# Source de l'heure "jeu": time.time en prod, remplaçable par une horloge simulée (rejeu de trafic)
+_source: Callable[[], float] = time.time
+# Heure figée au début de l'interaction en cours: toute la commande (animations comprises) vit
+# à la même seconde → bet/win du tabac au même ts, et rejeu exact à partir de l'heure enregistrée
+_pinned: contextvars.ContextVar[float | None] = contextvars.ContextVar("larue_clock", default=None)
+
+def set_source(fn: Callable[[], float] | None) -> None:
+    global _source
+    _source = fn or time.time
+
+def pin() -> contextvars.Token:
+    return _pinned.set(_source())
+
+def unpin(token: contextvars.Token) -> None:
+    _pinned.reset(token)
+
+def current() -> float:
+    at = _pinned.get()
+    return _source() if at is None else at
+
+def now() -> int:
+    """Epoch courant (secondes): heure de l'interaction en cours, sinon celle de la source."""
+    return int(current())
+
+def now_local(tz: ZoneInfo = TZ) -> datetime:
+    return datetime.fromtimestamp(current(), tz)
+
 def today_key(reset_hour: int = 8) -> str:
-    now = datetime.now(TZ)
+    now = now_local()
     if now.hour < reset_hour:
         now = now - timedelta(days=1)
     return now.date().isoformat()  # "YYYY-MM-DD"
+
+def day_window(day: str, reset_hour: int = 8) -> tuple[int, int]:
+    """Bornes epoch [début, fin) du jour de jeu "YYYY-MM-DD"."""
+    start = datetime.fromisoformat(day).replace(hour=reset_hour, tzinfo=TZ)
+    return int(start.timestamp()), int((start + timedelta(days=1)).timestamp())
+
+def day_of(ts: int, reset_hour: int = 8) -> str:
+    """Jour de jeu contenant l'epoch `ts`."""
+    at = datetime.fromtimestamp(int(ts), TZ)
+    if at.hour < reset_hour:
+        at = at - timedelta(days=1)
+    return at.date().isoformat()
+
+def shift_day(day: str, days: int) -> str:
+    return (datetime.fromisoformat(day) + timedelta(days=int(days))).date().isoformat()
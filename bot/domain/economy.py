@@ -2,19 +2,20 @@
 from __future__ import annotations
 
 from ..persistence import ledger as Ledger
+from .clock import now as clock_now
 
 # Toutes les valeurs d'argent sont en centimes (int).
 
 def balance(user_id: int) -> int:
     """Solde courant (source de vérité = ledger)."""
-    return int(Ledger.sum_balance(str(user_id)))
+    return int(Ledger.sum_balance(int(user_id)))
 
 def credit_once(user_id: int, amount: int, *, reason: str, idem_key: str) -> int:
     """
     Crédit idempotent: applique +amount une seule fois pour un idem_key donné.
     Renvoie le solde après application.
     """
-    Ledger.add_once(str(user_id), idem_key, int(amount), reason or "credit")
+    Ledger.add_once(int(user_id), idem_key, int(amount), reason or "credit", ts=clock_now())
     return balance(user_id)
 
 def debit_once(user_id: int, amount: int, *, reason: str, idem_key: str) -> int:
@@ -24,9 +25,14 @@ def debit_once(user_id: int, amount: int, *, reason: str, idem_key: str) -> int:
     """
     if amount <= 0:
         raise ValueError("amount must be > 0")
-    Ledger.add_once(str(user_id), idem_key, -int(amount), reason or "debit")
+    Ledger.add_once(int(user_id), idem_key, -int(amount), reason or "debit", ts=clock_now())
     return balance(user_id)
 
-def top_richest(limit: int = 10) -> list[tuple[str, int]]:
+def history_page(user_id: int, before: tuple[int, bytes] | None = None, limit: int = 10) -> tuple[list[dict], bool]:
+    """Page de l'historique (plus récent d'abord) + has_next. `before` = curseur (ts, key) exclusif."""
+    rows = Ledger.history_page(int(user_id), before, int(limit) + 1)
+    return rows[:limit], len(rows) > limit
+
+def top_richest(limit: int = 10, offset: int = 0) -> list[tuple[str, int]]:
     """Classement par solde (ledger)."""
-    return [(uid, int(bal)) for uid, bal in Ledger.top_richest(int(limit))]
+    return [(uid, int(bal)) for uid, bal in Ledger.top_richest(int(limit), int(offset))]
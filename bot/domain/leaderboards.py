@@ -0,0 +1,56 @@
+# bot/domain/leaderboards.py
+from __future__ import annotations
+import threading
+
+from ..core import metrics
+from ..core.utils import TTLCache
+from . import economy as d_economy
+from . import stats as d_stats
+
+PAGE_SIZE = 10
+MAX_PAGES = 10          # top 100 max, au-delà ça n'intéresse personne
+CACHE_TTL_S = 30
+
+# board -> (titre, clé de stat | None pour l'argent)
+BOARDS: dict[str, tuple[str, str | None]] = {
+    "argent":   ("Les plus chargés",          None),
+    "mendier":  ("Les pros de la manche",     "mendier_count"),
+    "fouiller": ("Les rois de la poubelle",   "fouiller_count"),
+    "tabac":    ("Les accros du grattage",    "tabac_count"),
+    "streak":   ("Meilleures séries recyclerie", "recycler_best_streak"),
+}
+
+_cache = TTLCache(CACHE_TTL_S, max_entries=len(BOARDS) * MAX_PAGES)
+metrics.register_cache("leaderboards", _cache)
+# pages chargées hors event loop (to_thread): un seul calcul par page expirée, pas un par thread,
+# sans bloquer les autres pages derrière l'agrégat du ledger (un verrou par (board, page), ≤ 50)
+_locks: dict[tuple[str, int], threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+def _lock_for(key: tuple[str, int]) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+def _load(board: str, page: int) -> list[tuple[str, int]]:
+    _, stat_key = BOARDS[board]
+    # +1 ligne pour savoir s'il existe une page suivante
+    offset, limit = page * PAGE_SIZE, PAGE_SIZE + 1
+    if stat_key is None:
+        return d_economy.top_richest(limit, offset)
+    return d_stats.top_by_key(stat_key, limit, offset)
+
+def page(board: str, page: int = 0) -> tuple[list[tuple[str, int]], bool]:
+    """
+    Renvoie (lignes, has_next) pour la page demandée (0-indexée).
+    Mêmes pagination et cache (TTL court) pour tous les classements.
+    """
+    if board not in BOARDS:
+        raise ValueError(f"unknown board: {board}")
+    page = max(0, min(int(page), MAX_PAGES - 1))
+    with _lock_for((board, page)):
+        rows = _cache.get_or_set((board, page), lambda: _load(board, page))
+    has_next = len(rows) > PAGE_SIZE and page + 1 < MAX_PAGES
+    return rows[:PAGE_SIZE], has_next
+
+def invalidate() -> None:
+    _cache.clear()
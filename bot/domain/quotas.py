@@ -1,10 +1,9 @@
-import time
-from .clock import today_key
+from .clock import now as clock_now, today_key
 from ..persistence import actions as actions_repo  # ← snake_case
 
 def check_and_touch(user_id: int, action: str, cooldown_s: int, daily_cap: int):
-    uid = str(user_id)
-    now = int(time.time())
+    uid = int(user_id)
+    now = clock_now()
     today = today_key()
 
     st = actions_repo.get_state(uid, action)  # ← maj ici
@@ -0,0 +1,30 @@
+# bot/domain/retention.py
+from __future__ import annotations
+import logging
+
+from ..persistence import retention as repo
+from .clock import today_key, shift_day
+
+log = logging.getLogger("larue")
+
+def run_daily() -> dict[str, int]:
+    """
+    Purge les journaux au-delà de leur durée de rétention puis rend les pages libérées au fichier.
+    Renvoie {table: lignes supprimées, "pages": pages rendues}.
+    """
+    today = today_key()
+    cutoffs = {table: shift_day(today, -days) for table, (days, _) in repo.POLICIES.items() if days > 0}
+    done = repo.prune(cutoffs)
+    freed, free_left = repo.reclaim()
+
+    report = {table: int(r["rows"]) for table, r in done.items()}
+    report["pages"] = freed
+    removed = sum(int(r["rows"]) for r in done.values())
+    if removed or freed:
+        log.info("Rétention: %d lignes (%s), %d pages rendues, lot max %.0f ms", removed,
+                 ", ".join(f"{t} {n}" for t, n in report.items() if t != "pages"), freed,
+                 max((r["max_batch_s"] for r in done.values()), default=0.0) * 1000)
+    if free_left:
+        log.info("Rétention: %d pages libres non rendues (base sans auto_vacuum incrémental: VACUUM pour l'activer)",
+                 free_left)
+    return report
@@ -0,0 +1,35 @@
+# bot/domain/rollups.py
+from __future__ import annotations
+from ..persistence import rollups as repo
+from .clock import now as clock_now
+
+def dashboard(hours: int = 24) -> dict:
+    """
+    Vue économie lue uniquement sur les rollups (coût indépendant de la taille du ledger).
+    Fenêtres <= 48h: table horaire; au-delà: table journalière.
+    """
+    now = clock_now()
+    since = now - int(hours) * 3600
+    width = repo.HOUR if hours <= 48 else repo.DAY
+
+    sources = repo.by_source(since, width)
+    inflow = sum(i for _, i, _, _ in sources)
+    outflow = sum(o for _, _, o, _ in sources)
+    flows = {src: (i, o, n) for src, i, o, n in sources}
+
+    # Avantage maison du tabac: part des mises non redistribuée
+    bets = flows.get("tabac.bet", (0, 0, 0))[1]
+    wins = flows.get("tabac.win", (0, 0, 0))[0]
+    house_edge = (bets - wins) / bets if bets else None
+
+    return {
+        "supply": repo.money_supply(),
+        "inflow": inflow,
+        "outflow": outflow,
+        "sources": sources,
+        "tabac_bets": bets,
+        "tabac_wins": wins,
+        "house_edge": house_edge,
+        "series": repo.net_series(since, width),
+        "width": width,
+    }
@@ -0,0 +1,67 @@
+# bot/domain/snapshots.py
+from __future__ import annotations
+import logging
+
+from ..persistence import snapshots as repo
+from ..persistence import meta
+from . import economy
+from .clock import today_key, day_window, day_of, shift_day
+
+log = logging.getLogger("larue")
+
+MAX_CATCHUP_DAYS = 400
+
+def run_daily() -> int:
+    """
+    Snapshote chaque jour de jeu terminé pas encore traité (rattrapage inclus).
+    Renvoie le nombre de lignes écrites.
+    """
+    last_done = meta.get(repo.LAST_DAY_KEY, "")
+    if last_done:
+        day = shift_day(last_done, 1)
+    else:
+        first_ts = repo.first_posting_ts()
+        if first_ts is None:
+            return 0
+        day = day_of(first_ts)
+
+    yesterday = shift_day(today_key(), -1)
+    oldest = shift_day(yesterday, -MAX_CATCHUP_DAYS)
+    written = 0
+    if day < oldest:
+        # rattrapage tronqué: les jours sautés ne sont jamais snapshotés, on part du solde complet
+        # de la veille de `oldest` (sinon 1er jour = 0 + postings du jour, erreur reportée ensuite)
+        seed = shift_day(oldest, -1)
+        written += repo.seed_day(seed, day_window(seed)[1])
+        day = oldest
+
+    while day <= yesterday:
+        start, end = day_window(day)
+        written += repo.snapshot_day(day, start, end)
+        day = shift_day(day, 1)
+    if written:
+        log.info("Snapshots de solde: %d lignes (jusqu'au %s)", written, yesterday)
+    return written
+
+def trend(user_id: int, days: int = 30) -> list[tuple[str, int]]:
+    """
+    Solde de fin de journée sur `days` jours (jours sans activité = solde reporté),
+    plus le solde courant pour aujourd'hui.
+    """
+    today = today_key()
+    since = shift_day(today, -int(days) + 1)
+    rows = repo.history(int(user_id), since)
+    # 1re ligne antérieure à la fenêtre = solde reporté jusqu'au premier snapshot de la fenêtre
+    last = rows[0][1] if rows and rows[0][0] < since else None
+    points = dict(rows)
+
+    out: list[tuple[str, int]] = []
+    day = since
+    while day < today:
+        if day in points:
+            last = points[day]
+        if last is not None:
+            out.append((day, last))
+        day = shift_day(day, 1)
+    out.append((today, economy.balance(user_id)))
+    return out
@@ -1,10 +1,23 @@
 from ..persistence import stats as repo
 
+def bump(user_id: int, key: str, delta: int = 1) -> None:
+    """Incrément write-behind (flush périodique); à préférer quand la valeur retournée est inutile."""
+    repo.bump(int(user_id), key, int(delta))
+
 def incr(user_id: int, key: str, delta: int = 1) -> int:
-    return repo.incr(str(user_id), key, int(delta))
+    return repo.incr(int(user_id), key, int(delta))
+
+def flush() -> int:
+    return repo.flush()
+
+def set_max(user_id: int, key: str, value: int) -> int:
+    return repo.set_max(int(user_id), key, int(value))
 
 def get(user_id: int, key: str, default: int = 0) -> int:
-    return repo.get(str(user_id), key, int(default))
+    return repo.get(int(user_id), key, int(default))
 
 def all_for(user_id: int) -> dict[str, int]:
-    return repo.all_for(str(user_id))
+    return repo.all_for(int(user_id))
+
+def top_by_key(key: str, limit: int = 10, offset: int = 0) -> list[tuple[str, int]]:
+    return repo.top_by_key(key, int(limit), int(offset))
@@ -1,14 +1,27 @@
 from __future__ import annotations
+import asyncio, os, time
 import discord
 from discord import app_commands, Interaction
 
+from bot.core import memdiag, profiler
+from bot.core.db import backup
 from bot.domain import admin as d_admin
+from bot.domain import rollups as d_rollups
+from bot.modules.common.money import fmt_eur, fmt_source
+from bot.modules.common.ui import sparkline
 
 # Remplace par TON ID Discord
 ADMIN_ID = 298893605613862912
 
 admin = app_commands.Group(name="admin", description="Outils d'administration")
 
+async def _deny(inter: Interaction) -> bool:
+    """True (et réponse envoyée) si l'appelant n'est pas l'admin."""
+    if inter.user.id != ADMIN_ID:
+        await inter.response.send_message("❌ Accès refusé.", ephemeral=True)
+        return True
+    return False
+
 # /admin reset scope:<players|cooldowns|inventory|all>
 @admin.command(name="reset", description="Réinitialise des tables (joueurs, cooldowns, inventaire ou tout).")
 @app_commands.choices(scope=[
@@ -18,8 +31,7 @@ admin = app_commands.Group(name="admin", description="Outils d'administration")
     app_commands.Choice(name="all",       value="all"),
 ])
 async def admin_reset(inter: Interaction, scope: app_commands.Choice[str]):
-    if inter.user.id != ADMIN_ID:
-        await inter.response.send_message("❌ Accès refusé.", ephemeral=True)
+    if await _deny(inter):
         return
 
     choice = scope.value
@@ -45,6 +57,183 @@ async def admin_reset(inter: Interaction, scope: app_commands.Choice[str]):
         await inter.response.send_message(f"⚠️ Erreur: {e}", ephemeral=True)
 
 
+# /admin economie periode:<24h|7j|30j> — lu sur les rollups, jamais sur le ledger brut
+@admin.command(name="economie", description="Tableau de bord de l'économie (masse monétaire, flux, avantage maison).")
+@app_commands.choices(periode=[
+    app_commands.Choice(name="24h", value=24),
+    app_commands.Choice(name="7 jours", value=24 * 7),
+    app_commands.Choice(name="30 jours", value=24 * 30),
+])
+async def admin_economie(inter: Interaction, periode: app_commands.Choice[int] | None = None):
+    if await _deny(inter):
+        return
+
+    hours = periode.value if periode else 24
+    t0 = time.perf_counter()
+    dash = d_rollups.dashboard(hours)
+    took_ms = (time.perf_counter() - t0) * 1000
+
+    e = discord.Embed(title=f"📊 Économie — {periode.name if periode else '24h'}", color=discord.Color.dark_gold())
+    e.add_field(name="🏦 Masse monétaire", value=f"**{fmt_eur(dash['supply'])}**", inline=True)
+    e.add_field(name="📥 Entrées", value=fmt_eur(dash["inflow"]), inline=True)
+    e.add_field(name="📤 Sorties", value=fmt_eur(dash["outflow"]), inline=True)
+
+    lines = [
+        f"{fmt_source(src)} — +{fmt_eur(i)} / -{fmt_eur(o)} ({n})"
+        for src, i, o, n in dash["sources"][:12]
+    ]
+    e.add_field(name="🔀 Flux par source", value="\n".join(lines) or "Aucun mouvement.", inline=False)
+
+    edge = dash["house_edge"]
+    edge_txt = f"**{edge * 100:.1f}%**" if edge is not None else "n/a"
+    e.add_field(
+        name="🎰 Avantage maison (tabac)",
+        value=f"{edge_txt} • mises {fmt_eur(dash['tabac_bets'])} • gains {fmt_eur(dash['tabac_wins'])}",
+        inline=False
+    )
+
+    series = [net for _, net in dash["series"]]
+    if series:
+        unit = "h" if dash["width"] == 3600 else "j"
+        e.add_field(name=f"📈 Solde net par {unit}", value=f"`{sparkline(series)}`", inline=False)
+
+    e.set_footer(text=f"Rollups incrémentaux • {took_ms:.1f} ms")
+    await inter.response.send_message(embed=e, ephemeral=True)
+
+
+# /admin profil duree:<s> — profil par échantillonnage du bot en marche (collapsed stacks dans DATA_DIR)
+@admin.command(name="profil", description="Profile le bot en marche pendant quelques secondes (flamegraph).")
+@app_commands.describe(duree="Durée en secondes (1–120)", intervalle_ms="Pas d'échantillonnage (ms)")
+async def admin_profil(
+    inter: Interaction,
+    duree: app_commands.Range[int, 1, profiler.MAX_SECONDS] = 15,
+    intervalle_ms: app_commands.Range[int, 1, 100] = 5,
+):
+    if await _deny(inter):
+        return
+    if profiler.is_running():
+        await inter.response.send_message("⏳ Un profil est déjà en cours.", ephemeral=True)
+        return
+
+    await inter.response.defer(ephemeral=True, thinking=True)
+    try:
+        prof = await asyncio.to_thread(profiler.run, duree, intervalle_ms / 1000)
+    except Exception as e:
+        await inter.followup.send(f"⚠️ Profil échoué: {e}", ephemeral=True)
+        return
+
+    busy = sum(prof.self_counts.values())
+    def _fmt(rows: list[tuple[str, int]]) -> str:
+        return "\n".join(f"{n * 100 / max(1, busy):5.1f}% {label[:80]}" for label, n in rows) or "rien (bot au repos)"
+
+    e = discord.Embed(title=f"🔥 Profil — {prof.seconds:.0f}s", color=discord.Color.orange())
+    e.add_field(name="Self (feuilles)", value=f"```\n{_fmt(prof.top(10))[:1000]}\n```", inline=False)
+    e.add_field(name="Cumulé (code du bot)", value=f"```\n{_fmt(prof.top(8, cumulative=True))[:1000]}\n```", inline=False)
+    threads = sorted(prof.threads.items(), key=lambda kv: -kv[1][0])[:8]
+    e.add_field(name="Threads (piles actives / en attente)",
+                value="```\n" + "\n".join(f"{a:>6} / {w:<6} {name[:40]}" for name, (a, w) in threads)[:1000] + "\n```",
+                inline=False)
+    e.set_footer(text=(
+        f"{prof.samples} passes • {busy} piles actives / {prof.idle} en attente • "
+        f"surcoût {prof.overhead_pct:.1f}% • {os.path.basename(prof.path)}"
+    ))
+    # fichier joint si raisonnable, sinon il reste dans DATA_DIR/profiles
+    if os.path.getsize(prof.path) < 8 * 1024**2:
+        await inter.followup.send(embed=e, file=discord.File(prof.path), ephemeral=True)
+    else:
+        await inter.followup.send(embed=e, ephemeral=True)
+
+
+def _fmt_bytes(n: int) -> str:
+    sign = "-" if n < 0 else "+"
+    n = abs(n)
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{sign}{n:.0f} {unit}" if unit == "B" else f"{sign}{n:.1f} {unit}"
+        n /= 1024
+    return f"{sign}{n:.1f} GB"
+
+# /admin memoire action:<etat|demarrer|diff|arreter> — tracemalloc + Views vivantes + tailles de caches
+@admin.command(name="memoire", description="Diagnostic mémoire (tracemalloc, Views vivantes, caches).")
+@app_commands.choices(action=[
+    app_commands.Choice(name="état",               value="etat"),
+    app_commands.Choice(name="démarrer tracemalloc", value="demarrer"),
+    app_commands.Choice(name="diff vs référence",  value="diff"),
+    app_commands.Choice(name="arrêter tracemalloc", value="arreter"),
+])
+async def admin_memoire(inter: Interaction, action: app_commands.Choice[str] | None = None):
+    if await _deny(inter):
+        return
+
+    act = action.value if action else "etat"
+    await inter.response.defer(ephemeral=True, thinking=True)
+    e = discord.Embed(title="🧠 Mémoire", color=discord.Color.dark_purple())
+
+    try:
+        # instantanés lourds (parcours de toutes les allocations) → hors event loop
+        if act == "demarrer":
+            await asyncio.to_thread(memdiag.start)
+            e.description = f"tracemalloc actif ({memdiag.FRAMES} frames), référence prise."
+        elif act == "arreter":
+            memdiag.stop()
+            e.description = "tracemalloc arrêté."
+        elif act == "diff":
+            current, peak, rows = await asyncio.to_thread(memdiag.diff, 10)
+            lines = [f"{_fmt_bytes(size):>10} {count:+7d} {site[:70]}" for site, size, count in rows]
+            e.description = f"Tracé: {_fmt_bytes(current)[1:]} • pic {_fmt_bytes(peak)[1:]}"
+            e.add_field(name="Δ depuis la référence (site, octets, blocs)",
+                        value="```\n" + ("\n".join(lines) or "aucune différence")[:1000] + "\n```", inline=False)
+        else:
+            e.description = "tracemalloc " + ("actif" if memdiag.is_tracing() else "inactif")
+    except Exception as ex:
+        await inter.followup.send(f"⚠️ {ex}", ephemeral=True)
+        return
+
+    views = memdiag.view_counts()
+    e.add_field(name="🪟 Views vivantes (dont terminées)",
+                value="\n".join(f"{k}: {n} ({done})" for k, (n, done) in views.items()) or "aucune", inline=True)
+    caches = memdiag.discord_caches(inter.client)
+    e.add_field(name="📦 Caches discord.py", value="\n".join(f"{k}: {v}" for k, v in caches.items()), inline=True)
+    e.add_field(name="🗃️ Caches internes",
+                value="\n".join(f"{k}: {v}" for k, v in memdiag.app_caches().items()) or "aucun", inline=True)
+    await inter.followup.send(embed=e, ephemeral=True)
+
+
+def _snapshot_counts() -> dict[str, int]:
+    """Contrôle de l'instantané, lu dessus (jamais sur la base vivante)."""
+    con = backup.open_snapshot()
+    try:
+        return {t: int(con.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]) for t in ("players", "ledger")}
+    finally:
+        con.close()
+
+# /admin sauvegarde — sauvegarde à chaud immédiate (instantané + archive gzip + rotation)
+@admin.command(name="sauvegarde", description="Sauvegarde à chaud de la base (sans bloquer les écritures).")
+async def admin_sauvegarde(inter: Interaction):
+    if await _deny(inter):
+        return
+
+    await inter.response.defer(ephemeral=True, thinking=True)
+    try:
+        out = await asyncio.to_thread(backup.run)
+        counts = await asyncio.to_thread(_snapshot_counts)
+    except Exception as ex:
+        await inter.followup.send(f"⚠️ Sauvegarde échouée: {ex}", ephemeral=True)
+        return
+
+    mib = 1024 ** 2
+    e = discord.Embed(title="💾 Sauvegarde", color=discord.Color.dark_green(),
+                      description=f"`{os.path.basename(out['path'])}` en **{out['seconds']:.1f}s**")
+    e.add_field(name="⏱️ Durées", value=f"copie {out['copy_s']:.1f}s ({out['steps']} pas)\ngzip {out['gzip_s']:.1f}s",
+                inline=True)
+    e.add_field(name="📦 Taille", value=f"{out['bytes'] / mib:.1f} MB → {out['gz_bytes'] / mib:.1f} MB", inline=True)
+    e.add_field(name="🗂️ Archives", value=f"{len(backup.archives())} gardées • {out['removed']} supprimée(s)",
+                inline=True)
+    e.add_field(name="🔎 Instantané (lecture seule)",
+                value=f"{counts['players']:,} joueurs • {counts['ledger']:,} écritures".replace(",", " "), inline=False)
+    await inter.followup.send(embed=e, ephemeral=True)
+
+
 def register(tree: app_commands.CommandTree, guild_obj: discord.Object | None, client: discord.Client | None = None):
     # le client ne sert pas ici; module inscrit en test-only via client.py
     if guild_obj:
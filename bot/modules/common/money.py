@@ -15,4 +15,25 @@ def fmt_eur(cents: int) -> str:
     euros = s // 100
     cents_part = abs(s) % 100
     sign = "-" if s < 0 else ""
-    return f"{sign}{euros},{cents_part:02d} {MONEY_EMOJI}"
\ No newline at end of file
+    return f"{sign}{euros},{cents_part:02d} {MONEY_EMOJI}"
+
+# Libellés lisibles des sources du ledger (reason sans suffixe)
+SOURCE_LABELS = {
+    "start.gift":       "🎁 Cadeau de départ",
+    "mendier":          "🥖 Mendier",
+    "fouiller":         "🗑️ Fouille",
+    "fouiller.loss":    "🙄 Fouille ratée",
+    "recycler.collect": "♻️ Recyclerie",
+    "tabac.bet":        "🎫 Ticket acheté",
+    "tabac.win":        "✨ Ticket gagnant",
+    "shop":             "🛒 Shop",
+}
+
+def fmt_source(source: str) -> str:
+    return SOURCE_LABELS.get(source, source or "—")
+
+def fmt_reason(reason: str) -> str:
+    """'tabac.bet:banco' -> '🎫 Ticket acheté · BANCO'."""
+    source, _, detail = (reason or "").partition(":")
+    label = fmt_source(source)
+    return f"{label} · {detail.upper()}" if detail else label
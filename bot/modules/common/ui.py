@@ -0,0 +1,27 @@
+# bot/modules/common/ui.py
+from __future__ import annotations
+import discord
+
+from bot.core import memdiag, metrics, traffic
+
+_SPARKS = "▁▂▃▄▅▆▇█"
+
+def sparkline(values: list[float] | list[int]) -> str:
+    """Mini-graphe texte: [1, 5, 3] -> '▁█▄'."""
+    if not values:
+        return ""
+    lo, hi = min(values), max(values)
+    if hi == lo:
+        return _SPARKS[len(_SPARKS) // 2] * len(values)
+    span = hi - lo
+    return "".join(_SPARKS[int((v - lo) / span * (len(_SPARKS) - 1))] for v in values)
+
+
+class InstrumentedView(discord.ui.View):
+    """View dont chaque callback (bouton/select) est chronométré comme une commande, et comptée tant qu'elle vit."""
+
+    def __init__(self, *, timeout: float | None = 180):
+        super().__init__(timeout=timeout)
+        self.origin_id = traffic.current()   # interaction qui a créé la View (rejeu de trafic)
+        metrics.instrument_view(self)
+        memdiag.track_view(self)
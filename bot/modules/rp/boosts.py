@@ -11,8 +11,10 @@ def compute_power(user_id: int) -> dict:
       - *_mult   : produit
     Retourne un dict avec des valeurs par défaut sûres.
     """
-    inv = d_inventory.get(user_id) or {}
+    return power_from_inventory(d_inventory.get(user_id) or {})
 
+def power_from_inventory(inv: dict[str, int]) -> dict:
+    """Même agrégation que compute_power, sans DB (réutilisé par le simulateur bench.simulate)."""
     total = {
         "mendier_flat_min": 0,
         "mendier_flat_max": 0,
@@ -20,6 +22,8 @@ def compute_power(user_id: int) -> dict:
         "fouiller_flat_max": 0,
         "mendier_mult": 1.0,
         "fouiller_mult": 1.0,
+        "recy_canette_prob_mult": 1.0,
+        "recy_canette_roll_bonus": 0,
     }
 
     for iid, qty in inv.items():
@@ -39,8 +43,8 @@ def compute_power(user_id: int) -> dict:
 
         for k, v in bonus.items():
             if k.endswith("_mult"):
-                total[k] *= float(v) ** q
-            elif k.endswith("_flat_min") or k.endswith("_flat_max"):
-                total[k] += int(v) * q
+                total[k] = total.get(k, 1.0) * float(v) ** q
+            else:  # *_flat_*, *_bonus: somme
+                total[k] = total.get(k, 0) + int(v) * q
 
     return total
@@ -1,5 +1,5 @@
 from __future__ import annotations
-import asyncio, random, time
+import asyncio, random
 from datetime import datetime, UTC, timedelta
 from typing import Optional
 
@@ -7,12 +7,16 @@ import discord
 from discord import app_commands, Interaction
 from zoneinfo import ZoneInfo
 
-from bot.modules.common.money import fmt_eur
+from bot.core import metrics
+from bot.modules.common.money import fmt_eur, fmt_reason
+from bot.modules.common.ui import InstrumentedView
 from bot.domain import economy as d_economy
 from bot.domain import players as d_players
 from bot.domain import stats as d_stats
 from bot.domain import quotas as d_quotas
 from bot.domain import actions as d_actions
+from bot.domain import leaderboards as d_leaderboards
+from bot.domain import clock
 
 from bot.modules.rp.boosts import compute_power
 from bot.modules.rp.recycler import maybe_grant_canettes_after_fouiller
@@ -29,6 +33,8 @@ MENDIER_MAX_CENTS = 100    # 1,00 €
 FOUILLER_GOOD_MIN = 50     # 0,50 €
 FOUILLER_GOOD_MAX = 300    # 3,00 €
 FOUILLER_BAD_LOSS = 100    # perte max 1,00 €
+FOUILLER_GOOD_P   = 0.6    # proba de trouvaille
+FOUILLER_BAD_P    = 0.1    # proba de perte (le reste: rien)
 
 DAILY_LIMIT_MSGS = {
     "mendier":  "⛔ Plus une pièce à gratter aujourd’hui. Reset {reset_rel} • {reset_time}",
@@ -47,10 +53,11 @@ def _fmt_delta(delta_cents: int) -> str:
 def _medal(i: int) -> str:
     return "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else "🏅"
 
-def _format_leaderboard(rows: list[tuple[str | int, int]]) -> str:
+def _format_leaderboard(rows: list[tuple[str | int, int]], *, start: int = 1, money: bool = True) -> str:
     lines: list[str] = []
-    for i, (uid, cents) in enumerate(rows, start=1):
-        lines.append(f"**{i:>2}.** <@{int(uid)}> — **{fmt_eur(cents)}** {_medal(i)}")
+    for i, (uid, value) in enumerate(rows, start=start):
+        shown = fmt_eur(value) if money else str(int(value))
+        lines.append(f"**{i:>2}.** <@{int(uid)}> — **{shown}** {_medal(i)}")
     return "\n".join(lines)
 
 def _progress_bar(elapsed: int, total: int, width: int = 10) -> tuple[str, int]:
@@ -61,14 +68,14 @@ def _progress_bar(elapsed: int, total: int, width: int = 10) -> tuple[str, int]:
     return "█" * filled + "─" * (width - filled), int(pct * 100)
 
 def _next_reset_epoch(tz_name: str = "Europe/Paris", hour: int = 8) -> int:
-    now_local = datetime.now(ZoneInfo(tz_name))
+    now_local = clock.now_local(ZoneInfo(tz_name))
     target = now_local.replace(hour=hour, minute=0, second=0, microsecond=0)
     if now_local >= target:
         target += timedelta(days=1)
     return int(target.astimezone(UTC).timestamp())
 
 def _cooldown_message(user_id: int, action: str, wait: int, remaining: int, total_cd: int) -> str:
-    now = int(time.time())
+    now = clock.now()
     available_at = now + int(wait)
     st = d_actions.get_state(user_id, action)
     last_ts = int(st.get("last_ts", 0) or 0)
@@ -103,7 +110,7 @@ def _cooldown_field(user_id: int, action: str, cd: int, cap: int) -> tuple[str,
     last_ts = int(st.get("last_ts", 0) or 0)
     remaining = st.get("remaining", None)
 
-    now = int(time.time())
+    now = clock.now()
     elapsed = max(0, now - last_ts)
     bar, pct = _progress_bar(elapsed, max(cd, 1))
 
@@ -154,31 +161,38 @@ async def _play_anim_then_finalize(
     await inter.response.send_message(embed=anim)
     msg = await inter.original_response()
     for line in pre_lines[1:]:
-        await asyncio.sleep(delay)
+        await metrics.sleep(delay)
         anim.description = line
         await msg.edit(embed=anim)
-    await asyncio.sleep(delay)
+    await metrics.sleep(delay)
     await msg.edit(embed=final_embed)
 
 # ───────── “Moteur” (calcul des deltas en centimes) ─────────
-def mendier_action(user_id: int) -> dict:
-    base = random.randint(MENDIER_MIN_CENTS, MENDIER_MAX_CENTS)
+# Formules pures, tabulées par bench.simulate: toute modif ici se retrouve dans la simulation
+def mendier_amount(base: int, flat: int, mult: float) -> int:
+    return max(1, int(round((base + flat) * mult)))
+
+def fouiller_gain(roll: int, mult: float) -> int:
+    return int(round(roll * mult))
+
+def mendier_action(user_id: int, rng: random.Random | None = None) -> dict:
+    rng = rng or random.Random()
+    base = rng.randint(MENDIER_MIN_CENTS, MENDIER_MAX_CENTS)
     power = compute_power(user_id)  # <- plus de storage
     flat_min = int(power.get("mendier_flat_min", 0))
     flat_max = int(power.get("mendier_flat_max", 0))
-    flat = random.randint(flat_min, max(flat_min, flat_max)) if flat_max > 0 else 0
+    flat = rng.randint(flat_min, max(flat_min, flat_max)) if flat_max > 0 else 0
     mult = float(power.get("mendier_mult", 1.0))
-    amount = max(1, int(round((base + flat) * mult)))
-    return {"delta": amount}
+    return {"delta": mendier_amount(base, flat, mult)}
 
-def fouiller_action(user_id: int) -> dict:
+def fouiller_action(user_id: int, rng: random.Random | None = None) -> dict:
+    rng = rng or random.Random()
     power = compute_power(user_id)
     mult = float(power.get("fouiller_mult", 1.0))
-    r = random.random()
-    if r < 0.6:
-        gain = int(round(random.randint(FOUILLER_GOOD_MIN, FOUILLER_GOOD_MAX) * mult))
-        delta = gain
-    elif r < 0.9:
+    r = rng.random()
+    if r < FOUILLER_GOOD_P:
+        delta = fouiller_gain(rng.randint(FOUILLER_GOOD_MIN, FOUILLER_GOOD_MAX), mult)
+    elif r < 1.0 - FOUILLER_BAD_P:
         delta = 0
     else:
         have = int(d_economy.balance(user_id))  # source de vérité ledger
@@ -197,14 +211,15 @@ async def play_mendier(inter: Interaction) -> bool:
         await inter.response.send_message(msg, ephemeral=True)
         return False
 
-    res = mendier_action(inter.user.id)
+    # RNG dérivé de l'interaction: même tirage si Discord la rejoue (et au rejeu de trafic)
+    res = mendier_action(inter.user.id, random.Random(f"{inter.id}:mendier"))
     amount = int(res["delta"])
 
     # idempotent: une seule application par interaction
     new_money = d_economy.credit_once(inter.user.id, amount, reason="mendier", idem_key=f"mendier:{inter.id}")
 
     # stat
-    d_stats.incr(inter.user.id, "mendier_count", 1)
+    d_stats.bump(inter.user.id, "mendier_count", 1)
 
     final_embed = _result_embed(
         title="Mendier",
@@ -240,11 +255,12 @@ async def play_fouiller(inter: Interaction) -> bool:
         await inter.response.send_message(msg, ephemeral=True)
         return False
 
-    res = fouiller_action(inter.user.id)
+    rng = random.Random(f"{inter.id}:fouiller")
+    res = fouiller_action(inter.user.id, rng)
     delta = int(res["delta"])
 
     # loot canettes (facultatif)
-    drop = maybe_grant_canettes_after_fouiller(inter.user.id)
+    drop = maybe_grant_canettes_after_fouiller(inter.user.id, rng=rng)
 
     if delta > 0:
         new_money = d_economy.credit_once(inter.user.id, delta, reason="fouiller", idem_key=f"fouiller:{inter.id}:gain")
@@ -259,7 +275,7 @@ async def play_fouiller(inter: Interaction) -> bool:
         flavor = "🙄 Mauvaise rencontre. Le trottoir t’a coûté des sous."
         result_color = discord.Color.red()
 
-    d_stats.incr(inter.user.id, "fouiller_count", 1)
+    d_stats.bump(inter.user.id, "fouiller_count", 1)
 
     canettes_only = (drop > 0 and delta == 0)
     if canettes_only:
@@ -292,6 +308,120 @@ async def play_fouiller(inter: Interaction) -> bool:
     )
     return True
 
+# ───────── Classements ─────────
+def _leaderboard_embed(board: str, page: int) -> tuple[discord.Embed | None, bool]:
+    rows, has_next = d_leaderboards.page(board, page)
+    if not rows:
+        return None, False
+    title, _ = d_leaderboards.BOARDS[board]
+    start = page * d_leaderboards.PAGE_SIZE + 1
+    embed = discord.Embed(
+        title=f"🏆 LaRue.exe — {title}",
+        description=_format_leaderboard(rows, start=start, money=(board == "argent")),
+        color=discord.Color.dark_gold()
+    )
+    embed.set_footer(text=f"Page {page + 1} • #{start}–{start + len(rows) - 1} — riche aujourd’hui, pauvre demain…")
+    return embed, has_next
+
+class LeaderboardView(InstrumentedView):
+    def __init__(self, owner_id: int, board: str, has_next: bool):
+        super().__init__(timeout=120)
+        self.owner_id = owner_id
+        self.board = board
+        self.page = 0
+        self.message: discord.Message | None = None
+        self._sync_buttons(has_next)
+
+    def _sync_buttons(self, has_next: bool) -> None:
+        self.btn_prev.disabled = self.page <= 0
+        self.btn_next.disabled = not has_next
+
+    async def _flip(self, inter: Interaction, step: int) -> None:
+        if inter.user.id != self.owner_id:
+            await inter.response.send_message("🛑 Lance ton propre **/hess classement**.", ephemeral=True)
+            return
+        embed, has_next = await asyncio.to_thread(_leaderboard_embed, self.board, self.page + step)
+        if embed is None:
+            await inter.response.send_message("Rien de plus loin.", ephemeral=True)
+            return
+        self.page += step
+        self._sync_buttons(has_next)
+        await inter.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def btn_prev(self, inter: Interaction, _: discord.ui.Button):
+        await self._flip(inter, -1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def btn_next(self, inter: Interaction, _: discord.ui.Button):
+        await self._flip(inter, +1)
+
+    async def on_timeout(self) -> None:
+        if not self.message:
+            return
+        try:
+            await self.message.edit(view=None)
+        except discord.NotFound:
+            pass
+
+# ───────── Historique (/poches vue:historique) ─────────
+HISTORY_PAGE_SIZE = 10
+
+def _history_embed(rows: list[dict], page: int) -> discord.Embed:
+    lines = [
+        f"<t:{r['ts']}:d> <t:{r['ts']}:t> • **{_fmt_delta(r['delta'])}** — {fmt_reason(r['reason'])}"
+        for r in rows
+    ]
+    e = discord.Embed(
+        title="📜 Historique des poches",
+        description="\n".join(lines) or "Aucun mouvement.",
+        color=discord.Color.dark_gold()
+    )
+    e.set_footer(text=f"Page {page + 1} • plus récent d’abord • source: ledger")
+    return e
+
+class HistoryView(InstrumentedView):
+    """Pagination keyset: on garde la pile des curseurs (ts, key), jamais d'OFFSET."""
+
+    def __init__(self, owner_id: int, first_rows: list[dict], has_next: bool):
+        super().__init__(timeout=120)
+        self.owner_id = owner_id
+        self.message: discord.Message | None = None
+        self.cursors: list[tuple[int, bytes] | None] = [None]  # curseur de début de chaque page visitée
+        self.rows = first_rows
+        self._sync_buttons(has_next)
+
+    def _sync_buttons(self, has_next: bool) -> None:
+        self.btn_newer.disabled = len(self.cursors) <= 1
+        self.btn_older.disabled = not has_next
+
+    async def _show(self, inter: Interaction) -> None:
+        rows, has_next = d_economy.history_page(self.owner_id, self.cursors[-1], HISTORY_PAGE_SIZE)
+        self.rows = rows
+        self._sync_buttons(has_next)
+        await inter.response.edit_message(embed=_history_embed(rows, len(self.cursors) - 1), view=self)
+
+    @discord.ui.button(label="◀ Plus récent", style=discord.ButtonStyle.secondary)
+    async def btn_newer(self, inter: Interaction, _: discord.ui.Button):
+        if len(self.cursors) > 1:
+            self.cursors.pop()
+        await self._show(inter)
+
+    @discord.ui.button(label="Plus ancien ▶", style=discord.ButtonStyle.secondary)
+    async def btn_older(self, inter: Interaction, _: discord.ui.Button):
+        if self.rows:
+            last = self.rows[-1]
+            self.cursors.append((last["ts"], last["key"]))
+        await self._show(inter)
+
+    async def on_timeout(self) -> None:
+        if not self.message:
+            return
+        try:
+            await self.message.edit(view=None)
+        except discord.NotFound:
+            pass
+
 # ───────── Slash ─────────
 def _build_group() -> app_commands.Group:
     return app_commands.Group(name="hess", description="La débrouille: mendier, fouiller, survivre.")
@@ -307,28 +437,45 @@ def register(tree: app_commands.CommandTree, guild_obj: discord.Object | None, c
     async def cmd_fouiller(inter: Interaction):
         await play_fouiller(inter)
 
-    @hess.command(name="classement", description="Top 10 des joueurs les plus chargés")
-    async def classement(inter: Interaction):
-        rows = d_economy.top_richest(limit=10)  # <- doit exister côté domain.economy
-        if not rows:
+    @hess.command(name="classement", description="Classements: argent, mendier, fouiller, tabac, séries")
+    @app_commands.describe(tri="Classement à afficher (défaut: argent)")
+    @app_commands.choices(tri=[
+        app_commands.Choice(name="💰 Argent",             value="argent"),
+        app_commands.Choice(name="🥖 Mendier",            value="mendier"),
+        app_commands.Choice(name="🗑️ Fouiller",           value="fouiller"),
+        app_commands.Choice(name="🎟️ Tickets grattés",    value="tabac"),
+        app_commands.Choice(name="♻️ Série recyclerie",   value="streak"),
+    ])
+    async def classement(inter: Interaction, tri: Optional[app_commands.Choice[str]] = None):
+        board = tri.value if tri else "argent"
+        # hors event loop: le classement argent agrège tout le ledger (connexion de lecture du pool)
+        embed, has_next = await asyncio.to_thread(_leaderboard_embed, board, 0)
+        if embed is None:
             await inter.response.send_message(
                 "Aucun joueur classé pour l’instant. Fais **/start** puis **/hess mendier**.",
                 ephemeral=True
             )
             return
-        embed = discord.Embed(
-            title="🏆 LaRue.exe",
-            description=_format_leaderboard(rows),
-            color=discord.Color.dark_gold()
-        )
-        embed.set_footer(text="Top 10 — riche aujourd’hui, pauvre demain…")
-        await inter.response.send_message(embed=embed, ephemeral=False)
+        view = LeaderboardView(inter.user.id, board, has_next)
+        await inter.response.send_message(embed=embed, view=view, ephemeral=False)
+        view.message = await inter.original_response()
 
     # /poches (source de vérité: ledger)
     @tree.command(name="poches", description="Check ce qu’il te reste dans les poches")
     @app_commands.guilds(guild_obj) if guild_obj else (lambda f: f)
-    async def poches(inter: Interaction):
+    @app_commands.describe(vue="solde (défaut) ou historique des mouvements")
+    @app_commands.choices(vue=[
+        app_commands.Choice(name="💰 Solde",      value="solde"),
+        app_commands.Choice(name="📜 Historique", value="historique"),
+    ])
+    async def poches(inter: Interaction, vue: Optional[app_commands.Choice[str]] = None):
         has_started = d_players.get(inter.user.id).get("has_started")
+        if vue and vue.value == "historique":
+            rows, has_next = d_economy.history_page(inter.user.id, None, HISTORY_PAGE_SIZE)
+            view = HistoryView(inter.user.id, rows, has_next)
+            await inter.response.send_message(embed=_history_embed(rows, 0), view=view, ephemeral=True)
+            view.message = await inter.original_response()
+            return
         bal = d_economy.balance(inter.user.id)
         embed = discord.Embed(description=f"En fouillant un peu, t’arrives à racler : **{fmt_eur(bal)}**",
                               color=discord.Color.dark_gold())
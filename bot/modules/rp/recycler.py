@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Optional, Tuple
 from datetime import datetime, UTC, timedelta
 from zoneinfo import ZoneInfo
-import time, random
+import random
 
 import discord
 from discord import app_commands, Interaction
@@ -13,6 +13,8 @@ from bot.modules.rp.boosts import compute_power
 from bot.domain import economy as d_economy
 from bot.domain import players as d_players
 from bot.domain import recycler as d_recycler
+from bot.domain import stats as d_stats
+from bot.domain import clock
 
 # ───────────────────────────────────────────────────────────────────
 # Config recyclerie (centimes)
@@ -23,6 +25,10 @@ BACKLOG_MAX_DAYS      = 3                 # rattrapage max
 CANETTES_PAR_SAC      = 50
 STREAK_BONUS_BP       = 800               # +8%/jour de streak
 STREAK_CAP_DAYS       = 7
+# Drop de canettes après /hess fouiller
+CANETTE_DROP_PROB     = 0.6
+CANETTE_DROP_MIN      = 8
+CANETTE_DROP_MAX      = 20
 
 # Valeur de base d'1 sac par niveau (L1→L3). Tu pourras en ajouter plus tard.
 SAC_VALUE_BY_LEVEL = {
@@ -36,7 +42,7 @@ SAC_VALUE_BY_LEVEL = {
 # ───────────────────────────────────────────────────────────────────
 def _today_key() -> int:
     """Entier AAAAMMJJ basé sur un 'jour' qui commence à DAY_START_HOUR dans TZ_NAME."""
-    now = datetime.now(ZoneInfo(TZ_NAME))
+    now = clock.now_local(ZoneInfo(TZ_NAME))
     start = now.replace(hour=DAY_START_HOUR, minute=0, second=0, microsecond=0)
     if now < start:
         start -= timedelta(days=1)
@@ -44,7 +50,7 @@ def _today_key() -> int:
 
 def _reset_window_epochs(tz_name: str = TZ_NAME, hour: int = DAY_START_HOUR) -> tuple[int, int]:
     """Renvoie (start_epoch_utc, next_epoch_utc) pour la fenêtre quotidienne courante."""
-    now_local = datetime.now(ZoneInfo(tz_name))
+    now_local = clock.now_local(ZoneInfo(tz_name))
     start_local = now_local.replace(hour=hour, minute=0, second=0, microsecond=0)
     if now_local < start_local:
         start_local -= timedelta(days=1)
@@ -87,7 +93,7 @@ def _progress_bar(elapsed: int, total: int, width: int = 10) -> tuple[str, int]:
 def _reset_field() -> tuple[str, str]:
     """Champ 'Prochain reset' avec barre de progression 08:00→demain 08:00."""
     start_ep, next_ep = _reset_window_epochs()
-    now = int(time.time())
+    now = clock.now()
     elapsed = max(0, now - start_ep)
     total   = max(1, next_ep - start_ep)
     bar, pct = _progress_bar(elapsed, total)
@@ -225,6 +231,7 @@ def _claim_days(uid: int, state: dict, nb: int) -> Tuple[int, int]:
         state["streak"] = min(STREAK_CAP_DAYS, state["streak"] + 1)
 
     state["last_day"] = today
+    d_stats.set_max(uid, "recycler_best_streak", state["streak"])
     return done, paid_total
 
 # ───────────────────────────────────────────────────────────────────
@@ -300,7 +307,9 @@ def register(tree: app_commands.CommandTree, guild_obj: Optional[discord.Object]
 # ───────────────────────────────────────────────────────────────────
 # Hook optionnel à appeler depuis /hess fouiller pour “drop” des canettes
 # ───────────────────────────────────────────────────────────────────
-def maybe_grant_canettes_after_fouiller(user_id: int, *, prob: float = 0.6, roll_min: int = 8, roll_max: int = 20) -> int:
+def maybe_grant_canettes_after_fouiller(user_id: int, *, prob: float = CANETTE_DROP_PROB,
+                                        roll_min: int = CANETTE_DROP_MIN, roll_max: int = CANETTE_DROP_MAX,
+                                        rng: random.Random | None = None) -> int:
     """
     Avec une proba 'prob', ajoute aléatoirement des canettes (roll_min..roll_max) au state recyclerie.
     Retourne le nombre ajouté (0 si rien).
@@ -312,9 +321,10 @@ def maybe_grant_canettes_after_fouiller(user_id: int, *, prob: float = 0.6, roll
     roll_bonus = int(power.get("recy_canette_roll_bonus", 0))
 
     eff_prob = max(0.0, min(0.99, prob * prob_mult))
-    if random.random() > eff_prob:
+    rng = rng or random.Random()
+    if rng.random() > eff_prob:
         return 0
 
-    add = random.randint(int(roll_min), int(roll_max)) + max(0, roll_bonus)
+    add = rng.randint(int(roll_min), int(roll_max)) + max(0, roll_bonus)
     d_recycler.add_canettes(user_id, add)
     return add
@@ -8,6 +8,7 @@ from bot.modules.rp.economy import play_mendier, play_fouiller
 
 # Emoji & format monnaie
 from bot.modules.common.money import MONEY_EMOJI, fmt_eur
+from bot.modules.common.ui import InstrumentedView
 
 # Domaine
 from bot.domain import players as d_players
@@ -59,7 +60,7 @@ def _embed_poches(user_id: int) -> discord.Embed:
 # ─────────────────────────────
 # Vue de démarrage
 # ─────────────────────────────
-class StartView(discord.ui.View):
+class StartView(InstrumentedView):
     def __init__(self, owner_id: int):
         super().__init__(timeout=120)
         self.owner_id = owner_id
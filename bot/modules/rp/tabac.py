@@ -1,18 +1,19 @@
 # bot/modules/rp/tabac.py
 from __future__ import annotations
-import asyncio
-import time
 from typing import Optional
 import random
 
 import discord
 from discord import app_commands, Interaction
 
+from bot.core import metrics
 from bot.modules.common.money import fmt_eur, MONEY_EMOJI_NAME, MONEY_EMOJI_ID
+from bot.modules.common.ui import InstrumentedView
 from bot.domain import economy as d_economy
 from bot.domain import players as d_players
 from bot.domain import stats as d_stats
 from bot.domain import quotas as d_quotas
+from bot.domain import clock
 
 def _price_plain(cents: int) -> str:
     return fmt_eur(cents).split(" ", 1)[0]
@@ -66,7 +67,7 @@ def _touch_cooldown(user_id: int) -> tuple[bool, Optional[str]]:
     ok, wait, _ = d_quotas.check_and_touch(user_id, "tabac", TABAC_COOLDOWN_S, 999_999)
     if ok:
         return True, None
-    available_at = int(time.time()) + int(wait)
+    available_at = clock.now() + int(wait)
     return False, f"⏳ Doucement… reviens <t:{available_at}:R>."
 
 def _weight_pick_deterministic(pool: list[tuple[int, float]], rng: random.Random) -> int:
@@ -80,7 +81,7 @@ def _weight_pick_deterministic(pool: list[tuple[int, float]], rng: random.Random
     return int(pool[-1][0])
 
 # ── Vue ────────────────────────────────────────────────────────────
-class TabacView(discord.ui.View):
+class TabacView(InstrumentedView):
     def __init__(self, owner_id: int):
         super().__init__(timeout=120)
         self.owner_id = owner_id
@@ -255,7 +256,7 @@ class TabacView(discord.ui.View):
 
         for col in range(3):
             for _ in range(5):
-                await asyncio.sleep(0.12)
+                await metrics.sleep(0.12)
                 e = self._base_embed()
                 e.add_field(name="🎰 Grattage..", value=_render_grid(rows, col, col), inline=False)
                 if self.message:
@@ -266,7 +267,7 @@ class TabacView(discord.ui.View):
                 await self.message.edit(embed=e, view=self)
 
         # 3) Stat + crédit éventuel (idempotent)
-        d_stats.incr(inter.user.id, "tabac_count", 1)
+        d_stats.bump(inter.user.id, "tabac_count", 1)
 
         if gain_cents > 0:
             win_key = f"tabac:{inter.id}:{self.current_key}:win"
@@ -9,6 +9,8 @@ from bot.domain import economy as d_economy
 from bot.domain import players as d_players
 from bot.domain import profiles as d_profiles
 from bot.domain import respect as d_respect
+from bot.domain import snapshots as d_snapshots
+from bot.modules.common.ui import sparkline
 
 MAX_BIO_LEN = 160
 
@@ -94,6 +96,21 @@ def _embed_profile(inter: Interaction, target: discord.User | discord.Member) ->
     e.set_footer(text=f"Profil • {tag} • UID {_mask_id(target.id)}")
     return e
 
+def _embed_history(inter: Interaction, target: discord.User | discord.Member, days: int = 30) -> discord.Embed:
+    points = d_snapshots.trend(target.id, days)
+    values = [bal for _, bal in points]
+    first, last = values[0], values[-1]
+    delta = last - first
+    arrow = "📈" if delta > 0 else "📉" if delta < 0 else "➖"
+
+    e = discord.Embed(title=f"📜 {_display_name(inter, target)} — {days} jours", color=discord.Color.dark_gold())
+    e.description = f"`{sparkline(values)}`" if len(values) > 1 else "Pas encore d’historique (snapshot chaque matin à 08:00)."
+    e.add_field(name="💰 Aujourd’hui", value=fmt_eur(last), inline=True)
+    e.add_field(name=f"{arrow} Évolution", value=("+" if delta > 0 else "") + fmt_eur(delta), inline=True)
+    e.add_field(name="↕️ Min / Max", value=f"{fmt_eur(min(values))} / {fmt_eur(max(values))}", inline=True)
+    e.set_footer(text=f"Depuis le {points[0][0]} • 1 point par jour")
+    return e
+
 # ─────────────────────────────
 # Slash commands
 # ─────────────────────────────
@@ -126,6 +143,22 @@ def register(tree: app_commands.CommandTree, guild_obj: Optional[discord.Object]
 
         await inter.response.send_message(embed=_embed_profile(inter, member))
 
+    @group.command(name="historique", description="Évolution du capital sur 30 jours (par défaut: toi)")
+    @app_commands.describe(user="(optionnel) quelqu’un d’autre du serveur")
+    async def historique(inter: Interaction, user: Optional[discord.User] = None):
+        if not await _require_guild(inter):
+            return
+
+        target = user or inter.user
+        if getattr(target, "bot", False):
+            await inter.response.send_message("🤖 Les bots n’ont pas de profil ici.", ephemeral=True)
+            return
+        if not _has_started(target.id):
+            await inter.response.send_message("ℹ️ Pas encore commencé (**/start**).", ephemeral=True)
+            return
+
+        await inter.response.send_message(embed=_embed_history(inter, target))
+
     @group.command(name="set_bio", description=f"Définir ta bio ({MAX_BIO_LEN} max)")
     @app_commands.describe(bio="Texte court affiché sur ton profil")
     async def set_bio(inter: Interaction, bio: str):
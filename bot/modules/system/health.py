@@ -1,10 +1,14 @@
 # bot/modules/system/health.py
 from __future__ import annotations
-import time, platform, os, importlib.util
+import time, platform, os
 import discord
 from discord import app_commands, Interaction
 
+from bot.core import metrics, sysmon, watchdog
+from bot.core.db import maintenance, slowlog, tuning
+from bot.core.db.base import current_db_path
 from bot.domain import players as d_players
+from bot.modules.system.sysinfo import history_block
 
 # On lit la DB via le helper central (sans toucher à des chemins en dur)
 try:
@@ -59,6 +63,62 @@ def _sqlite_info() -> dict:
         pass
     return info
 
+def _latency_block(limit: int = 8) -> str:
+    """Tableau p50/p95/p99 (+ p95 DB/API/sleep) des commandes les plus utilisées (15 min glissantes)."""
+    rows = metrics.latency_report(limit)
+    if not rows:
+        return ""
+    lines = ["cmd                  n   p50   p95   p99 | db95 api95 zz95"]
+    for r in rows:
+        lines.append(
+            f"{r['name'][:18]:<18} {r['n']:>4} {r['p50']:>5.0f} {r['p95']:>5.0f} {r['p99']:>5.0f} |"
+            f"{r['db95']:>5.0f} {r['api95']:>5.0f} {r['sleep95']:>5.0f}"
+        )
+    return "```\n" + "\n".join(lines)[:980] + "\n```"
+
+def _contention_block(limit: int = 5) -> str:
+    """Sites atomic() qui attendent le plus le verrou d'écriture."""
+    rows = metrics.contention_report(limit)
+    if not rows:
+        return ""
+    lines = [f"{'n':>5} {'att50':>6} {'att95':>6} {'att99':>6} {'tenu95':>6}"]
+    for r in rows:
+        lines.append(
+            f"{r['n']:>5} {r['wait50']:>6.1f} {r['wait95']:>6.1f} {r['wait99']:>6.1f} {r['hold95']:>6.1f}\n  {r['site'][:90]}"
+        )
+    return "```\n" + "\n".join(lines)[:980] + "\n```"
+
+def _loop_block() -> str:
+    """Lag de l'event loop + derniers blocages détectés par le watchdog."""
+    lag = watchdog.LAG
+    head = (f"lag {lag['last_s'] * 1000:.0f} ms (max {lag['max_s'] * 1000:.0f}) • "
+            f"{int(watchdog.STALLS['count'])} blocage(s)")
+    recent = list(watchdog.RECENT_STALLS)[-3:]
+    if not recent:
+        return head
+    lines = [f"<t:{int(r['at'])}:R> {r['ms']:.0f} ms → `{r['leaf'][:70]}`" for r in reversed(recent)]
+    return (head + "\n" + "\n".join(lines))[:1000]
+
+def _slow_sql_block(limit: int = 5) -> str:
+    """Requêtes les plus coûteuses (temps cumulé) vues par le traçage SQL."""
+    rows = slowlog.top(limit)
+    if not rows:
+        return ""
+    lines = []
+    for sql, st in rows:
+        avg = st.total_s / max(1, st.count) * 1000
+        lines.append(f"{st.count:>6}× avg {avg:>6.2f} max {st.max_s * 1000:>7.1f} ms lentes {st.slow:>3}\n  {sql[:90]}")
+    return "```\n" + "\n".join(lines)[:980] + "\n```"
+
+def _maintenance_block() -> str:
+    """WAL, débit vs seuil de période creuse, dernier passage de chaque travail."""
+    lines = [f"WAL {maintenance.wal_bytes() / 1024**2:.1f} MB (à recopier {maintenance.wal_pending() / 1024**2:.1f}) • "
+             f"{maintenance.recent_rate():.1f} cmd/min "
+             f"(creux ≤ {maintenance.quiet_threshold():.1f})"]
+    for job, out in maintenance.LAST.items():
+        lines.append(f"{job}: {out['seconds'] * 1000:.0f} ms")
+    return "```\n" + "\n".join(lines) + "\n```"
+
 def register(tree: app_commands.CommandTree, guild_obj: discord.Object | None, client: discord.Client | None = None):
     """Expose /debug pour inspecter rapidement l'état du bot (test-only idéalement)."""
 
@@ -69,12 +129,9 @@ def register(tree: app_commands.CommandTree, guild_obj: discord.Object | None, c
         latency_ms = round(inter.client.latency * 1000) if inter.client.latency else 0
         uptime = _fmt_uptime(int(time.time() - BOT_START_TIME))
 
-        # Mémoire (optionnel si psutil dispo)
-        mem_text = "n/a"
-        if importlib.util.find_spec("psutil"):
-            import psutil  # type: ignore
-            rss_mb = psutil.Process().memory_info().rss / 1024**2
-            mem_text = f"{rss_mb:.1f} MB"
+        # Mémoire (dernier échantillon du sampler, si psutil dispo)
+        smp = sysmon.latest()
+        mem_text = f"{smp.proc_rss / 1024**2:.1f} MB" if smp and smp.proc_rss else "n/a"
 
         # Compteurs domaine
         try:
@@ -105,8 +162,28 @@ def register(tree: app_commands.CommandTree, guild_obj: discord.Object | None, c
                 parts = []
                 if jm: parts.append(f"journal={jm}")
                 if uv is not None: parts.append(f"user_version={uv}")
+                t = tuning.current(current_db_path())
+                parts.append(f"profil={t.profile} (cache {t.cache_kib // 1024} MB/conn, mmap {t.mmap_bytes // 1024**2} MB)")
                 embed.add_field(name="⚙️ SQLite", value=" • ".join(parts), inline=True)
 
+        embed.add_field(name="🧹 Maintenance DB", value=_maintenance_block(), inline=False)
+
+        lat = _latency_block()
+        if lat:
+            embed.add_field(name="⏱️ Latences ms (15 min)", value=lat, inline=False)
+
+        embed.add_field(name="📈 Système", value=history_block(), inline=False)
+        embed.add_field(name="🌀 Event loop", value=_loop_block(), inline=False)
+
+        locks = _contention_block()
+        if locks:
+            embed.add_field(name="🔒 Verrou d'écriture ms (15 min)", value=locks, inline=False)
+
+        if slowlog.ENABLED:
+            slow = _slow_sql_block()
+            title = f"🐢 SQL (seuil {slowlog.SLOW_S * 1000:.0f} ms)"
+            embed.add_field(name=title, value=slow or "Rien à signaler.", inline=False)
+
         embed.add_field(name="📅 Maintenant", value=f"<t:{int(time.time())}:F>", inline=False)
 
         await inter.response.send_message(embed=embed, ephemeral=True)
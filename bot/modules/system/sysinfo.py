@@ -1,12 +1,15 @@
 # bot/modules/system/sysinfo.py
 from __future__ import annotations
-import os, time, platform, shutil, socket, asyncio
+import time, platform
 from datetime import datetime, UTC
 from typing import Optional
 
 import discord
 from discord import app_commands, Interaction
 
+from bot.core import sysmon
+from bot.modules.common.ui import sparkline
+
 try:
     import psutil  # facultatif mais utile
 except Exception:
@@ -56,68 +59,67 @@ def _sys_uptime() -> str:
     except Exception:
         return "n/a"
 
-def _cpu_overview() -> str:
-    """
-    Retourne '12% — load: 0.23 0.45 0.50' si possible,
-    sinon '12%' ou 'load: ...' ou 'n/a'.
-    """
-    pct_str = None
-    load_str = None
-
-    if psutil:
-        try:
-            pct = psutil.cpu_percent(interval=0.2)
-            pct_str = f"{pct:.0f}%"
-        except Exception:
-            pct_str = None
-
-    try:
-        load1, load5, load15 = os.getloadavg()
-        load_str = f"load: {load1:.2f} {load5:.2f} {load15:.2f}"
-    except Exception:
-        load_str = None
-
-    if pct_str and load_str:
-        return f"{pct_str} — {load_str}"
-    if pct_str:
-        return pct_str
-    if load_str:
-        return load_str
+def _cpu_overview(smp: sysmon.Sample | None) -> str:
+    """'12% — load: 0.23 0.45 0.50' si possible, sinon ce qu'on a, sinon 'n/a'."""
+    parts = []
+    if smp and smp.cpu_pct is not None:
+        parts.append(f"{smp.cpu_pct:.0f}%")
+    if smp and smp.load:
+        parts.append("load: " + " ".join(f"{x:.2f}" for x in smp.load))
+    return " — ".join(parts) or "n/a"
+
+def _mem_info(smp: sysmon.Sample | None) -> str:
+    if smp and smp.mem_total:
+        return f"{_fmt_bytes(smp.mem_used)} / {_fmt_bytes(smp.mem_total)} ({smp.mem_pct:.0f}%)"
     return "n/a"
 
-def _mem_info() -> str:
-    if psutil:
-        try:
-            v = psutil.virtual_memory()
-            return f"{_fmt_bytes(int(v.used))} / {_fmt_bytes(int(v.total))} ({v.percent:.0f}%)"
-        except Exception:
-            pass
+def _disk_info(smp: sysmon.Sample | None) -> str:
+    if smp and smp.disk_total:
+        pct = 100.0 * smp.disk_used / max(1, smp.disk_total)
+        return f"{_fmt_bytes(smp.disk_used)} / {_fmt_bytes(smp.disk_total)} ({pct:.0f}%) — free: {_fmt_bytes(smp.disk_free)}"
     return "n/a"
 
-def _disk_info() -> str:
-    try:
-        total, used, free = shutil.disk_usage("/")
-        pct = (100.0 * float(used)) / float(max(1, total))
-        return f"{_fmt_bytes(int(used))} / {_fmt_bytes(int(total))} ({pct:.0f}%) — free: {_fmt_bytes(int(free))}"
-    except Exception:
-        return "n/a"
-
 def _ip_info() -> str:
-    # Pas d'appel externe : hostname/IP locale uniquement
-    try:
-        host = socket.gethostname()
-        ip = socket.gethostbyname(host)
-        return f"{host} ({ip})"
-    except Exception:
-        return "n/a"
+    # Résolu une seule fois par le sampler (pas de DNS sur l'event loop)
+    return f"{sysmon.HOST['name']} ({sysmon.HOST['ip']})"
 
-def _proc_count() -> str:
-    if psutil:
-        try:
-            return str(len(psutil.pids()))
-        except Exception:
-            pass
-    return "n/a"
+def _proc_info(smp: sysmon.Sample | None) -> str:
+    if not smp:
+        return "n/a"
+    parts = []
+    if smp.sys_procs is not None:
+        parts.append(f"{smp.sys_procs} système")
+    # chaque champ du process peut manquer seul (psutil lève sur l'un après avoir réussi l'autre)
+    bot = []
+    if smp.proc_rss is not None:
+        bot.append(_fmt_bytes(smp.proc_rss))
+    if smp.proc_cpu_pct is not None:
+        bot.append(f"{smp.proc_cpu_pct:.0f}% cpu")
+    if smp.proc_threads is not None:
+        bot.append(f"{smp.proc_threads} threads")
+    if bot:
+        parts.append("bot: " + ", ".join(bot))
+    return " — ".join(parts) or "n/a"
+
+def history_block(n: int = 30) -> str:
+    """Sparklines sur les n derniers échantillons de l'anneau."""
+    rows = []
+    for label, attr in (("cpu", "cpu_pct"), ("ram", "mem_pct"), ("bot", "proc_rss"), ("ws ", "ws_ms")):
+        vals = sysmon.series(attr, n)
+        if vals:
+            last = f"{vals[-1] / 1024**2:.0f}MB" if attr == "proc_rss" else f"{vals[-1]:.0f}"
+            rows.append(f"{label} {sparkline(vals)} {last}")
+    if not rows:
+        return "```\npas encore d'échantillon\n```"
+    span = int(len(sysmon.series("ts", n)) * sysmon.INTERVAL_S)
+    return "```\n" + "\n".join(rows) + f"\n```~{span}s • échantillon: {sysmon.avg_cost_ms():.2f} ms cpu"
+
+def _console_line(smp: sysmon.Sample) -> str:
+    hms = datetime.fromtimestamp(smp.ts, UTC).strftime("%H:%M:%S")
+    ws = f"{smp.ws_ms:.0f}ms" if smp.ws_ms is not None else "n/a"
+    cpu = f"{smp.cpu_pct:.0f}%" if smp.cpu_pct is not None else "n/a"
+    ram = f"{smp.mem_pct:.0f}%" if smp.mem_pct is not None else "n/a"
+    return f"{hms} | ws:{ws} | cpu:{cpu} | ram:{ram} | proc:{smp.sys_procs or 'n/a'}"
 
 def _now_utc_hms() -> str:
     # Remplace datetime.utcnow() -> timezone-aware
@@ -131,13 +133,14 @@ def register(tree: app_commands.CommandTree, guild_obj: Optional[discord.Object]
     @tree.command(name="sysinfo", description="Dashboard système & bot (rafraîchi en direct)")
     @app_commands.guilds(guild_obj) if guild_obj else (lambda f: f)
     async def sysinfo(inter: Interaction):
+        # Tout vient de l'anneau du sampler: rien de bloquant ici
+        smp = sysmon.latest()
         pyver = platform.python_version()
         uname = platform.uname()
         bot_ping_ms = int(getattr(client, "latency", 0.0) * 1000)
 
         embed = discord.Embed(
             title="🛰️ LaRue.exe — SysInfo",
-            description="Diagnostic en cours…",
             color=discord.Color.dark_teal()
         )
         # Bloc Bot
@@ -157,79 +160,26 @@ def register(tree: app_commands.CommandTree, guild_obj: Optional[discord.Object]
             name="Système",
             value=(
                 f"• **OS**: `{uname.system} {uname.release}` `{uname.machine}`\n"
-                f"• **CPU**: `{_cpu_overview()}`\n"
-                f"• **RAM**: `{_mem_info()}`\n"
-                f"• **Disk**: `{_disk_info()}`\n"
+                f"• **CPU**: `{_cpu_overview(smp)}`\n"
+                f"• **RAM**: `{_mem_info(smp)}`\n"
+                f"• **Disk**: `{_disk_info(smp)}`\n"
                 f"• **Uptime OS**: `{_sys_uptime()}`\n"
                 f"• **Host/IP**: `{_ip_info()}`\n"
-                f"• **Proc.**: `{_proc_count()}`"
+                f"• **Proc.**: `{_proc_info(smp)}`"
             ),
             inline=False
         )
-        # Bloc Console (reflète de vraies stats à chaque refresh)
-        console_lines: list[str] = []
+        embed.add_field(name="Historique", value=history_block(), inline=False)
+        # Bloc Console: derniers échantillons réels
+        lines = [_console_line(x) for x in list(sysmon.RING)[-5:]]
         embed.add_field(
             name="Console",
-            value="```log\ncollecting metrics…\n```",
+            value="```log\n" + ("\n".join(lines) or "collecting metrics…") + "\n```",
             inline=False
         )
         embed.set_footer(text=f"Emitted @ {_now_utc_hms()} • byMartin")
 
         await inter.response.send_message(embed=embed)
-        msg = await inter.original_response()
-
-        # 3 rafraîchissements “live”, avec mesures réelles
-        for _ in range(3):
-            await asyncio.sleep(1.2)
-
-            # Mesures “vivantes”
-            bot_ping_ms = int(getattr(client, "latency", 0.0) * 1000)
-            cpu = _cpu_overview()
-            ram = _mem_info()
-            disk = _disk_info()
-            procs = _proc_count()
-
-            # Met à jour les blocs
-            embed.set_field_at(
-                0,
-                name="Bot",
-                value=(
-                    f"• **Ping WS**: `{bot_ping_ms} ms`\n"
-                    f"• **Uptime**: `{_bot_uptime()}`\n"
-                    f"• **Guilds**: `{len(getattr(client, 'guilds', []))}`\n"
-                    f"• **Cmds**: `{len(getattr(tree, 'commands', []))}`\n"
-                    f"• **Python**: `{pyver}`"
-                ),
-                inline=False
-            )
-            embed.set_field_at(
-                1,
-                name="Système",
-                value=(
-                    f"• **OS**: `{uname.system} {uname.release}` `{uname.machine}`\n"
-                    f"• **CPU**: `{cpu}`\n"
-                    f"• **RAM**: `{ram}`\n"
-                    f"• **Disk**: `{disk}`\n"
-                    f"• **Uptime OS**: `{_sys_uptime()}`\n"
-                    f"• **Host/IP**: `{_ip_info()}`\n"
-                    f"• **Proc.**: `{procs}`"
-                ),
-                inline=False
-            )
-
-            # Ligne “logs” réalistes
-            console_lines.append(
-                f"{_now_utc_hms()} | ws:{bot_ping_ms}ms | cpu:{cpu} | ram:{ram} | disk:{disk} | proc:{procs}"
-            )
-            embed.set_field_at(
-                2,
-                name="Console",
-                value="```log\n" + "\n".join(console_lines[-10:]) + "\n```",
-                inline=False
-            )
-
-            embed.set_footer(text=f"Emitted @ {_now_utc_hms()} • byMartin")
-            await msg.edit(embed=embed)
 
 
 # Ancienne compat éventuelle
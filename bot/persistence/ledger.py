@@ -1,28 +1,89 @@
-from ..core.db.base import get_conn, atomic
+import time
 
-def add_once(user_id: str, key: str, delta: int, reason: str="") -> bool:
+from ..core.db.base import get_conn, atomic, key_check, key_digest, reading
+from . import rollups
+
+# Digest déjà pris: même key_check → même clé, rejeu (quelle que soit la raison passée); sinon
+# collision de digest → on sonde key_digest(f"{key}\x00{n}").
+MAX_PROBES = 4
+
+_reason_ids: dict[str, int] = {}
+
+def reason_id(reason: str) -> int:
+    """Id interné de `reason` (créé au besoin, dans sa propre transaction: jamais annulé avec le posting)."""
+    rid = _reason_ids.get(reason)
+    if rid is None:
+        con = get_conn()
+        row = con.execute("SELECT id FROM ledger_reasons WHERE reason=?", (reason,)).fetchone()
+        if row is None:
+            with atomic(con):
+                con.execute("INSERT OR IGNORE INTO ledger_reasons(reason) VALUES(?)", (reason,))
+                row = con.execute("SELECT id FROM ledger_reasons WHERE reason=?", (reason,)).fetchone()
+        rid = _reason_ids[reason] = int(row[0])
+    return rid
+
+def _probe(key: str, n: int) -> bytes:
+    return key_digest(key if n == 0 else f"{key}\x00{n}")
+
+def add_once(user_id: int | str, key: str, delta: int, reason: str="", ts: int | None = None) -> bool:
+    ts = int(time.time()) if ts is None else int(ts)
+    reason = reason or ""
+    rid = reason_id(reason)
+    check = key_check(key)
     with atomic():
         con = get_conn()
-        before = con.total_changes
-        con.execute("INSERT OR IGNORE INTO ledger(user_id, key, delta, reason) VALUES(?,?,?,?)",
-                    (user_id, key, int(delta), reason or ""))
-        return (con.total_changes - before) > 0
-
-def sum_balance(user_id: str) -> int:
-    con = get_conn()
-    (s,) = con.execute("SELECT COALESCE(SUM(delta),0) FROM ledger WHERE user_id=?", (user_id,)).fetchone()
+        for n in range(MAX_PROBES):
+            kh = _probe(key, n)
+            before = con.total_changes
+            con.execute("INSERT OR IGNORE INTO ledger(user_id, key_hash, key_check, delta, reason_id, ts) "
+                        "VALUES(?,?,?,?,?,?)", (int(user_id), kh, check, int(delta), rid, ts))
+            if con.total_changes - before > 0:
+                rollups.apply_posting(con, ts, reason, int(delta))
+                return True
+            (taken,) = con.execute("SELECT key_check FROM ledger WHERE user_id=? AND key_hash=?",
+                                   (int(user_id), kh)).fetchone()
+            if taken == check:
+                return False   # déjà appliqué (rejeu idempotent)
+        raise RuntimeError(f"ledger: {MAX_PROBES} collisions de digest pour la clé {key!r}")
+
+def sum_balance(user_id: int | str) -> int:
+    with reading() as con:
+        (s,) = con.execute("SELECT COALESCE(SUM(delta),0) FROM ledger WHERE user_id=?", (int(user_id),)).fetchone()
     return int(s)
 
-def top_richest(limit: int = 10) -> list[tuple[str, int]]:
-    with get_conn() as con:
+def history_page(user_id: int | str, before: tuple[int, bytes] | None = None, limit: int = 10) -> list[dict]:
+    """
+    Postings du plus récent au plus ancien, strictement avant le curseur (ts, key_hash).
+    Keyset sur idx_ledger_hist(user_id, ts, key_hash): coût constant quelle que soit la page.
+    "key" est le digest (curseur opaque), la clé d'origine n'est pas conservée.
+    """
+    with reading() as con:
+        if before is None:
+            rows = con.execute(
+                "SELECT l.ts, l.key_hash, l.delta, r.reason FROM ledger l "
+                "JOIN ledger_reasons r ON r.id = l.reason_id WHERE l.user_id=? "
+                "ORDER BY l.ts DESC, l.key_hash DESC LIMIT ?",
+                (int(user_id), int(limit))
+            ).fetchall()
+        else:
+            rows = con.execute(
+                "SELECT l.ts, l.key_hash, l.delta, r.reason FROM ledger l "
+                "JOIN ledger_reasons r ON r.id = l.reason_id WHERE l.user_id=? AND (l.ts, l.key_hash) < (?, ?) "
+                "ORDER BY l.ts DESC, l.key_hash DESC LIMIT ?",
+                (int(user_id), int(before[0]), before[1], int(limit))
+            ).fetchall()
+    return [{"ts": int(r[0]), "key": r[1], "delta": int(r[2]), "reason": r[3]} for r in rows]
+
+def top_richest(limit: int = 10, offset: int = 0) -> list[tuple[str, int]]:
+    with reading() as con:
         rows = con.execute(
             """
             SELECT user_id, COALESCE(SUM(delta), 0) AS bal
             FROM ledger
             GROUP BY user_id
-            ORDER BY bal DESC
-            LIMIT ?;
+            ORDER BY bal DESC, user_id ASC
+            LIMIT ? OFFSET ?;
             """,
-            (int(limit),)
+            (int(limit), int(offset))
         ).fetchall()
-        return [(r[0], int(r[1] or 0)) for r in rows]
\ No newline at end of file
+        return [(str(r[0]), int(r[1] or 0)) for r in rows]
\ No newline at end of file
@@ -0,0 +1,13 @@
+from ..core.db.base import get_conn
+
+def get(key: str, default: str = "") -> str:
+    con = get_conn()
+    row = con.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+    return str(row[0]) if row else default
+
+def put(key: str, value: str, con=None) -> None:
+    con = con or get_conn()
+    con.execute(
+        "INSERT INTO meta(key, value) VALUES(?,?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+        (key, str(value))
+    )
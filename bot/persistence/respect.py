@@ -1,13 +1,15 @@
 from ..core.db.base import get_conn, atomic
 
-def can_give(from_id: str, to_id: str, day: str) -> tuple[bool, str|None]:
+def can_give(from_id: int | str, to_id: int | str, day: str) -> tuple[bool, str|None]:
+    from_id, to_id = int(from_id), int(to_id)
     if from_id == to_id: return False, "😅 Tu peux pas te respecter toi-même."
     con = get_conn()
     row = con.execute("SELECT 1 FROM respect_log WHERE user_id=? AND from_id=? AND day=?", (to_id, from_id, day)).fetchone()
     if row: return False, "⏳ Tu as déjà donné du respect à cette personne aujourd’hui."
     return True, None
 
-def give(from_id: str, to_id: str, day: str) -> int:
+def give(from_id: int | str, to_id: int | str, day: str) -> int:
+    from_id, to_id = int(from_id), int(to_id)
     ok, why = can_give(from_id, to_id, day)
     if not ok: raise ValueError(why or "not allowed")
     with atomic():
@@ -0,0 +1,26 @@
+from ..core.config import settings
+from ..core.db.base import get_conn
+from ..core.db import retention as engine
+
+# table -> (jours conservés, condition « trop vieux » sur le jour de coupure "YYYY-MM-DD")
+# Le jeu ne relit que le jour courant: respect donné aujourd'hui, quota/cooldown du jour, claim du jour.
+POLICIES: dict[str, tuple[int, str]] = {
+    "respect_log":     (settings.retention_respect_days, "day < ?"),
+    "actions":         (settings.retention_actions_days, "day < ?"),
+    "recycler_claims": (settings.retention_claims_days, "day_key < CAST(replace(?, '-', '') AS INTEGER)"),
+}
+
+def prune(cutoffs: dict[str, str]) -> dict[str, dict]:
+    """Purge (ou archive, selon la config) les lignes antérieures au jour de coupure de chaque table."""
+    con = get_conn()
+    def run() -> dict[str, dict]:
+        return {table: engine.prune(con, table, POLICIES[table][1], (day,),
+                                    archive=settings.retention_archive, batch=settings.retention_batch)
+                for table, day in cutoffs.items()}
+    if not settings.retention_archive:
+        return run()
+    with engine.archive_attached(con):
+        return run()
+
+def reclaim() -> tuple[int, int]:
+    return engine.reclaim(get_conn())
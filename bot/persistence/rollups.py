@@ -0,0 +1,67 @@
+from ..core.db.base import reading
+
+HOUR = 3600
+DAY = 86400
+
+_TABLES = {HOUR: "ledger_rollup_hourly", DAY: "ledger_rollup_daily"}
+
+def source_of(reason: str) -> str:
+    """'tabac.bet:banco' -> 'tabac.bet' (même règle que la migration v0006)."""
+    return (reason or "").split(":", 1)[0]
+
+def apply_posting(con, ts: int, reason: str, delta: int) -> None:
+    """À appeler DANS la transaction qui insère l'écriture ledger."""
+    src = source_of(reason)
+    inflow, outflow = (int(delta), 0) if delta > 0 else (0, -int(delta))
+    for width, table in _TABLES.items():
+        con.execute(
+            f"INSERT INTO {table}(bucket, source, inflow, outflow, n) VALUES(?,?,?,?,1) "
+            "ON CONFLICT(bucket, source) DO UPDATE SET inflow = inflow + excluded.inflow, "
+            "outflow = outflow + excluded.outflow, n = n + 1",
+            (int(ts) - int(ts) % width, src, inflow, outflow)
+        )
+
+def backfill(con) -> None:
+    """Recalcule les deux tables d'agrégats depuis tout le ledger (chargement en masse, bench)."""
+    src = "CASE WHEN instr(r.reason, ':') > 0 THEN substr(r.reason, 1, instr(r.reason, ':') - 1) ELSE r.reason END"
+    con.executescript(f"""
+        DELETE FROM ledger_rollup_hourly;
+        DELETE FROM ledger_rollup_daily;
+        INSERT INTO ledger_rollup_hourly(bucket, source, inflow, outflow, n)
+        SELECT l.ts - l.ts % {HOUR}, {src},
+               SUM(CASE WHEN l.delta > 0 THEN l.delta ELSE 0 END),
+               SUM(CASE WHEN l.delta < 0 THEN -l.delta ELSE 0 END),
+               COUNT(*)
+        FROM ledger l JOIN ledger_reasons r ON r.id = l.reason_id GROUP BY 1, 2;
+        INSERT INTO ledger_rollup_daily(bucket, source, inflow, outflow, n)
+        SELECT bucket - bucket % {DAY}, source, SUM(inflow), SUM(outflow), SUM(n)
+        FROM ledger_rollup_hourly GROUP BY 1, 2;
+    """)
+
+def by_source(since_ts: int, width: int = HOUR) -> list[tuple[str, int, int, int]]:
+    """[(source, inflow, outflow, n)] depuis since_ts (arrondi au bucket)."""
+    table = _TABLES[width]
+    with reading() as con:
+        rows = con.execute(
+            f"SELECT source, SUM(inflow), SUM(outflow), SUM(n) FROM {table} "
+            "WHERE bucket >= ? GROUP BY source ORDER BY SUM(inflow) + SUM(outflow) DESC",
+            (int(since_ts) - int(since_ts) % width,)
+        ).fetchall()
+    return [(r[0], int(r[1]), int(r[2]), int(r[3])) for r in rows]
+
+def net_series(since_ts: int, width: int = DAY) -> list[tuple[int, int]]:
+    """[(bucket, inflow - outflow)] par bucket, ordre chronologique."""
+    table = _TABLES[width]
+    with reading() as con:
+        rows = con.execute(
+            f"SELECT bucket, SUM(inflow) - SUM(outflow) FROM {table} "
+            "WHERE bucket >= ? GROUP BY bucket ORDER BY bucket",
+            (int(since_ts) - int(since_ts) % width,)
+        ).fetchall()
+    return [(int(r[0]), int(r[1])) for r in rows]
+
+def money_supply() -> int:
+    """Masse monétaire = somme de tous les deltas (lue sur la table journalière, petite)."""
+    with reading() as con:
+        (s,) = con.execute("SELECT COALESCE(SUM(inflow) - SUM(outflow), 0) FROM ledger_rollup_daily").fetchone()
+    return int(s)
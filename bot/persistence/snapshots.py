@@ -0,0 +1,73 @@
+from ..core.db.base import get_conn, atomic, reading
+from . import meta
+
+LAST_DAY_KEY = "snapshots.last_day"
+
+def first_posting_ts() -> int | None:
+    con = get_conn()
+    (ts,) = con.execute("SELECT MIN(ts) FROM ledger").fetchone()
+    return int(ts) if ts is not None else None
+
+def snapshot_day(day: str, start_ts: int, end_ts: int) -> int:
+    """
+    Ajoute le solde de fin de journée de chaque joueur actif ce jour-là:
+    dernier snapshot connu + somme des postings de la journée (via idx_ledger_by_time).
+    Idempotent; avance le curseur meta dans la même transaction.
+    """
+    with atomic():
+        con = get_conn()
+        before = con.total_changes
+        con.execute(
+            """
+            INSERT INTO balance_snapshots(user_id, day, balance)
+            SELECT l.user_id, :day,
+                   COALESCE((SELECT s.balance FROM balance_snapshots s
+                             WHERE s.user_id = l.user_id AND s.day < :day
+                             ORDER BY s.day DESC LIMIT 1), 0) + SUM(l.delta)
+            FROM ledger l
+            WHERE l.ts >= :start AND l.ts < :end
+            GROUP BY l.user_id
+            ON CONFLICT(user_id, day) DO UPDATE SET balance = excluded.balance
+            """,
+            {"day": day, "start": int(start_ts), "end": int(end_ts)}
+        )
+        n = con.total_changes - before
+        meta.put(LAST_DAY_KEY, day, con)
+    return int(n)
+
+def seed_day(day: str, end_ts: int) -> int:
+    """
+    Solde complet de chaque joueur à la fin de `day` (somme de tous ses postings avant end_ts): point
+    de départ quand le rattrapage ne remonte pas jusqu'au premier posting. Un parcours du ledger.
+    Idempotent; avance le curseur meta dans la même transaction.
+    """
+    with atomic():
+        con = get_conn()
+        before = con.total_changes
+        con.execute(
+            """
+            INSERT INTO balance_snapshots(user_id, day, balance)
+            SELECT user_id, :day, SUM(delta) FROM ledger WHERE ts < :end GROUP BY user_id
+            ON CONFLICT(user_id, day) DO UPDATE SET balance = excluded.balance
+            """,
+            {"day": day, "end": int(end_ts)}
+        )
+        n = con.total_changes - before
+        meta.put(LAST_DAY_KEY, day, con)
+    return int(n)
+
+def history(user_id: int | str, since_day: str) -> list[tuple[str, int]]:
+    """
+    Snapshots depuis since_day, précédés du dernier snapshot AVANT since_day s'il existe (solde à
+    reporter sur le début de la fenêtre). Deux parcours de la PK (user_id, day), une seule requête.
+    """
+    with reading() as con:
+        rows = con.execute(
+            "SELECT day, balance FROM (SELECT day, balance FROM balance_snapshots "
+            "WHERE user_id=? AND day < ? ORDER BY day DESC LIMIT 1) "
+            "UNION ALL "
+            "SELECT day, balance FROM (SELECT day, balance FROM balance_snapshots "
+            "WHERE user_id=? AND day >= ? ORDER BY day)",
+            (int(user_id), since_day, int(user_id), since_day)
+        ).fetchall()
+    return [(r[0], int(r[1])) for r in rows]
@@ -1,22 +1,148 @@
-from ..core.db.base import get_conn, atomic
+import threading
 
-def incr(user_id: str, key: str, delta: int = 1) -> int:
+from ..core.config import settings
+from ..core.db.base import get_conn, atomic, reading
+
+# ── Tampon write-behind: (user_id entier, key) -> delta en attente d'écriture
+_pending: dict[tuple[int, str], int] = {}
+# deltas retirés du tampon par un flush pas encore validé: toujours comptés par les lectures
+_inflight: dict[tuple[int, str], int] = {}
+_lock = threading.Lock()
+# ordonne les lectures (table + tampons) et la validation d'un flush: une lecture voit le lot soit
+# dans _inflight, soit dans la table, jamais ni l'un ni l'autre ni les deux. Ordre: _commit_lock puis _lock
+_commit_lock = threading.Lock()
+# incrémentée par clear(): un flush commencé avant la remise à zéro abandonne son lot
+_generation = 0
+
+_UPSERT = (
+    "INSERT INTO stats(user_id, key, value) VALUES(?,?,?) "
+    "ON CONFLICT(user_id, key) DO UPDATE SET value = value + excluded.value"
+)
+
+def bump(user_id: int | str, key: str, delta: int = 1) -> None:
+    """Incrément bufferisé (aucune écriture immédiate). Flush auto au-delà de STATS_FLUSH_MAX entrées."""
+    k = (int(user_id), key)
+    with _lock:
+        _pending[k] = _pending.get(k, 0) + int(delta)
+        full = len(_pending) >= settings.stats_flush_max
+    if full:
+        flush()
+
+def _merge(dst: dict[tuple[int, str], int], batch: dict[tuple[int, str], int], sign: int) -> None:
+    for k, d in batch.items():
+        v = dst.get(k, 0) + sign * d
+        if v:
+            dst[k] = v
+        else:
+            dst.pop(k, None)
+
+def flush() -> int:
+    """Écrit tous les deltas en attente en une seule transaction. Renvoie le nb d'entrées écrites."""
+    global _pending
+    with _lock:
+        if not _pending:
+            return 0
+        batch, _pending = _pending, {}
+        gen = _generation
+        _merge(_inflight, batch, +1)
+    held = False
+    try:
+        with atomic() as con:
+            # verrou d'écriture obtenu (l'attente busy_timeout est passée): les lectures n'attendent
+            # que l'écriture du lot et le COMMIT
+            _commit_lock.acquire()
+            held = True
+            if gen != _generation:
+                return 0            # stats remises à zéro pendant l'attente: lot (déjà retiré) abandonné
+            con.executemany(_UPSERT, [(uid, key, d) for (uid, key), d in batch.items() if d])
+        with _lock:
+            _merge(_inflight, batch, -1)
+    except Exception:
+        # on remet les deltas dans le tampon pour le prochain flush (sauf remise à zéro entre-temps)
+        with _lock:
+            if gen == _generation:
+                _merge(_inflight, batch, -1)
+                _merge(_pending, batch, +1)
+        raise
+    finally:
+        if held:
+            _commit_lock.release()
+    return len(batch)
+
+def clear() -> None:
+    """
+    Vide la table et les deux tampons (remise à zéro admin). Même ordre de verrous que flush (écriture
+    puis _commit_lock): un flush déjà validé est effacé avec la table, un flush en attente abandonne son lot.
+    """
+    global _generation
+    held = False
+    try:
+        with atomic() as con:
+            _commit_lock.acquire()
+            held = True
+            con.execute("DELETE FROM stats")
+            with _lock:
+                _generation += 1
+                _pending.clear()
+                _inflight.clear()
+    finally:
+        if held:
+            _commit_lock.release()
+
+def pending_count() -> int:
+    return len(_pending)
+
+def _pending_for(user_id: int | str, key: str) -> int:
+    k = (int(user_id), key)
+    with _lock:
+        return _pending.get(k, 0) + _inflight.get(k, 0)
+
+def incr(user_id: int | str, key: str, delta: int = 1) -> int:
+    bump(user_id, key, delta)
+    return get(user_id, key)
+
+def set_max(user_id: int | str, key: str, value: int) -> int:
+    """Conserve le max entre la valeur stockée et `value` (records, meilleures séries…)."""
     with atomic():
         con = get_conn()
         con.execute(
             "INSERT INTO stats(user_id, key, value) VALUES(?,?,?) "
-            "ON CONFLICT(user_id, key) DO UPDATE SET value = value + excluded.value",
-            (user_id, key, int(delta))
+            "ON CONFLICT(user_id, key) DO UPDATE SET value = MAX(value, excluded.value)",
+            (int(user_id), key, int(value))
         )
-        (val,) = con.execute("SELECT value FROM stats WHERE user_id=? AND key=?", (user_id, key)).fetchone()
+        (val,) = con.execute("SELECT value FROM stats WHERE user_id=? AND key=?", (int(user_id), key)).fetchone()
     return int(val)
 
-def get(user_id: str, key: str, default: int = 0) -> int:
-    con = get_conn()
-    row = con.execute("SELECT value FROM stats WHERE user_id=? AND key=?", (user_id, key)).fetchone()
-    return int(row[0]) if row else int(default)
+def get(user_id: int | str, key: str, default: int = 0) -> int:
+    with _commit_lock:
+        with reading() as con:
+            row = con.execute("SELECT value FROM stats WHERE user_id=? AND key=?", (int(user_id), key)).fetchone()
+        pend = _pending_for(user_id, key)
+    if row is None and not pend:
+        return int(default)
+    return (int(row[0]) if row else 0) + pend
+
+def all_for(user_id: int | str) -> dict[str,int]:
+    uid_int = int(user_id)
+    with _commit_lock:
+        with reading() as con:
+            rows = con.execute("SELECT key, value FROM stats WHERE user_id=?", (uid_int,)).fetchall()
+        out = {r[0]: int(r[1]) for r in rows}
+        with _lock:
+            for buf in (_pending, _inflight):
+                for (uid, key), d in buf.items():
+                    if uid == uid_int:
+                        out[key] = out.get(key, 0) + d
+    return out
 
-def all_for(user_id: str) -> dict[str,int]:
-    con = get_conn()
-    rows = con.execute("SELECT key, value FROM stats WHERE user_id=?", (user_id,)).fetchall()
-    return {r[0]: int(r[1]) for r in rows}
+def top_by_key(key: str, limit: int = 10, offset: int = 0) -> list[tuple[str, int]]:
+    # Pas de flush ici: lu hors event loop (classements), le tampon est vidé par la tâche stats_flush
+    # (retard ≤ STATS_FLUSH_MS, sous le TTL du cache des classements)
+    # Servi par idx_stats_by_key_value (key, value DESC, user_id): pas de scan ni de tri
+    with reading() as con:
+        rows = con.execute(
+            "SELECT user_id, value FROM stats WHERE key=? AND value > 0 "
+            "ORDER BY value DESC, user_id ASC LIMIT ? OFFSET ?",
+            (key, int(limit), int(offset))
+        ).fetchall()
+    return [(str(r[0]), int(r[1])) for r in rows]